@@ -14,7 +14,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from app.core.database import Base
-from app.models import user, exam, exam_session, fraud_log # Import all your models here
+from app.models import user, exam, exam_session, fraud_log, grading_job, exam_analytics # Import all your models here
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,33 @@
+"""Unique exam response per question
+
+Revision ID: 4b7e2d91a3c5
+Revises: cf145534fa0f
+Create Date: 2026-10-17 10:12:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d91a3c5'
+down_revision: Union[str, Sequence[str], None] = 'cf145534fa0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mantém apenas a resposta mais recente de cada questão por sessão antes de criar o índice único.
+    op.execute(sa.text(
+        "DELETE FROM exam_responses WHERE id NOT IN ("
+        "SELECT MAX(id) FROM exam_responses GROUP BY session_id, question_id)"
+    ))
+    op.create_index('uq_exam_responses_session_question', 'exam_responses', ['session_id', 'question_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_exam_responses_session_question', table_name='exam_responses')
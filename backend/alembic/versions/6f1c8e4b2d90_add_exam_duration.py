@@ -0,0 +1,28 @@
+"""Add exam duration
+
+Revision ID: 6f1c8e4b2d90
+Revises: 9d3f6a8c1e27
+Create Date: 2026-10-17 14:26:41.305518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1c8e4b2d90'
+down_revision: Union[str, Sequence[str], None] = '9d3f6a8c1e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('exams', sa.Column('duration_minutes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('exams', 'duration_minutes')
@@ -0,0 +1,61 @@
+"""Add hot path indexes
+
+Revision ID: 9d3f6a8c1e27
+Revises: 4b7e2d91a3c5
+Create Date: 2026-10-17 11:03:17.842196
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6a8c1e27'
+down_revision: Union[str, Sequence[str], None] = '4b7e2d91a3c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mantém ativa apenas a sessão mais recente de cada usuário/exame antes de criar o índice único parcial.
+    sessions = sa.table(
+        'exam_sessions',
+        sa.column('id', sa.Integer),
+        sa.column('exam_id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('is_active', sa.Boolean),
+    )
+    latest_active = (
+        sa.select(sa.func.max(sessions.c.id))
+        .where(sessions.c.is_active == sa.true())
+        .group_by(sessions.c.user_id, sessions.c.exam_id)
+    )
+    op.execute(
+        sessions.update()
+        .where(sessions.c.is_active == sa.true(), sessions.c.id.not_in(latest_active))
+        .values(is_active=False)
+    )
+
+    op.create_index(op.f('ix_exam_sessions_user_id'), 'exam_sessions', ['user_id'], unique=False)
+    op.create_index('ix_exam_sessions_exam_id_status', 'exam_sessions', ['exam_id', 'status'], unique=False)
+    op.create_index(
+        'uq_exam_sessions_active_user_exam', 'exam_sessions', ['user_id', 'exam_id'], unique=True,
+        postgresql_where=sa.text('is_active = true'), sqlite_where=sa.text('is_active = 1'),
+    )
+    op.create_index(op.f('ix_questions_exam_id'), 'questions', ['exam_id'], unique=False)
+    op.create_index(op.f('ix_exams_owner_id'), 'exams', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_fraud_logs_session_id'), 'fraud_logs', ['session_id'], unique=False)
+    # exam_responses(session_id) já é atendido pelo índice único (session_id, question_id).
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_fraud_logs_session_id'), table_name='fraud_logs')
+    op.drop_index(op.f('ix_exams_owner_id'), table_name='exams')
+    op.drop_index(op.f('ix_questions_exam_id'), table_name='questions')
+    op.drop_index('uq_exam_sessions_active_user_exam', table_name='exam_sessions')
+    op.drop_index('ix_exam_sessions_exam_id_status', table_name='exam_sessions')
+    op.drop_index(op.f('ix_exam_sessions_user_id'), table_name='exam_sessions')
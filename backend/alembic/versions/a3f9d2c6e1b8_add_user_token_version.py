@@ -0,0 +1,28 @@
+"""Add user token version
+
+Revision ID: a3f9d2c6e1b8
+Revises: e5c1f8a2b7d4
+Create Date: 2026-10-18 00:21:37.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9d2c6e1b8'
+down_revision: Union[str, Sequence[str], None] = 'e5c1f8a2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
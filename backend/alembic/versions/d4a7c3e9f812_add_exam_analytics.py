@@ -0,0 +1,60 @@
+"""Add exam analytics
+
+Revision ID: d4a7c3e9f812
+Revises: b8e2d5f17a43
+Create Date: 2026-10-17 22:10:41.305218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c3e9f812'
+down_revision: Union[str, Sequence[str], None] = 'b8e2d5f17a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exam_analytics',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.Column('refreshed_generation', sa.Integer(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('max_points', sa.Float(), nullable=False),
+    sa.Column('mean_score', sa.Float(), nullable=True),
+    sa.Column('stddev_score', sa.Float(), nullable=True),
+    sa.Column('min_score', sa.Float(), nullable=True),
+    sa.Column('max_score', sa.Float(), nullable=True),
+    sa.Column('percentiles', sa.JSON(), nullable=True),
+    sa.Column('histogram', sa.JSON(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+    sa.PrimaryKeyConstraint('exam_id')
+    )
+    op.create_index('ix_exam_analytics_stale', 'exam_analytics', ['exam_id'], unique=False, postgresql_where=sa.text('refreshed_generation < generation'), sqlite_where=sa.text('refreshed_generation < generation'))
+    op.create_table('question_analytics',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('response_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('correct_rate', sa.Float(), nullable=True),
+    sa.Column('discrimination', sa.Float(), nullable=True),
+    sa.Column('option_counts', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_index(op.f('ix_question_analytics_exam_id'), 'question_analytics', ['exam_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_question_analytics_exam_id'), table_name='question_analytics')
+    op.drop_table('question_analytics')
+    op.drop_index('ix_exam_analytics_stale', table_name='exam_analytics')
+    op.drop_table('exam_analytics')
@@ -0,0 +1,28 @@
+"""Add exam content version
+
+Revision ID: e5c1f8a2b7d4
+Revises: d4a7c3e9f812
+Create Date: 2026-10-17 23:48:12.511093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c1f8a2b7d4'
+down_revision: Union[str, Sequence[str], None] = 'd4a7c3e9f812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('exams', sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('exams', 'content_version')
@@ -2,11 +2,20 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import login, users, fraud, exam, exam_session
+from app.api.endpoints import login, users, fraud, exam, exam_session, exam_session_ws, metrics
+from app.core.config import settings
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(fraud.router, prefix="/fraud", tags=["fraud"])
+if settings.ASYNC_DATABASE_ENABLED:
+    # As rotas assíncronas são registradas primeiro e têm precedência sobre as síncronas de mesmo caminho;
+    # ficam fora do schema OpenAPI porque têm a mesma assinatura das rotas síncronas já documentadas.
+    from app.api.endpoints import exam_async, exam_session_async
+    api_router.include_router(exam_async.router, prefix="/exams", tags=["exams"], include_in_schema=False)
+    api_router.include_router(exam_session_async.router, prefix="/exam-sessions", tags=["exam-sessions"], include_in_schema=False)
 api_router.include_router(exam.router, prefix="/exams", tags=["exams"])
-api_router.include_router(exam_session.router, prefix="/exam-sessions", tags=["exam-sessions"])
\ No newline at end of file
+api_router.include_router(exam_session.router, prefix="/exam-sessions", tags=["exam-sessions"])
+api_router.include_router(exam_session_ws.router, prefix="/exam-sessions", tags=["exam-sessions"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
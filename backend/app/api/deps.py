@@ -1,15 +1,19 @@
 # backend/app/api/deps.py
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 
 from app.core.config import settings
+from app.core import database
 from app.core.database import SessionLocal
 from app.core.security import decode_access_token
 from app.models.user import User
+from app.services import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -20,20 +24,71 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
+async def get_async_db() -> AsyncGenerator:
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database layer is disabled; set ASYNC_DATABASE_ENABLED=true")
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def get_token_payload(token: str) -> dict:
+    """Decodifica o token JWT e retorna o payload, exigindo o claim `sub` (e-mail do usuário)."""
+    credentials_exception = _credentials_exception()
     try:
         payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
+    return payload
+
+def _check_active(user: User) -> User:
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return user
+
+def _check_token(payload: dict, user: User) -> User:
+    # Tokens emitidos antes de uma alteração de papel, status ou e-mail do usuário são recusados.
+    if not user_cache.token_is_current(payload, user):
+        raise _credentials_exception()
+    return _check_active(user)
+
+def get_user_from_token(db: Session, token: str) -> User:
+    """Autentica o token JWT e retorna o usuário ativo correspondente (usado também pelo WebSocket)."""
+    payload = get_token_payload(token)
+    # Caminho rápido: cache de usuários, sem consulta ao banco.
+    user = user_cache.get_cached_user(payload["sub"])
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        if user is None:
+            raise _credentials_exception()
+        user_cache.cache_user(user)
+    return _check_token(payload, user)
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    return get_user_from_token(db, token)
+
+def get_metrics_user(current_user: User = Depends(get_current_user)) -> User:
+    """Exige um usuário autenticado com um dos papéis de `METRICS_ROLES` (endpoints de métricas)."""
+    if current_user.role not in settings.METRICS_ROLES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
+
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> User:
+    payload = get_token_payload(token)
+    user = user_cache.get_cached_user(payload["sub"])
+    if user is None:
+        user = (await db.execute(select(User).where(User.email == payload["sub"]))).scalars().first()
+        if user is None:
+            raise _credentials_exception()
+        user_cache.cache_user(user)
+    return _check_token(payload, user)
@@ -5,15 +5,26 @@ Contém rotas para criar, ler, atualizar e excluir exames e questões,
 com verificação de permissões do usuário.
 """
 
-from typing import Any, List
+from typing import Any, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.database import SessionLocal
+from app.core.pagination import decode_cursor, paginate
+from app.core.responses import json_response
 from app.models.user import User
-from app.schemas.exam import Exam, ExamCreate, ExamUpdate, Question, QuestionCreate, QuestionUpdate
+from app.schemas.exam import Exam, ExamCreate, ExamSummary, ExamUpdate, Question, QuestionCreate, QuestionUpdate, StudentExam
+from app.schemas.exam_analytics import ExamAnalytics, QuestionAnalytics
+from app.schemas.exam_session import BulkGradeResult, ExamSessionProgress
 from app.services import exam as exam_service
+from app.services import exam_analytics as exam_analytics_service
+from app.services import exam_content as exam_content_service
+from app.services import exam_export as exam_export_service
+from app.services import exam_session as exam_session_service
+from app.services import grading as grading_service
 
 # Cria um roteador APIRouter para os endpoints de exame
 router = APIRouter()
@@ -36,34 +47,46 @@ def create_exam(
     """
     return exam_service.create_exam(db=db, exam=exam, owner_id=current_user.id)
 
-@router.get("/exams/", response_model=List[Exam])
+@router.get("/exams/", response_model=List[ExamSummary], response_model_exclude_unset=True)
 def read_exams(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    expand: Optional[Literal["questions"]] = None,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> List[Exam]:
-    """Retorna uma lista de exames.
+) -> Response:
+    """Retorna uma lista resumida de exames, ordenada por ID.
+
+    Cada exame traz o número de questões; as questões só são incluídas com
+    `?expand=questions`. O cursor da próxima página é retornado no cabeçalho
+    `X-Next-Cursor`.
 
     Args:
+        response (Response): A resposta HTTP.
         skip (int): Número de exames a serem ignorados.
         limit (int): Número máximo de exames a serem retornados.
+        cursor (Optional[str]): Cursor da página, recebido em `X-Next-Cursor`.
+        expand (Optional[str]): `questions` para incluir as questões de cada exame.
         db (Session): A sessão do banco de dados.
         current_user (User): O usuário autenticado.
 
     Returns:
-        List[Exam]: Uma lista de objetos Exam.
+        Response: Uma lista de resumos de exames (`List[ExamSummary]`).
     """
-    exams = exam_service.get_exams(db, skip=skip, limit=limit)
-    return exams
+    exams = exam_service.get_exam_summaries(
+        db, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor), with_questions=expand == "questions"
+    )
+    return json_response(ExamSummary, paginate(response, exams, limit), response=response, exclude_unset=True)
 
 @router.get("/exams/{exam_id}", response_model=Exam)
 def read_exam(
     exam_id: int,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> Exam:
-    """Retorna um exame específico pelo ID.
+) -> Response:
+    """Retorna um exame específico pelo ID, com as suas questões.
 
     Args:
         exam_id (int): O ID do exame.
@@ -71,15 +94,53 @@ def read_exam(
         current_user (User): O usuário autenticado.
 
     Returns:
-        Exam: O objeto Exam correspondente.
+        Response: O exame correspondente (`Exam`).
 
     Raises:
         HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
     """
-    exam = exam_service.get_exam(db, exam_id=exam_id)
+    exam = exam_service.get_exam(db, exam_id=exam_id, with_questions=True)
     if not exam or exam.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
-    return exam
+    return json_response(Exam, exam)
+
+@router.get(
+    "/exams/{exam_id}/content/",
+    response_model=StudentExam,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Exam content not modified"}},
+)
+def read_exam_content(
+    exam_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Response:
+    """Retorna o conteúdo de um exame para a realização da prova (sem o gabarito).
+
+    O conteúdo serializado é mantido em cache por versão do exame. A resposta traz
+    um `ETag`; se o cliente enviar o mesmo valor em `If-None-Match`, a resposta é
+    304 sem corpo.
+
+    Args:
+        exam_id (int): O ID do exame.
+        if_none_match (Optional[str]): O cabeçalho `If-None-Match` da requisição.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        Response: O exame e as suas questões (`StudentExam`), ou 304.
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não for o proprietário
+            nem tiver uma sessão no exame (404).
+    """
+    content = exam_content_service.get_exam_content(db, exam_id=exam_id)
+    if content is None or not exam_content_service.can_view_exam_content(db, content, user_id=current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    headers = {"ETag": content.etag, "Cache-Control": "private, no-cache"}
+    if content.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content.body, media_type="application/json", headers=headers)
 
 @router.put("/exams/{exam_id}", response_model=Exam)
 def update_exam(
@@ -131,6 +192,183 @@ def delete_exam(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
     return exam_service.delete_exam(db=db, exam_id=exam_id)
 
+@router.post("/exams/{exam_id}/grade/", response_model=BulkGradeResult)
+def grade_exam_sessions(
+    exam_id: int,
+    chunk_size: int = 500,
+    rescore: bool = False,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> BulkGradeResult:
+    """Corrige todas as sessões submetidas de um exame em uma única passagem.
+
+    Com `rescore=true`, as sessões já corrigidas também são recalculadas (ex:
+    após corrigir o gabarito); ver `grading_service.rescore_exam`.
+
+    Args:
+        exam_id (int): O ID do exame.
+        chunk_size (int): Número de sessões processadas por bloco.
+        rescore (bool): Se deve recalcular também as sessões já corrigidas.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        BulkGradeResult: Estatísticas da correção (sessões corrigidas e vazão).
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
+    """
+    db_exam = exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    if chunk_size < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="chunk_size must be positive")
+    if rescore:
+        return grading_service.rescore_exam(db, exam_id=exam_id, chunk_size=chunk_size)
+    return grading_service.grade_exam_sessions_bulk(db, exam_id=exam_id, chunk_size=chunk_size)
+
+@router.get("/exams/{exam_id}/progress/", response_model=List[ExamSessionProgress])
+def read_exam_progress(
+    exam_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Response:
+    """Retorna o andamento das sessões de um exame (respostas, acertos e pontuação), ordenadas por ID.
+
+    Com a correção incremental (`INCREMENTAL_SCORING`), a pontuação das sessões em
+    andamento é a parcial das questões objetivas, sem acionar a correção. O cursor
+    da próxima página é retornado no cabeçalho `X-Next-Cursor`.
+
+    Args:
+        exam_id (int): O ID do exame.
+        response (Response): A resposta HTTP.
+        skip (int): Número de sessões a serem ignoradas.
+        limit (int): Número máximo de sessões a serem retornadas.
+        cursor (Optional[str]): Cursor da página, recebido em `X-Next-Cursor`.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        Response: O andamento das sessões do exame (`List[ExamSessionProgress]`).
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
+    """
+    db_exam = exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    sessions = exam_session_service.get_exam_progress(db, exam_id=exam_id, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor))
+    return json_response(ExamSessionProgress, paginate(response, sessions, limit), response=response)
+
+@router.get(
+    "/exams/{exam_id}/export/",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+def export_exam_results(
+    exam_id: int,
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    responses: bool = False,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> StreamingResponse:
+    """Exporta as sessões de um exame, com as pontuações e, opcionalmente, as respostas.
+
+    O arquivo é gerado à medida que as sessões são lidas com um cursor no
+    servidor (ver `app.services.exam_export`), sem carregar a coorte inteira em
+    memória.
+
+    Args:
+        exam_id (int): O ID do exame.
+        fmt (str): O formato do arquivo, 'csv' ou 'ndjson' (parâmetro `format`).
+        responses (bool): Inclui as respostas de cada sessão.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        StreamingResponse: O arquivo de resultados, como anexo.
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
+    """
+    db_exam = exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    return StreamingResponse(
+        exam_export_service.stream_exam_results(SessionLocal, exam_id, fmt=fmt, with_responses=responses),
+        media_type=exam_export_service.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="exam-{exam_id}-results.{fmt}"'},
+    )
+
+def _exam_analytics(db: Session, exam_id: int, db_analytics) -> ExamAnalytics:
+    # Monta a resposta a partir das linhas pré-calculadas (exame ainda sem sessões corrigidas se None).
+    marked = exam_analytics_service.exam_analytics_refresher.is_marked(exam_id)
+    if db_analytics is None:
+        return ExamAnalytics(exam_id=exam_id, stale=marked)
+    analytics = ExamAnalytics.model_validate(db_analytics)
+    return analytics.model_copy(update={
+        "stale": analytics.stale or marked,
+        "questions": [
+            QuestionAnalytics.model_validate(row) for row in exam_analytics_service.get_question_analytics(db, exam_id=exam_id)
+        ],
+    })
+
+@router.get("/exams/{exam_id}/analytics/", response_model=ExamAnalytics)
+def read_exam_analytics(
+    exam_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> ExamAnalytics:
+    """Retorna as estatísticas pré-calculadas de um exame e das suas questões.
+
+    As estatísticas são lidas das tabelas `exam_analytics` e `question_analytics`,
+    sem percorrer as sessões, e recalculadas em segundo plano após a correção
+    (`stale` indica um recálculo pendente).
+
+    Args:
+        exam_id (int): O ID do exame.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        ExamAnalytics: As estatísticas do exame.
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
+    """
+    db_exam = exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    return _exam_analytics(db, exam_id, exam_analytics_service.get_exam_analytics(db, exam_id=exam_id))
+
+@router.post("/exams/{exam_id}/analytics/refresh/", response_model=ExamAnalytics)
+def refresh_exam_analytics(
+    exam_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> ExamAnalytics:
+    """Recalcula imediatamente as estatísticas de um exame (ex: após uma correção manual).
+
+    Args:
+        exam_id (int): O ID do exame.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado.
+
+    Returns:
+        ExamAnalytics: As estatísticas recalculadas.
+
+    Raises:
+        HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
+    """
+    db_exam = exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    return _exam_analytics(db, exam_id, exam_analytics_service.refresh_exam_analytics(db, exam_id=exam_id))
+
 @router.post("/exams/{exam_id}/questions/", response_model=Question)
 def create_question_for_exam(
     exam_id: int,
@@ -160,22 +398,28 @@ def create_question_for_exam(
 @router.get("/exams/{exam_id}/questions/", response_model=List[Question])
 def read_questions_for_exam(
     exam_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> List[Question]:
-    """Retorna uma lista de questões para um exame específico.
+) -> Response:
+    """Retorna uma lista de questões para um exame específico, ordenada por ID.
+
+    O cursor da próxima página é retornado no cabeçalho `X-Next-Cursor`.
 
     Args:
         exam_id (int): O ID do exame.
+        response (Response): A resposta HTTP.
         skip (int): Número de questões a serem ignoradas.
         limit (int): Número máximo de questões a serem retornadas.
+        cursor (Optional[str]): Cursor da página, recebido em `X-Next-Cursor`.
         db (Session): A sessão do banco de dados.
         current_user (User): O usuário autenticado.
 
     Returns:
-        List[Question]: Uma lista de objetos Question.
+        Response: Uma lista de questões (`List[Question]`).
 
     Raises:
         HTTPException: Se o exame não for encontrado ou o usuário não tiver permissão.
@@ -183,8 +427,8 @@ def read_questions_for_exam(
     db_exam = exam_service.get_exam(db, exam_id=exam_id)
     if not db_exam or db_exam.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
-    questions = exam_service.get_questions_by_exam(db, exam_id=exam_id, skip=skip, limit=limit)
-    return questions
+    questions = exam_service.get_questions_by_exam(db, exam_id=exam_id, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor))
+    return json_response(Question, paginate(response, questions, limit), response=response)
 
 @router.get("/questions/{question_id}", response_model=Question)
 def read_question(
@@ -0,0 +1,70 @@
+"""Módulo com as rotas assíncronas de leitura de exames e questões.
+
+Espelha as rotas de leitura de `app.api.endpoints.exam` (incluindo o conteúdo
+de prova entregue aos alunos) com `async def` e uma `AsyncSession`; registrado
+antes do roteador síncrono quando `ASYNC_DATABASE_ENABLED` está ativo.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.pagination import decode_cursor, paginate
+from app.models.user import User
+from app.schemas.exam import Exam, Question, StudentExam
+from app.services import exam_async as exam_service
+from app.services.exam_session_async import serialize_json
+
+# Cria um roteador APIRouter para os endpoints assíncronos de exame
+router = APIRouter()
+
+@router.get("/exams/{exam_id}", response_model=Exam)
+async def read_exam(
+    exam_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+) -> Response:
+    """Retorna um exame específico pelo ID. Ver `exam.read_exam`."""
+    exam = await exam_service.get_exam(db, exam_id=exam_id, with_questions=True)
+    if not exam or exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    return await serialize_json(db, Exam, exam)
+
+@router.get(
+    "/exams/{exam_id}/content/",
+    response_model=StudentExam,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Exam content not modified"}},
+)
+async def read_exam_content(
+    exam_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+) -> Response:
+    """Retorna o conteúdo de um exame para a realização da prova. Ver `exam.read_exam_content`."""
+    content = await exam_service.get_exam_content(db, exam_id=exam_id)
+    if content is None or not await exam_service.can_view_exam_content(db, content, user_id=current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+    headers = {"ETag": content.etag, "Cache-Control": "private, no-cache"}
+    if content.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content.body, media_type="application/json", headers=headers)
+
+@router.get("/exams/{exam_id}/questions/", response_model=List[Question])
+async def read_questions_for_exam(
+    exam_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+) -> Response:
+    """Retorna uma lista de questões para um exame específico. Ver `exam.read_questions_for_exam`."""
+    db_exam = await exam_service.get_exam(db, exam_id=exam_id)
+    if not db_exam or db_exam.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found or you don't have permission")
+    questions = await exam_service.get_questions_by_exam(db, exam_id=exam_id, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor))
+    return await serialize_json(db, Question, paginate(response, questions, limit), response=response)
@@ -6,16 +6,21 @@ Este módulo define as rotas da API para operações relacionadas a sessões de
 incluindo criação, leitura, atualização, submissão de respostas e avaliação de sessões.
 """
 
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
+from app.core.pagination import decode_cursor, paginate
+from app.core.responses import json_response
 from app.models.user import User
-from app.schemas.exam_session import ExamSession, ExamSessionCreate, ExamSessionUpdate, ExamResponse, ExamResponseCreate
+from app.schemas.exam_session import ExamSession, ExamSessionCreate, ExamSessionSummary, ExamSessionUpdate, ExamResponse, ExamResponseCreate, ExamResponseBatchResult, GradingJobStatus
 from app.services import exam_session as exam_session_service
 from app.services import exam as exam_service
+from app.services.exam_channels import notify_session_submitted
+from app.services import grading_jobs as grading_job_service
 from app.services.score_calculator import calculate_exam_score
 
 # Cria uma instância do APIRouter para definir as rotas da API.
@@ -48,36 +53,45 @@ def create_exam_session(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
     
     # Verifica se o usuário já possui uma sessão ativa para este exame.
-    existing_session = db.query(ExamSession).filter(
-        ExamSession.exam_id == exam_session.exam_id,
-        ExamSession.user_id == current_user.id,
-        ExamSession.is_active == True
-    ).first()
+    existing_session = exam_session_service.get_active_exam_session(db, exam_id=exam_session.exam_id, user_id=current_user.id)
     if existing_session:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already has an active session for this exam")
 
     return exam_session_service.create_exam_session(db=db, exam_session=exam_session, user_id=current_user.id)
 
-@router.get("/exam-sessions/me/", response_model=List[ExamSession])
+@router.get("/exam-sessions/me/", response_model=List[ExamSessionSummary], response_model_exclude_unset=True)
 def read_my_exam_sessions(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    expand: Optional[Literal["responses"]] = None,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
-    """Retorna todas as sessões de exame do usuário atual.
+    """Retorna um resumo das sessões de exame do usuário atual, ordenadas por ID.
+
+    Cada sessão traz o número de respostas; as respostas só são incluídas com
+    `?expand=responses`. O cursor da próxima página é retornado no cabeçalho
+    `X-Next-Cursor`.
 
     Args:
+        response (Response): A resposta HTTP.
         skip (int): O número de sessões a pular (para paginação).
         limit (int): O número máximo de sessões a retornar (para paginação).
+        cursor (Optional[str]): Cursor da página, recebido em `X-Next-Cursor`.
+        expand (Optional[str]): `responses` para incluir as respostas de cada sessão.
         db (Session): A sessão do banco de dados.
         current_user (User): O usuário autenticado atualmente.
 
     Returns:
-        List[ExamSession]: Uma lista das sessões de exame do usuário.
+        Response: Uma lista de resumos das sessões de exame do usuário (`List[ExamSessionSummary]`).
     """
-    sessions = exam_session_service.get_exam_sessions_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
-    return sessions
+    sessions = exam_session_service.get_exam_sessions_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor),
+        with_responses=expand == "responses",
+    )
+    return json_response(ExamSessionSummary, paginate(response, sessions, limit), response=response, exclude_unset=True)
 
 @router.get("/exam-sessions/{session_id}", response_model=ExamSession)
 def read_exam_session(
@@ -98,12 +112,13 @@ def read_exam_session(
         HTTPException: Se a sessão não for encontrada ou o usuário não tiver permissão (404).
 
     Returns:
-        ExamSession: A sessão de exame solicitada.
+        Response: A sessão de exame solicitada (`ExamSession`).
     """
-    session = exam_session_service.get_exam_session(db, session_id=session_id)
+    exam_session_service.flush_exam_responses(db, session_id=session_id)
+    session = exam_session_service.get_exam_session(db, session_id=session_id, with_responses=True)
     if not session or session.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
-    return session
+    return json_response(ExamSession, session)
 
 @router.put("/exam-sessions/{session_id}", response_model=ExamSession)
 def update_exam_session(
@@ -163,23 +178,62 @@ def create_exam_response(
     if not db_session or db_session.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
     if db_session.status != "in_progress":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot submit responses to a session that is not in progress")
+
+    # Valida se a questão pertence ao exame da sessão.
+    question = exam_service.get_question(db, question_id=response.question_id)
+    if not question or question.exam_id != db_session.exam_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Question does not belong to this exam session")
+
+    db_response = exam_session_service.create_exam_response(db=db, response=response, session_id=session_id, exam_id=db_session.exam_id)
+    # A correção incremental da resposta não é exposta ao aluno durante a prova.
+    return ExamResponse.model_validate(db_response).model_copy(update={"is_correct": None, "points_earned": None})
+
+@router.post("/exam-sessions/{session_id}/responses/batch/", response_model=ExamResponseBatchResult, status_code=status.HTTP_201_CREATED)
+def create_exam_responses_batch(
+    session_id: int,
+    responses: List[ExamResponseCreate],
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """Cria um lote de respostas dentro de uma sessão de exame.
 
-    # Atualiza o status da sessão para 'submitted' e define o end_time
-    db_session.status = "submitted"
-    db_session.end_time = datetime.utcnow()
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+    Permite que o frontend envie as respostas acumuladas de uma só vez. Todas as questões
+    são validadas contra o exame da sessão com uma única consulta e as respostas são
+    gravadas com um único INSERT em lote.
+
+    Args:
+        session_id (int): O ID da sessão de exame.
+        responses (List[ExamResponseCreate]): As respostas a serem criadas.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado atualmente.
+
+    Raises:
+        HTTPException: Se o lote tiver mais de `EXAM_RESPONSE_BATCH_MAX_SIZE` respostas (400).
+        HTTPException: Se a sessão não for encontrada ou o usuário não tiver permissão (404).
+        HTTPException: Se a sessão não estiver em progresso (400).
+        HTTPException: Se alguma questão não pertencer à sessão de exame (400).
+
+    Returns:
+        ExamResponseBatchResult: O número de respostas gravadas.
+    """
+    if len(responses) > settings.EXAM_RESPONSE_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.EXAM_RESPONSE_BATCH_MAX_SIZE} responses per batch")
+    db_session = exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session or db_session.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    if db_session.status != "in_progress":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot submit responses to a session that is not in progress")
 
-    # Calcula a pontuação do exame
-    calculated_score = calculate_exam_score(db, session_id=session_id)
-    db_session.score = calculated_score
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+    # Valida, com uma única consulta, se todas as questões pertencem ao exame da sessão.
+    question_ids = [response.question_id for response in responses]
+    valid_ids = exam_service.get_exam_question_ids(db, exam_id=db_session.exam_id, question_ids=question_ids)
+    invalid_ids = sorted(set(question_ids) - valid_ids)
+    if invalid_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Questions {invalid_ids} do not belong to this exam session")
 
-    return db_session
+    saved = exam_session_service.create_exam_responses(db=db, responses=responses, session_id=session_id, exam_id=db_session.exam_id)
+    return ExamResponseBatchResult(session_id=session_id, saved=saved)
 
 @router.post("/exam-sessions/{session_id}/auto-submit/", response_model=ExamSession)
 def auto_submit_exam_session(
@@ -199,37 +253,37 @@ def auto_submit_exam_session(
         HTTPException: Se a sessão não estiver em progresso (400).
 
     Returns:
-        ExamSession: A sessão de exame atualizada após a submissão.
+        ExamSession: A sessão de exame atualizada após a submissão. Com a correção
+            assíncrona (`GRADING_JOBS_ENABLED`), `score` é nulo até a sessão ser
+            corrigida (ver `/exam-sessions/{session_id}/grading/`).
     """
+    # Grava as respostas pendentes no buffer de autosave antes de encerrar a sessão.
+    exam_session_service.flush_exam_responses(db, session_id=session_id)
     db_session = exam_session_service.get_exam_session(db, session_id=session_id)
     if not db_session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found")
     if db_session.status != "in_progress":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
 
-    # Atualiza o status da sessão para 'submitted' e define o end_time
-    db_session.status = "submitted"
-    db_session.end_time = datetime.utcnow()
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-
-    # Calcula a pontuação do exame
-    calculated_score = calculate_exam_score(db, session_id=session_id)
-    db_session.score = calculated_score
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-
-    return db_session
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot submit responses to a session that is not in progress")
-    
-    # Valida se a questão pertence ao exame da sessão.
-    question = exam_service.get_question(db, question_id=response.question_id)
-    if not question or question.exam_id != db_session.exam_id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Question does not belong to this exam session")
+    if settings.GRADING_JOBS_ENABLED:
+        # Apenas submete a sessão; a correção é enfileirada e feita pelos workers.
+        updated_session = exam_session_service.submit_exam_session(db, session_id=session_id, end_time=datetime.utcnow())
+        if updated_session is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+    else:
+        # Atualiza o status da sessão para 'submitted' e define o end_time
+        updated_session = exam_session_service.update_exam_session(
+            db=db,
+            session_id=session_id,
+            session_update=ExamSessionUpdate(status="submitted", end_time=datetime.utcnow())
+        )
+
+        # Calcula a pontuação do exame
+        calculate_exam_score(db, updated_session)
+    # Avisa o canal WebSocket da sessão, se houver, de que a prova foi encerrada.
+    notify_session_submitted(session_id, "auto_submit", score=updated_session.score)
 
-    return exam_session_service.create_exam_response(db=db, response=response, session_id=session_id)
+    return updated_session
 
 @router.post("/exam-sessions/{session_id}/submit/", response_model=ExamSession)
 def submit_exam_session(
@@ -251,24 +305,60 @@ def submit_exam_session(
         HTTPException: Se a sessão não estiver em progresso (400).
 
     Returns:
-        ExamSession: A sessão de exame atualizada após a submissão.
+        ExamSession: A sessão de exame atualizada após a submissão. Com a correção
+            assíncrona (`GRADING_JOBS_ENABLED`), `score` é nulo até a sessão ser
+            corrigida (ver `/exam-sessions/{session_id}/grading/`).
     """
+    # Grava as respostas pendentes no buffer de autosave antes de encerrar a sessão.
+    exam_session_service.flush_exam_responses(db, session_id=session_id)
     db_session = exam_session_service.get_exam_session(db, session_id=session_id)
     if not db_session or db_session.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
     if db_session.status != "in_progress":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
 
-    updated_session = exam_session_service.update_exam_session(
-        db=db,
-        session_id=session_id,
-        session_update=ExamSessionUpdate(status="submitted", end_time=datetime.now())
-    )
+    if settings.GRADING_JOBS_ENABLED:
+        updated_session = exam_session_service.submit_exam_session(db, session_id=session_id, end_time=datetime.now())
+        if updated_session is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+    else:
+        updated_session = exam_session_service.update_exam_session(
+            db=db,
+            session_id=session_id,
+            session_update=ExamSessionUpdate(status="submitted", end_time=datetime.now())
+        )
 
-    calculate_exam_score(db, updated_session)
+        calculate_exam_score(db, updated_session)
+    notify_session_submitted(session_id, "submit", score=updated_session.score)
 
     return updated_session
 
+@router.get("/exam-sessions/{session_id}/grading/", response_model=GradingJobStatus)
+def read_grading_status(
+    session_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """Obtém o andamento da correção de uma sessão de exame submetida.
+
+    Disponível para o aluno da sessão e para o proprietário do exame.
+
+    Args:
+        session_id (int): O ID da sessão de exame.
+        db (Session): A sessão do banco de dados.
+        current_user (User): O usuário autenticado atualmente.
+
+    Raises:
+        HTTPException: Se a sessão não for encontrada ou o usuário não tiver permissão (404).
+
+    Returns:
+        GradingJobStatus: O status do job de correção e a pontuação da sessão, se já corrigida.
+    """
+    db_session = exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session or (db_session.user_id != current_user.id and db_session.exam.owner_id != current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    return grading_job_service.get_grading_status(db, db_session)
+
 @router.post("/exam-sessions/{session_id}/grade/", response_model=ExamSession)
 def grade_exam_session_api(
     session_id: int,
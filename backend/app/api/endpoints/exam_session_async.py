@@ -0,0 +1,195 @@
+"""Módulo com as rotas assíncronas do fluxo de realização de provas.
+
+Espelha as rotas de `app.api.endpoints.exam_session` usadas pelos alunos durante
+a prova (início, leitura, envio de respostas, submissão e andamento da correção) com `async def` e uma
+`AsyncSession`. É registrado antes do roteador síncrono quando
+`ASYNC_DATABASE_ENABLED` está ativo, substituindo as rotas de mesmo caminho.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.config import settings
+from app.core.pagination import decode_cursor, paginate
+from app.models.user import User
+from app.schemas.exam_session import ExamSession, ExamSessionCreate, ExamSessionSummary, ExamSessionUpdate, ExamResponse, ExamResponseCreate, ExamResponseBatchResult, GradingJobStatus
+from app.services import exam_async as exam_service
+from app.services import exam_session_async as exam_session_service
+from app.services.exam_channels import notify_session_submitted
+
+# Cria uma instância do APIRouter para definir as rotas assíncronas.
+router = APIRouter()
+
+@router.post("/exam-sessions/", response_model=ExamSession, status_code=status.HTTP_201_CREATED)
+async def create_exam_session(
+    exam_session: ExamSessionCreate,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Cria uma nova sessão de exame para o usuário atual. Ver `exam_session.create_exam_session`."""
+    db_exam = await exam_service.get_exam(db, exam_id=exam_session.exam_id)
+    if not db_exam:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam not found")
+
+    existing_session = await exam_session_service.get_active_exam_session(db, exam_id=exam_session.exam_id, user_id=current_user.id)
+    if existing_session:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already has an active session for this exam")
+
+    db_session = await exam_session_service.create_exam_session(db, exam_session=exam_session, user_id=current_user.id)
+    return await exam_session_service.serialize(db, ExamSession, db_session)
+
+@router.get("/exam-sessions/me/", response_model=List[ExamSessionSummary], response_model_exclude_unset=True)
+async def read_my_exam_sessions(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    expand: Optional[Literal["responses"]] = None,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Retorna um resumo das sessões de exame do usuário atual. Ver `exam_session.read_my_exam_sessions`."""
+    sessions = await exam_session_service.get_exam_sessions_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit + 1, after_id=decode_cursor(cursor),
+        with_responses=expand == "responses",
+    )
+    return await exam_session_service.serialize_json(db, ExamSessionSummary, paginate(response, sessions, limit), response=response, exclude_unset=True)
+
+@router.get("/exam-sessions/{session_id}", response_model=ExamSession)
+async def read_exam_session(
+    session_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Retorna uma sessão de exame específica pelo ID. Ver `exam_session.read_exam_session`."""
+    await exam_session_service.flush_exam_responses(db, session_id=session_id)
+    session = await exam_session_service.get_exam_session(db, session_id=session_id, with_responses=True)
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    return await exam_session_service.serialize_json(db, ExamSession, session)
+
+@router.post("/exam-sessions/{session_id}/responses/", response_model=ExamResponse, status_code=status.HTTP_201_CREATED)
+async def create_exam_response(
+    session_id: int,
+    response: ExamResponseCreate,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Cria uma nova resposta dentro de uma sessão de exame. Ver `exam_session.create_exam_response`."""
+    db_session = await exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session or db_session.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    if db_session.status != "in_progress":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot submit responses to a session that is not in progress")
+
+    # Valida se a questão pertence ao exame da sessão.
+    question = await exam_service.get_question(db, question_id=response.question_id)
+    if not question or question.exam_id != db_session.exam_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Question does not belong to this exam session")
+
+    db_response = await exam_session_service.create_exam_response(db, response=response, session_id=session_id, exam_id=db_session.exam_id)
+    result = await exam_session_service.serialize(db, ExamResponse, db_response)
+    # A correção incremental da resposta não é exposta ao aluno durante a prova.
+    return result.model_copy(update={"is_correct": None, "points_earned": None})
+
+@router.post("/exam-sessions/{session_id}/responses/batch/", response_model=ExamResponseBatchResult, status_code=status.HTTP_201_CREATED)
+async def create_exam_responses_batch(
+    session_id: int,
+    responses: List[ExamResponseCreate],
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Cria um lote de respostas dentro de uma sessão de exame. Ver `exam_session.create_exam_responses_batch`."""
+    if len(responses) > settings.EXAM_RESPONSE_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.EXAM_RESPONSE_BATCH_MAX_SIZE} responses per batch")
+    db_session = await exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session or db_session.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    if db_session.status != "in_progress":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot submit responses to a session that is not in progress")
+
+    question_ids = [response.question_id for response in responses]
+    valid_ids = await exam_service.get_exam_question_ids(db, exam_id=db_session.exam_id, question_ids=question_ids)
+    invalid_ids = sorted(set(question_ids) - valid_ids)
+    if invalid_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Questions {invalid_ids} do not belong to this exam session")
+
+    saved = await exam_session_service.create_exam_responses(db, responses=responses, session_id=session_id, exam_id=db_session.exam_id)
+    return ExamResponseBatchResult(session_id=session_id, saved=saved)
+
+@router.post("/exam-sessions/{session_id}/auto-submit/", response_model=ExamSession)
+async def auto_submit_exam_session(
+    session_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    """Submete automaticamente uma sessão de exame. Ver `exam_session.auto_submit_exam_session`."""
+    await exam_session_service.flush_exam_responses(db, session_id=session_id)
+    db_session = await exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found")
+    if db_session.status != "in_progress":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+
+    if settings.GRADING_JOBS_ENABLED:
+        updated_session = await exam_session_service.submit_exam_session(db, session_id=session_id, end_time=datetime.utcnow())
+        if updated_session is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+    else:
+        updated_session = await exam_session_service.update_exam_session(
+            db,
+            session_id=session_id,
+            session_update=ExamSessionUpdate(status="submitted", end_time=datetime.utcnow())
+        )
+        await exam_session_service.calculate_score(db, updated_session)
+    result = await exam_session_service.serialize(db, ExamSession, updated_session)
+    notify_session_submitted(session_id, "auto_submit", score=result.score)
+    return result
+
+@router.post("/exam-sessions/{session_id}/submit/", response_model=ExamSession)
+async def submit_exam_session(
+    session_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Submete uma sessão de exame, marcando-a como concluída. Ver `exam_session.submit_exam_session`."""
+    await exam_session_service.flush_exam_responses(db, session_id=session_id)
+    db_session = await exam_session_service.get_exam_session(db, session_id=session_id)
+    if not db_session or db_session.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    if db_session.status != "in_progress":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+
+    if settings.GRADING_JOBS_ENABLED:
+        updated_session = await exam_session_service.submit_exam_session(db, session_id=session_id, end_time=datetime.now())
+        if updated_session is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam session is not in progress")
+    else:
+        updated_session = await exam_session_service.update_exam_session(
+            db,
+            session_id=session_id,
+            session_update=ExamSessionUpdate(status="submitted", end_time=datetime.now())
+        )
+        await exam_session_service.calculate_score(db, updated_session)
+    result = await exam_session_service.serialize(db, ExamSession, updated_session)
+    notify_session_submitted(session_id, "submit", score=result.score)
+    return result
+
+@router.get("/exam-sessions/{session_id}/grading/", response_model=GradingJobStatus)
+async def read_grading_status(
+    session_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """Obtém o andamento da correção de uma sessão de exame. Ver `exam_session.read_grading_status`."""
+    db_session = await exam_session_service.get_exam_session(db, session_id=session_id)
+    if db_session and db_session.user_id != current_user.id:
+        db_exam = await exam_service.get_exam(db, exam_id=db_session.exam_id)
+        if not db_exam or db_exam.owner_id != current_user.id:
+            db_session = None
+    if not db_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam session not found or you don't have permission")
+    return await exam_session_service.get_grading_status(db, db_session)
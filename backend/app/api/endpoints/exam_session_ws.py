@@ -0,0 +1,259 @@
+"""Módulo com o canal WebSocket de uma sessão de exame.
+
+Durante a prova, o cliente mantém uma única conexão por sessão, autenticada uma
+vez com o mesmo JWT da API, em vez de uma requisição HTTP por resposta
+salva ou por evento de fraude (cada uma autenticando o usuário e abrindo uma
+sessão do banco).
+
+Protocolo (mensagens JSON):
+
+- cliente -> servidor:
+    - `{"type": "auth", "token": "<jwt>"}`: obrigatória e primeira mensagem;
+    - `{"type": "answer", "question_id": 1, "answer": "a", "seq": 1}`;
+    - `{"type": "answers", "answers": [{"question_id": 1, "answer": "a"}], "seq": 2}`;
+    - `{"type": "fraud", "event_type": "tab_switch", "details": "...", "seq": 3}`;
+    - `{"type": "ping"}`.
+- servidor -> cliente:
+    - `session` (após a autenticação) e `timer` (periódica), com o horário do
+      servidor, o tempo decorrido e, se o exame tiver duração, o prazo e o
+      tempo restante da sessão;
+    - `ack` com o `seq` da mensagem confirmada, `error` e `pong`;
+    - `submitted` ou `force_submit` quando a sessão é encerrada, seguida do
+      fechamento da conexão.
+
+As respostas seguem o mesmo caminho do envio por HTTP (`create_exam_responses`,
+incluindo o buffer de autosave) e os eventos de fraude vão para a fila de
+ingestão em lote. Falhas de autenticação ou de acesso fecham a conexão com os
+códigos `CLOSE_*` abaixo.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Set
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.exam_session import ExamResponseCreate
+from app.schemas.fraud_log import FraudLogCreate
+from app.services import exam as exam_service
+from app.services import exam_session as exam_session_service
+from app.services.exam_channels import ExamSessionConnection, exam_session_channels
+from app.services.fraud_ingest import FraudQueueFull, fraud_event_queue
+from app.services.session_timer import session_deadline
+
+# Cria uma instância do APIRouter para o canal WebSocket das sessões de exame.
+router = APIRouter()
+
+# Códigos de fechamento da conexão (faixa 4000-4999, reservada às aplicações).
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_NOT_IN_PROGRESS = 4409
+
+_responses_adapter = TypeAdapter(List[ExamResponseCreate])
+
+
+class _ChannelClosed(Exception):
+    """Encerra a conexão com o código e o motivo informados."""
+
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+class _ChannelState:
+    """Dados da sessão de exame carregados uma única vez na abertura do canal."""
+
+    __slots__ = ("session_id", "user_id", "exam_id", "start_time", "deadline", "question_ids")
+
+    def __init__(
+        self, session_id: int, user_id: int, exam_id: int, start_time: Optional[datetime],
+        deadline: Optional[float], question_ids: Set[int],
+    ):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.exam_id = exam_id
+        self.start_time = start_time
+        self.deadline = deadline
+        self.question_ids = question_ids
+
+    def timer_message(self, kind: str = "timer") -> dict:
+        if self.start_time is None:
+            now, elapsed = datetime.utcnow(), None
+        else:
+            now = datetime.now(timezone.utc) if self.start_time.tzinfo else datetime.utcnow()
+            elapsed = max(0, int((now - self.start_time).total_seconds()))
+        return {
+            "type": kind,
+            "session_id": self.session_id,
+            "server_time": now.isoformat(),
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "elapsed_seconds": elapsed,
+            "deadline": datetime.fromtimestamp(self.deadline, tz=timezone.utc).isoformat() if self.deadline else None,
+            "remaining_seconds": max(0, int(self.deadline - time.time())) if self.deadline else None,
+        }
+
+
+def _open_session(token: str, session_id: int) -> _ChannelState:
+    # Autentica o usuário e carrega a sessão e as questões do exame (executada no pool de threads).
+    with SessionLocal() as db:
+        try:
+            user = deps.get_user_from_token(db, token)
+        except HTTPException as exc:
+            raise _ChannelClosed(CLOSE_UNAUTHORIZED, exc.detail)
+        db_session = exam_session_service.get_exam_session(db, session_id=session_id)
+        if not db_session or db_session.user_id != user.id:
+            raise _ChannelClosed(CLOSE_NOT_FOUND, "Exam session not found or you don't have permission")
+        if db_session.status != "in_progress":
+            raise _ChannelClosed(CLOSE_NOT_IN_PROGRESS, "Exam session is not in progress")
+        question_ids = exam_service.get_question_ids_by_exam(db, exam_id=db_session.exam_id)
+        deadline = session_deadline(db_session.start_time, db_session.exam.duration_minutes)
+        return _ChannelState(session_id, user.id, db_session.exam_id, db_session.start_time, deadline, question_ids)
+
+
+def _reload_question_ids(exam_id: int) -> Set[int]:
+    with SessionLocal() as db:
+        return exam_service.get_question_ids_by_exam(db, exam_id=exam_id)
+
+
+def _save_answers(session_id: int, exam_id: int, responses: List[ExamResponseCreate]) -> Optional[int]:
+    # Grava as respostas como o envio em lote por HTTP; retorna None se a sessão não estiver mais em progresso.
+    # O status é verificado também com o write-behind ativo: sem isso, as respostas enviadas após a
+    # submissão ou o prazo seriam confirmadas ao cliente e depois descartadas pela gravação do buffer.
+    with SessionLocal() as db:
+        if exam_session_service.get_exam_session_status(db, session_id) != "in_progress":
+            return None
+        return exam_session_service.create_exam_responses(db=db, responses=responses, session_id=session_id, exam_id=exam_id)
+
+
+async def _authenticate(websocket: WebSocket, session_id: int) -> _ChannelState:
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), timeout=settings.EXAM_WS_AUTH_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, ValueError, KeyError):
+        raise _ChannelClosed(CLOSE_UNAUTHORIZED, "Authentication required")
+    if not isinstance(message, dict) or message.get("type") != "auth" or not isinstance(message.get("token"), str):
+        raise _ChannelClosed(CLOSE_UNAUTHORIZED, "Authentication required")
+    return await run_in_threadpool(_open_session, message["token"], session_id)
+
+
+async def _handle_answers(state: _ChannelState, items: Any) -> int:
+    responses = _responses_adapter.validate_python(items)
+    if len(responses) > settings.EXAM_RESPONSE_BATCH_MAX_SIZE:
+        raise ValueError(f"At most {settings.EXAM_RESPONSE_BATCH_MAX_SIZE} responses per batch")
+    unknown = {response.question_id for response in responses} - state.question_ids
+    if unknown:
+        # Questões podem ter sido adicionadas ao exame depois da abertura do canal.
+        state.question_ids = await run_in_threadpool(_reload_question_ids, state.exam_id)
+        unknown -= state.question_ids
+    if unknown:
+        raise ValueError(f"Questions {sorted(unknown)} do not belong to this exam session")
+    saved = await run_in_threadpool(_save_answers, state.session_id, state.exam_id, responses)
+    if saved is None:
+        raise _ChannelClosed(CLOSE_NOT_IN_PROGRESS, "Exam session is not in progress")
+    return saved
+
+
+async def _receive_loop(websocket: WebSocket, connection: ExamSessionConnection, state: _ChannelState) -> None:
+    # Após um erro fatal, as mensagens são ignoradas até o envio do fechamento pelo `_send_loop`.
+    closing = False
+    while True:
+        try:
+            message = await websocket.receive_json()
+        except WebSocketDisconnect:
+            return
+        except (ValueError, KeyError):
+            if closing:
+                continue
+            connection.send({"type": "error", "detail": "Invalid JSON message"})
+            continue
+        if closing:
+            continue
+        if not isinstance(message, dict):
+            connection.send({"type": "error", "detail": "Invalid message"})
+            continue
+        kind, seq = message.get("type"), message.get("seq")
+        try:
+            if kind == "answer":
+                saved = await _handle_answers(state, [message])
+                connection.send({"type": "ack", "seq": seq, "saved": saved})
+            elif kind == "answers":
+                saved = await _handle_answers(state, message.get("answers"))
+                connection.send({"type": "ack", "seq": seq, "saved": saved})
+            elif kind == "fraud":
+                fraud_event_queue.put([FraudLogCreate(
+                    session_id=state.session_id, user_id=state.user_id,
+                    event_type=message.get("event_type"), details=message.get("details"),
+                )])
+                connection.send({"type": "ack", "seq": seq})
+            elif kind == "ping":
+                connection.send({"type": "pong", "seq": seq})
+            else:
+                connection.send({"type": "error", "seq": seq, "detail": f"Unknown message type: {kind}"})
+        except ValidationError as exc:
+            connection.send({"type": "error", "seq": seq, "detail": exc.errors(include_url=False, include_context=False)})
+        except ValueError as exc:
+            connection.send({"type": "error", "seq": seq, "detail": str(exc)})
+        except FraudQueueFull:
+            connection.send({"type": "error", "seq": seq, "detail": "Fraud event queue is full, please retry", "retry": True})
+        except _ChannelClosed as exc:
+            connection.send({"type": "error", "seq": seq, "detail": exc.reason})
+            connection.send(exc)
+            closing = True
+
+
+async def _send_loop(websocket: WebSocket, connection: ExamSessionConnection) -> None:
+    while True:
+        message = await connection.outbox.get()
+        if isinstance(message, _ChannelClosed):
+            await websocket.close(code=message.code, reason=message.reason)
+            return
+        await websocket.send_json(message)
+        if message["type"] in ("submitted", "force_submit"):
+            await websocket.close(code=1000, reason="Exam session submitted")
+            return
+
+
+async def _timer_loop(connection: ExamSessionConnection, state: _ChannelState) -> None:
+    while True:
+        await asyncio.sleep(settings.EXAM_WS_TIMER_INTERVAL_SECONDS)
+        connection.send(state.timer_message())
+
+
+@router.websocket("/exam-sessions/{session_id}/ws")
+async def exam_session_channel(websocket: WebSocket, session_id: int):
+    """Canal WebSocket de uma sessão de exame em andamento.
+
+    Args:
+        websocket (WebSocket): A conexão WebSocket.
+        session_id (int): O ID da sessão de exame.
+    """
+    await websocket.accept()
+    try:
+        state = await _authenticate(websocket, session_id)
+    except _ChannelClosed as exc:
+        await websocket.close(code=exc.code, reason=exc.reason)
+        return
+    except WebSocketDisconnect:
+        return
+
+    connection = ExamSessionConnection(session_id, state.user_id)
+    exam_session_channels.register(connection)
+    connection.send(state.timer_message("session"))
+    tasks = [
+        asyncio.create_task(_receive_loop(websocket, connection, state)),
+        asyncio.create_task(_send_loop(websocket, connection)),
+        asyncio.create_task(_timer_loop(connection, state)),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        exam_session_channels.unregister(connection)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
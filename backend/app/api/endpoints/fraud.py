@@ -3,18 +3,20 @@
 """Módulo para gerenciar logs de fraude na API.
 
 Este módulo define as rotas da API para operações relacionadas a logs de fraude,
-incluindo a criação de novos registros de fraude.
+incluindo a criação de novos registros de fraude, individualmente ou em lote.
 """
 
-from typing import Any
+from typing import Any, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
-from app.schemas.fraud_log import FraudLogCreate, FraudLog
+from app.core.config import settings
+from app.schemas.fraud_log import FraudLogCreate, FraudLog, FraudLogBatchResult
 from app.models.fraud_log import FraudLog as DBFraudLog
 from app.services.fraud import create_fraud_log
+from app.services.fraud_ingest import fraud_event_queue
 
 # Cria uma instância do APIRouter para definir as rotas da API.
 router = APIRouter()
@@ -31,4 +33,25 @@ def create_fraud_log_endpoint(*, db: Session = Depends(get_db), fraud_log: Fraud
         FraudLog: O log de fraude recém-criado.
     """
     db_fraud_log = create_fraud_log(db=db, fraud_log=fraud_log)
-    return FraudLog.from_orm(db_fraud_log)
\ No newline at end of file
+    return FraudLog.from_orm(db_fraud_log)
+
+@router.post("/batch/", response_model=FraudLogBatchResult, status_code=status.HTTP_202_ACCEPTED)
+def create_fraud_logs_batch_endpoint(*, fraud_logs: List[FraudLogCreate]) -> FraudLogBatchResult:
+    """Enfileira vários eventos de fraude para gravação em lote.
+
+    Os eventos são gravados de forma assíncrona pela fila de ingestão (ver
+    `app.services.fraud_ingest`), normalmente em até `FRAUD_INGEST_FLUSH_INTERVAL_MS`.
+    Se a fila estiver cheia, nenhum evento é aceito e a resposta é 503 com `Retry-After`.
+
+    Args:
+        fraud_logs (List[FraudLogCreate]): Os eventos de fraude.
+
+    Returns:
+        FraudLogBatchResult: O número de eventos aceitos.
+
+    Raises:
+        HTTPException: Se a requisição tiver mais de `FRAUD_INGEST_BATCH_SIZE` eventos (413).
+    """
+    if len(fraud_logs) > settings.FRAUD_INGEST_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many events in one request")
+    return FraudLogBatchResult(accepted=fraud_event_queue.put(fraud_logs))
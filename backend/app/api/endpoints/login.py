@@ -13,10 +13,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_and_update_password
 from app.api import deps
 from app.models.user import User as DBUser
 from app.schemas.user import Token, User as UserSchema
+from app.services.user_cache import user_claims
 
 # Cria um roteador APIRouter para os endpoints de login
 router = APIRouter()
@@ -42,18 +43,29 @@ def login_access_token(
     """
     # Busca o usuário no banco de dados pelo email (username)
     user = db.query(DBUser).filter(DBUser.email == form_data.username).first()
-    # Verifica se o usuário existe e se a senha está correta
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Verifica se o usuário existe e se a senha está correta (bcrypt executado no pool de processos)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
         )
+    valid, new_hash = verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect email or password",
+        )
+    # Refaz o hash quando o custo do bcrypt configurado mudou
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
     # Define o tempo de expiração do token de acesso
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     # Retorna o token de acesso e o tipo do token
     return {
         "access_token": create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={"sub": user.email, **user_claims(user)}, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
     }
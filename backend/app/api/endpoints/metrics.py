@@ -0,0 +1,125 @@
+# backend/app/api/endpoints/metrics.py
+
+"""Módulo de endpoints da API para métricas operacionais.
+
+Expõe o estado do pool de conexões do banco de dados, usado para ajustar
+`DB_POOL_SIZE`/`DB_MAX_OVERFLOW` no Render, os contadores dos caches de
+autenticação, do cache de conteúdo de prova, do buffer de autosave das respostas,
+da fila de ingestão de eventos de fraude, dos canais WebSocket, do cronômetro das
+sessões de exame, da fila de correção assíncrona e do recálculo das estatísticas dos exames.
+
+Todas as rotas exigem um usuário autenticado com um dos papéis de `METRICS_ROLES`.
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core import database
+from app.core.pool import pool_status
+from app.core.security import token_cache
+from app.services.autosave import autosave_buffer
+from app.services.exam_analytics import count_stale_exams, exam_analytics_refresher
+from app.services.exam_channels import exam_session_channels
+from app.services.exam_content import exam_content_cache
+from app.services.fraud_ingest import fraud_event_queue
+from app.services.grading_jobs import count_grading_jobs, grading_workers
+from app.services.session_timer import session_deadlines
+from app.services.user_cache import user_cache
+
+# Cria um roteador APIRouter para os endpoints de métricas, restrito aos papéis de METRICS_ROLES
+router = APIRouter(dependencies=[Depends(deps.get_metrics_user)])
+
+@router.get("/db-pool")
+def read_db_pool_metrics() -> Any:
+    """Retorna as métricas dos pools de conexões (síncrono e, se ativado, assíncrono).
+
+    Returns:
+        Any: Conexões em uso, overflow, checkouts e tempos de espera de cada pool.
+    """
+    metrics = {"sync": pool_status(database.engine.pool)}
+    if database.async_engine is not None:
+        metrics["async"] = pool_status(database.async_engine.sync_engine.pool)
+    return metrics
+
+
+@router.get("/auth-cache")
+def read_auth_cache_metrics() -> Any:
+    """Retorna tamanho e acertos/faltas dos caches de tokens verificados e de usuários.
+
+    Returns:
+        Any: Estatísticas de `token_cache` e `user_cache`.
+    """
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+@router.get("/exam-content-cache")
+def read_exam_content_cache_metrics() -> Any:
+    """Retorna tamanho e acertos/faltas do cache de conteúdo de prova.
+
+    Returns:
+        Any: Estatísticas de `exam_content_cache`.
+    """
+    return exam_content_cache.stats()
+
+
+@router.get("/autosave")
+def read_autosave_metrics() -> Any:
+    """Retorna o tamanho e os contadores do buffer de autosave das respostas.
+
+    Returns:
+        Any: Respostas pendentes, recebidas, gravadas e descartadas, e número de gravações em lote.
+    """
+    return autosave_buffer.stats()
+
+
+@router.get("/fraud-ingest")
+def read_fraud_ingest_metrics() -> Any:
+    """Retorna a profundidade e os contadores da fila de ingestão de eventos de fraude.
+
+    Returns:
+        Any: Eventos pendentes, aceitos, recusados, gravados e descartados, e a latência das gravações em lote.
+    """
+    return fraud_event_queue.stats()
+
+
+@router.get("/exam-channels")
+def read_exam_channel_metrics() -> Any:
+    """Retorna o número de conexões WebSocket abertas e de mensagens publicadas pelo servidor.
+
+    Returns:
+        Any: Estatísticas de `exam_session_channels`.
+    """
+    return exam_session_channels.stats()
+
+
+@router.get("/session-timer")
+def read_session_timer_metrics() -> Any:
+    """Retorna os prazos agendados e os contadores da submissão automática por fim do tempo.
+
+    Returns:
+        Any: Estatísticas de `session_deadlines`.
+    """
+    return session_deadlines.stats()
+
+
+@router.get("/grading-jobs")
+def read_grading_job_metrics(db: Session = Depends(deps.get_db)) -> Any:
+    """Retorna os jobs de correção por status e os contadores dos workers deste processo.
+
+    Returns:
+        Any: Contagem da tabela `grading_jobs` por status e estatísticas de `grading_workers`.
+    """
+    return {"jobs": count_grading_jobs(db), "workers": grading_workers.stats()}
+
+
+@router.get("/exam-analytics")
+def read_exam_analytics_metrics(db: Session = Depends(deps.get_db)) -> Any:
+    """Retorna os exames com estatísticas desatualizadas e os contadores do recálculo deste processo.
+
+    Returns:
+        Any: Número de exames marcados no banco e estatísticas de `exam_analytics_refresher`.
+    """
+    return {"stale_exams": count_stale_exams(db), "refresher": exam_analytics_refresher.stats()}
@@ -1,5 +1,7 @@
 # backend/app/core/config.py
 
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -11,7 +13,86 @@ class Settings(BaseSettings):
     SECRET_KEY: str 
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Custo do bcrypt; hashes com outro custo são refeitos no próximo login.
+    BCRYPT_ROUNDS: int = 12
+    # Processos do pool de hashing de senhas (None = número de CPUs; 0 = executa na thread da requisição).
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    # Operações de hashing em execução ou na fila antes de recusar novas (503).
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 10.0
+    # Número máximo de tokens JWT verificados mantidos em cache.
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Cache de usuários autenticados em get_current_user.
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Papéis com acesso aos endpoints de /metrics (lista JSON no ambiente).
+    METRICS_ROLES: List[str] = ["teacher", "admin"]
     DATABASE_URL: str = "sqlite+pysqlite:///./app.db"
+    # Pool de conexões (ignorado pelo SQLite em memória).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30 # Segundos aguardando uma conexão livre antes de falhar
+    DB_POOL_RECYCLE: int = 1800 # Segundos até reciclar uma conexão (-1 desativa)
+    DB_POOL_PRE_PING: bool = True
+    # Timeout de comandos em milissegundos (apenas Postgres; None desativa).
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    # Camada assíncrona de banco de dados (SQLAlchemy AsyncSession com asyncpg/aiosqlite).
+    # Quando ativada, as rotas do fluxo de realização de provas passam a usar `async def`.
+    ASYNC_DATABASE_ENABLED: bool = False
+    # URL assíncrona explícita; se vazia, é derivada de DATABASE_URL.
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Autosave das respostas. False grava cada resposta no banco imediatamente (write-through).
+    # True acumula as respostas em memória e as grava em lotes (write-behind); se o processo
+    # cair, podem ser perdidas até AUTOSAVE_FLUSH_INTERVAL_SECONDS segundos de respostas.
+    AUTOSAVE_WRITE_BEHIND: bool = False
+    AUTOSAVE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    # Respostas pendentes a partir das quais a gravação é antecipada na própria requisição.
+    AUTOSAVE_MAX_PENDING: int = 10000
+    # Gravações seguidas com falha após as quais as respostas pendentes de uma sessão são descartadas.
+    AUTOSAVE_MAX_FLUSH_ATTEMPTS: int = 5
+    # Respostas por comando de upsert (limita os parâmetros por comando; o SQLite aceita até 32766).
+    AUTOSAVE_UPSERT_CHUNK_SIZE: int = 1000
+    # Respostas aceitas por envio em lote (POST .../responses/batch/ e mensagens do WebSocket).
+    EXAM_RESPONSE_BATCH_MAX_SIZE: int = 500
+    # Cache do conteúdo de prova entregue aos alunos (exame + questões sem gabarito).
+    EXAM_CONTENT_CACHE_TTL_SECONDS: int = 300
+    EXAM_CONTENT_CACHE_MAX_SIZE: int = 256
+    # Ingestão em lote de eventos de fraude (POST /fraud/batch/): intervalo entre gravações,
+    # tamanho máximo de cada INSERT em lote e eventos aguardando gravação antes de recusar novos (503).
+    FRAUD_INGEST_FLUSH_INTERVAL_MS: int = 200
+    FRAUD_INGEST_BATCH_SIZE: int = 500
+    FRAUD_INGEST_MAX_PENDING: int = 50000
+    # Cronômetro no servidor: submete automaticamente as sessões de exames com duração ao fim do prazo.
+    # Tolerância após o prazo e número máximo de sessões submetidas por lote.
+    SESSION_TIMER_ENABLED: bool = True
+    SESSION_TIMER_GRACE_SECONDS: float = 5.0
+    SESSION_TIMER_BATCH_SIZE: int = 500
+    # Correção incremental: respostas a questões objetivas são corrigidas ao serem salvas e a pontuação
+    # parcial da sessão é mantida; em exames só com questões objetivas, a submissão não corrige nada.
+    INCREMENTAL_SCORING: bool = True
+    # Correção assíncrona: a submissão apenas enfileira um job na tabela grading_jobs, executado
+    # por GRADING_WORKERS threads. False corrige a sessão na própria requisição de submissão.
+    GRADING_JOBS_ENABLED: bool = True
+    GRADING_WORKERS: int = 2
+    GRADING_JOB_BATCH_SIZE: int = 100 # Jobs assumidos por vez por um worker
+    GRADING_JOB_POLL_SECONDS: float = 1.0 # Espera de um worker ocioso antes de consultar a fila novamente
+    GRADING_JOB_MAX_ATTEMPTS: int = 5 # Tentativas antes de marcar o job como 'failed'
+    GRADING_JOB_RETRY_BACKOFF_SECONDS: float = 2.0 # Espera antes da 2ª tentativa, dobrada a cada nova falha
+    GRADING_JOB_TIMEOUT_SECONDS: int = 300 # Jobs 'running' há mais tempo que isso são reassumidos
+    # Estatísticas pré-calculadas dos exames: intervalo entre os recálculos dos exames corrigidos
+    # desde a última passagem, exames marcados no banco recalculados por passagem e faixas do histograma.
+    EXAM_ANALYTICS_ENABLED: bool = True
+    EXAM_ANALYTICS_REFRESH_SECONDS: float = 10.0
+    EXAM_ANALYTICS_BATCH_SIZE: int = 50
+    EXAM_ANALYTICS_HISTOGRAM_BINS: int = 10
+    # Linhas lidas por vez do cursor no servidor na exportação dos resultados de um exame.
+    EXPORT_YIELD_PER: int = 1000
+    # Canal WebSocket das sessões de exame: prazo para a mensagem de autenticação e
+    # intervalo entre as mensagens de tempo enviadas pelo servidor.
+    EXAM_WS_AUTH_TIMEOUT_SECONDS: float = 10.0
+    EXAM_WS_TIMER_INTERVAL_SECONDS: float = 15.0
+    # Usa ORJSONResponse como classe de resposta padrão (requer o pacote orjson).
+    ORJSON_RESPONSES: bool = True
 
     class Config:
         case_sensitive = True
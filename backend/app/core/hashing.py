@@ -0,0 +1,94 @@
+# backend/app/core/hashing.py
+
+"""Execução do hashing de senhas (bcrypt) em um pool de processos dedicado.
+
+O bcrypt é intencionalmente custoso em CPU (~250 ms por operação no custo
+padrão). Executá-lo em um pool de processos tira esse trabalho das threads de
+requisição e do GIL, de modo que a vazão de logins escala com o número de
+núcleos. A fila é limitada: se houver mais de `PASSWORD_HASH_MAX_PENDING`
+operações aguardando por mais de `PASSWORD_HASH_QUEUE_TIMEOUT` segundos, a
+operação falha com `PasswordHashingBusy`.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+class PasswordHashingBusy(RuntimeError):
+    """A fila do pool de hashing de senhas está cheia."""
+
+
+@lru_cache(maxsize=None)
+def get_crypt_context(rounds: int) -> CryptContext:
+    """Retorna o contexto bcrypt para o custo informado (um por processo)."""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """Gera o hash bcrypt de uma senha. Executado nos processos do pool."""
+    return get_crypt_context(rounds).hash(password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha e, se o hash usar outro custo, retorna um novo hash.
+
+    Executado nos processos do pool.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Se a senha confere e o novo hash (ou None).
+    """
+    return get_crypt_context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Pool de processos com fila limitada para operações de hashing de senha.
+
+    Atributos:
+        workers (int): Número de processos; 0 executa as operações na própria thread.
+        max_pending (int): Número máximo de operações em execução ou na fila.
+        queue_timeout (float): Tempo máximo, em segundos, aguardando espaço na fila.
+    """
+
+    def __init__(self, workers: int, max_pending: int, queue_timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def run(self, fn, *args):
+        """Executa `fn(*args)` no pool, aguardando o resultado."""
+        if self.workers == 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHashingBusy("Too many pending password hashing operations")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """Encerra os processos do pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def default_workers(configured: Optional[int]) -> int:
+    """Número de processos do pool: o configurado ou o número de CPUs."""
+    if configured is not None:
+        return configured
+    return os.cpu_count() or 1
@@ -0,0 +1,70 @@
+# backend/app/core/pagination.py
+
+"""Paginação por cursor (keyset) das listagens da API.
+
+As listagens são ordenadas por `id` e aceitam um cursor opaco (`?cursor=`),
+que retoma a leitura a partir do último `id` da página anterior com
+`WHERE id > :ultimo_id`, em vez de `OFFSET`. O custo por página fica constante
+e a paginação não pula nem repete itens quando há inserções concorrentes.
+
+O corpo das respostas continua sendo a lista de itens (compatível com
+`skip`/`limit`); o cursor da próxima página vai no cabeçalho `X-Next-Cursor`,
+ausente na última página.
+"""
+
+import base64
+import binascii
+import json
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Gera o cursor opaco que aponta para depois do item `last_id`."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Extrai o último `id` de um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor (Optional[str]): O cursor recebido na requisição.
+
+    Raises:
+        HTTPException: Se o cursor for inválido (400).
+
+    Returns:
+        Optional[int]: O `id` a partir do qual continuar, ou None sem cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        last_id = data["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_id = None
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return last_id
+
+
+def paginate(response: Response, items: List, limit: int) -> List:
+    """Corta uma página consultada com `limit + 1` itens e define o cursor da próxima.
+
+    Args:
+        response (Response): A resposta HTTP, onde o cabeçalho `X-Next-Cursor` é definido.
+        items (List): Os itens consultados (até `limit + 1`), ordenados por `id`.
+        limit (int): O tamanho da página.
+
+    Returns:
+        List: Os itens da página.
+    """
+    if len(items) > limit:
+        items = items[:limit]
+        if items:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].id)
+    return items
@@ -0,0 +1,89 @@
+# backend/app/core/responses.py
+
+"""Serialização das respostas JSON da API.
+
+Por padrão, o FastAPI valida o retorno de cada rota contra o `response_model`,
+converte o modelo em dicionário (`field.serialize`) e só então o codifica com
+`json.dumps`. Para respostas grandes (exames com muitas questões, listagens),
+esse caminho em Python domina o tempo da requisição.
+
+Este módulo oferece:
+
+- `default_response_class`: a classe de resposta padrão da aplicação,
+  `ORJSONResponse` quando `ORJSON_RESPONSES` está ativo e o `orjson` está
+  instalado, ou `JSONResponse` caso contrário;
+- `json_response`: um caminho rápido, adotado explicitamente pelas rotas de
+  leitura mais pesadas, que valida os objetos ORM no schema e gera o JSON
+  diretamente no pydantic-core (`TypeAdapter.dump_json`), sem o dicionário
+  intermediário nem a segunda validação do FastAPI. O `response_model` da rota
+  continua documentando a resposta no OpenAPI.
+"""
+
+from functools import lru_cache
+from typing import Any, List, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """Retorna a classe de resposta JSON padrão da aplicação."""
+    if settings.ORJSON_RESPONSES and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel], many: bool) -> TypeAdapter:
+    return TypeAdapter(List[schema] if many else schema)
+
+
+def dump_json(schema: Type[BaseModel], obj: Any, exclude_unset: bool = False) -> bytes:
+    """Valida objetos ORM (ou uma lista deles) no schema e os serializa em JSON.
+
+    Args:
+        schema (Type[BaseModel]): O schema de resposta.
+        obj (Any): O objeto, ou a lista de objetos, a serializar.
+        exclude_unset (bool): Omite os campos não preenchidos, como `response_model_exclude_unset`.
+
+    Returns:
+        bytes: O corpo JSON da resposta.
+    """
+    adapter = _adapter(schema, isinstance(obj, list))
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True), exclude_unset=exclude_unset)
+
+
+def json_response(
+    schema: Type[BaseModel],
+    obj: Any,
+    response: Optional[Response] = None,
+    exclude_unset: bool = False,
+    status_code: int = 200,
+) -> Response:
+    """Monta a resposta HTTP com o JSON gerado por `dump_json`.
+
+    Args:
+        schema (Type[BaseModel]): O schema de resposta.
+        obj (Any): O objeto, ou a lista de objetos, a serializar.
+        response (Optional[Response]): A resposta injetada na rota, cujos cabeçalhos
+            (ex: `X-Next-Cursor`) são copiados para a resposta final.
+        exclude_unset (bool): Omite os campos não preenchidos.
+        status_code (int): O código de status HTTP.
+
+    Returns:
+        Response: A resposta com o corpo JSON.
+    """
+    return Response(
+        content=dump_json(schema, obj, exclude_unset=exclude_unset),
+        status_code=status_code,
+        headers=response.headers if response is not None else None,
+        media_type="application/json",
+    )
@@ -6,16 +6,29 @@ Este módulo fornece funções para hashing e verificação de senhas,
 além de criação e decodificação de tokens de acesso JWT.
 """
 
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
+from app.core import hashing
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-# Contexto para hashing de senhas usando o algoritmo bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto para hashing de senhas usando o algoritmo bcrypt com o custo configurado
+pwd_context = hashing.get_crypt_context(settings.BCRYPT_ROUNDS)
+
+# Pool de processos dedicado ao bcrypt, com fila limitada
+password_hasher = hashing.PasswordHasher(
+    workers=hashing.default_workers(settings.PASSWORD_HASH_WORKERS),
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
+
+# Cache de tokens já verificados: hash do token -> payload, expirando junto com o token.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se uma senha em texto plano corresponde a uma senha hash.
@@ -27,7 +40,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True se as senhas corresponderem, False caso contrário.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica uma senha e indica se o hash armazenado deve ser refeito.
+
+    A verificação é executada no pool de processos de hashing. Quando a senha
+    confere mas o hash usa um custo diferente de `BCRYPT_ROUNDS`, um novo hash
+    com o custo atual é retornado para ser gravado (rehash transparente no login).
+
+    Args:
+        plain_password (str): A senha em texto plano fornecida pelo usuário.
+        hashed_password (str): A senha hash armazenada no banco de dados.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Se a senha confere e o novo hash, ou None se não for necessário.
+    """
+    return password_hasher.run(hashing.verify_and_update, plain_password, hashed_password, settings.BCRYPT_ROUNDS)
 
 def get_password_hash(password: str) -> str:
     """Gera um hash de uma senha em texto plano.
@@ -38,7 +67,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: O hash da senha.
     """
-    return pwd_context.hash(password)
+    return password_hasher.run(hashing.hash_password, password, settings.BCRYPT_ROUNDS)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Cria um token de acesso JWT.
@@ -56,21 +85,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str):
     """Decodifica um token de acesso JWT.
 
+    Tokens já verificados são servidos do `token_cache` (indexado pelo hash
+    SHA-256 do token) até o instante `exp`, sem repetir a verificação da
+    assinatura nem o parse dos claims.
+
     Args:
         token (str): O token JWT a ser decodificado.
 
     Returns:
         Optional[dict]: O payload do token se for válido, None caso contrário.
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return dict(payload)
+        token_cache.pop(cache_key)
+        return None
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(cache_key, payload, ttl=expires_in)
+    return dict(payload)
@@ -8,11 +8,22 @@ e inclui os roteadores da API.
 
 from dotenv import load_dotenv
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.config import settings
-from app.models import user, fraud_log, exam, exam_session
+from app.core import database
+from app.core.hashing import PasswordHashingBusy
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import default_response_class
+from app.core.security import password_hasher
+from app.services.autosave import autosave_buffer
+from app.services.exam_analytics import exam_analytics_refresher
+from app.services.fraud_ingest import FraudQueueFull, fraud_event_queue
+from app.services.grading_jobs import grading_workers
+from app.services.session_timer import session_deadlines
+from app.models import user, fraud_log, exam, exam_session, grading_job, exam_analytics
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -20,7 +31,8 @@ load_dotenv()
 # Inicializa a aplicação FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME, # Título do projeto obtido das configurações
-    openapi_url=f"{settings.API_V1_STR}/openapi.json" # URL para a documentação OpenAPI
+    openapi_url=f"{settings.API_V1_STR}/openapi.json", # URL para a documentação OpenAPI
+    default_response_class=default_response_class() # ORJSONResponse se ORJSON_RESPONSES estiver ativo e o orjson instalado
 )
 
 # Lista de origens permitidas para o CORS
@@ -41,13 +53,97 @@ app.add_middleware(
     allow_origins=origins, # Permite requisições das origens listadas
     allow_credentials=True, # Permite o envio de cookies em requisições cross-origin
     allow_methods=["GET", "POST", "PUT", "DELETE"], # Métodos HTTP permitidos
-    allow_headers=["*"] # Permite todos os cabeçalhos em requisições cross-origin
+    allow_headers=["*"], # Permite todos os cabeçalhos em requisições cross-origin
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"] # Cursor da próxima página e ETag do conteúdo de prova
 )
 
 # Inclui o roteador principal da API com um prefixo
 # Todos os endpoints definidos em api_router serão acessíveis sob este prefixo
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Responde 503 quando a fila do pool de hashing de senhas está cheia."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(FraudQueueFull)
+async def fraud_queue_full_handler(request: Request, exc: FraudQueueFull):
+    """Responde 503 quando a fila de ingestão de eventos de fraude está cheia."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Fraud event queue is full, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.on_event("startup")
+def start_autosave_flush():
+    """Inicia a gravação periódica do buffer de autosave (quando o write-behind está ativo)."""
+    if settings.AUTOSAVE_WRITE_BEHIND:
+        autosave_buffer.start(database.SessionLocal, settings.AUTOSAVE_FLUSH_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+def start_fraud_ingest_flush():
+    """Inicia a gravação em lote dos eventos de fraude enfileirados."""
+    fraud_event_queue.start(database.SessionLocal, settings.FRAUD_INGEST_FLUSH_INTERVAL_MS / 1000)
+
+@app.on_event("startup")
+def start_session_timer():
+    """Carrega os prazos das sessões em andamento e inicia a submissão automática ao fim do tempo."""
+    if settings.SESSION_TIMER_ENABLED:
+        session_deadlines.start(database.SessionLocal)
+
+@app.on_event("startup")
+def start_grading_workers():
+    """Inicia os workers que executam os jobs de correção enfileirados na submissão."""
+    if settings.GRADING_JOBS_ENABLED:
+        grading_workers.start(database.SessionLocal, settings.GRADING_JOB_POLL_SECONDS)
+
+@app.on_event("startup")
+def start_exam_analytics_refresh():
+    """Inicia o recálculo periódico das estatísticas dos exames corrigidos."""
+    if settings.EXAM_ANALYTICS_ENABLED:
+        exam_analytics_refresher.start(database.SessionLocal, settings.EXAM_ANALYTICS_REFRESH_SECONDS)
+
+@app.on_event("shutdown")
+def stop_session_timer():
+    """Interrompe o agendador de prazos das sessões de exame."""
+    session_deadlines.stop()
+
+@app.on_event("shutdown")
+def stop_grading_workers():
+    """Interrompe os workers de correção; os jobs pendentes continuam na tabela grading_jobs."""
+    grading_workers.stop()
+
+@app.on_event("shutdown")
+def stop_exam_analytics_refresh():
+    """Interrompe o recálculo das estatísticas; os exames marcados no banco são recalculados na próxima inicialização."""
+    exam_analytics_refresher.stop()
+
+@app.on_event("shutdown")
+def flush_autosave_buffer():
+    """Grava as respostas pendentes no buffer de autosave ao encerrar a aplicação."""
+    autosave_buffer.stop(database.SessionLocal)
+
+@app.on_event("shutdown")
+def flush_fraud_event_queue():
+    """Grava os eventos de fraude pendentes ao encerrar a aplicação."""
+    fraud_event_queue.stop(database.SessionLocal)
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """Fecha as conexões do engine assíncrono (quando ativado) ao encerrar a aplicação."""
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    """Encerra o pool de processos de hashing de senhas."""
+    password_hasher.shutdown()
+
 @app.get("/")
 async def read_root():
     """Endpoint raiz da API.
@@ -24,9 +24,14 @@ class Exam(Base):
         updated_at (datetime): Carimbo de data/hora da última atualização do exame.
         is_active (bool): Indica se o exame está ativo (padrão: True).
         owner_id (int): ID do usuário proprietário do exame (chave estrangeira para `users.id`).
+        duration_minutes (int, optional): Duração da prova em minutos, contada a partir do início de cada
+            sessão; as sessões são submetidas automaticamente ao fim do prazo. Sem limite se nulo.
+        content_version (int): Versão do conteúdo do exame, incrementada a cada alteração no exame ou
+            nas suas questões; valida os gabaritos compilados em cache em todos os processos.
 
         owner (User): Relacionamento com o modelo `User` que é o proprietário do exame.
         questions (List[Question]): Relacionamento com as questões associadas a este exame.
+        question_count (int): Número de questões do exame.
     """
     __tablename__ = "exams"
 
@@ -36,13 +41,19 @@ class Exam(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    duration_minutes = Column(Integer, nullable=True)
+    content_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relacionamento com o usuário proprietário do exame.
     owner = relationship("User", backref="exams")
     # Relacionamento com as questões do exame, com exclusão em cascata.
     questions = relationship("Question", back_populates="exam", cascade="all, delete-orphan")
 
+    @property
+    def question_count(self) -> int:
+        return len(self.questions)
+
 
 class Question(Base):
     """Modelo de banco de dados para uma Questão de Exame.
@@ -63,7 +74,7 @@ class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    exam_id = Column(Integer, ForeignKey("exams.id"))
+    exam_id = Column(Integer, ForeignKey("exams.id"), index=True)
     content = Column(String)
     question_type = Column(String) # Ex: 'multiple_choice', 'essay'
     options = Column(JSON, nullable=True) # JSON para opções de múltipla escolha
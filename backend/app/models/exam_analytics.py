@@ -0,0 +1,94 @@
+"""Módulo que define os modelos de banco de dados das estatísticas pré-calculadas dos exames.
+
+As tabelas `exam_analytics` e `question_analytics` guardam, por exame e por
+questão, as estatísticas das sessões já corrigidas. Elas são recalculadas em
+segundo plano após a correção (ver `app.services.exam_analytics`), de modo que
+a consulta das estatísticas não percorre as respostas.
+"""
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, text
+from sqlalchemy.types import JSON
+from sqlalchemy.orm import backref, relationship
+
+from app.core.database import Base
+
+
+class ExamAnalytics(Base):
+    """Modelo de banco de dados para as estatísticas de um exame.
+
+    Atributos:
+        exam_id (int): ID do exame (chave primária e estrangeira para `exams.id`).
+        generation (int): Contador incrementado a cada correção que altera as estatísticas.
+        refreshed_generation (int): Valor de `generation` considerado no último cálculo;
+            as estatísticas estão desatualizadas enquanto for menor que `generation`.
+        session_count (int): Número de sessões corrigidas consideradas.
+        max_points (float): Pontuação máxima do exame (soma dos pontos das questões).
+        mean_score (float, optional): Média das pontuações.
+        stddev_score (float, optional): Desvio padrão (populacional) das pontuações.
+        min_score (float, optional): Menor pontuação.
+        max_score (float, optional): Maior pontuação.
+        percentiles (dict, optional): Percentis das pontuações (ex: {"p50": 7.0}).
+        histogram (list, optional): Faixas do histograma das pontuações ({"lower", "upper", "count"}).
+        refreshed_at (datetime, optional): Carimbo de data/hora do último cálculo.
+
+        exam (Exam): Relacionamento com o exame.
+    """
+    __tablename__ = "exam_analytics"
+    __table_args__ = (
+        # Busca dos exames desatualizados pela thread de recálculo.
+        Index(
+            "ix_exam_analytics_stale", "exam_id",
+            postgresql_where=text("refreshed_generation < generation"),
+            sqlite_where=text("refreshed_generation < generation"),
+        ),
+    )
+
+    exam_id = Column(Integer, ForeignKey("exams.id"), primary_key=True)
+    generation = Column(Integer, default=0, nullable=False)
+    refreshed_generation = Column(Integer, default=0, nullable=False)
+    session_count = Column(Integer, default=0, nullable=False)
+    max_points = Column(Float, default=0.0, nullable=False)
+    mean_score = Column(Float, nullable=True)
+    stddev_score = Column(Float, nullable=True)
+    min_score = Column(Float, nullable=True)
+    max_score = Column(Float, nullable=True)
+    percentiles = Column(JSON, nullable=True)
+    histogram = Column(JSON, nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relacionamento com o exame; as estatísticas são removidas junto com ele.
+    exam = relationship("Exam", backref=backref("analytics", uselist=False, cascade="all, delete-orphan"))
+
+    @property
+    def stale(self) -> bool:
+        return self.refreshed_generation < self.generation
+
+
+class QuestionAnalytics(Base):
+    """Modelo de banco de dados para as estatísticas de uma questão.
+
+    Atributos:
+        question_id (int): ID da questão (chave primária e estrangeira para `questions.id`).
+        exam_id (int): ID do exame da questão (chave estrangeira para `exams.id`).
+        response_count (int): Número de sessões corrigidas que responderam a questão.
+        correct_count (int): Número de respostas corretas.
+        correct_rate (float, optional): Proporção de acertos entre as sessões corrigidas
+            (índice de dificuldade; questões não respondidas contam como erro).
+        discrimination (float, optional): Correlação ponto-bisserial entre o acerto da
+            questão e a pontuação da sessão; nula se todos acertaram ou todos erraram.
+        option_counts (dict, optional): Número de respostas por alternativa, nas questões objetivas.
+
+        question (Question): Relacionamento com a questão.
+    """
+    __tablename__ = "question_analytics"
+
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), index=True, nullable=False)
+    response_count = Column(Integer, default=0, nullable=False)
+    correct_count = Column(Integer, default=0, nullable=False)
+    correct_rate = Column(Float, nullable=True)
+    discrimination = Column(Float, nullable=True)
+    option_counts = Column(JSON, nullable=True)
+
+    # Relacionamento com a questão; as estatísticas são removidas junto com ela.
+    question = relationship("Question", backref=backref("analytics", uselist=False, cascade="all, delete-orphan"))
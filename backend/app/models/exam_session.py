@@ -5,9 +5,9 @@ Este módulo contém as definições das tabelas `exam_sessions` e `exam_respons
 utilizando SQLAlchemy ORM para mapeamento de objetos-relacional.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
@@ -27,12 +27,22 @@ class ExamSession(Base):
         exam (Exam): Relacionamento com o modelo `Exam` associado a esta sessão.
         user (User): Relacionamento com o modelo `User` que é o proprietário desta sessão.
         responses (List[ExamResponse]): Relacionamento com as respostas enviadas nesta sessão.
+        response_count (int): Número de respostas enviadas nesta sessão.
     """
     __tablename__ = "exam_sessions"
+    __table_args__ = (
+        # Sessões de um exame por status (correção em lote).
+        Index("ix_exam_sessions_exam_id_status", "exam_id", "status"),
+        # No máximo uma sessão ativa por usuário e exame; também atende `get_active_exam_session`.
+        Index(
+            "uq_exam_sessions_active_user_exam", "user_id", "exam_id", unique=True,
+            postgresql_where=text("is_active = true"), sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("exams.id"))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True)
@@ -46,6 +56,10 @@ class ExamSession(Base):
     # Relacionamento com as respostas enviadas nesta sessão, com exclusão em cascata.
     responses = relationship("ExamResponse", back_populates="session", cascade="all, delete-orphan")
 
+    @property
+    def response_count(self) -> int:
+        return len(self.responses)
+
 
 class ExamResponse(Base):
     """Modelo de banco de dados para uma Resposta de Exame.
@@ -63,6 +77,10 @@ class ExamResponse(Base):
         question (Question): Relacionamento com o modelo `Question` ao qual esta resposta se refere.
     """
     __tablename__ = "exam_responses"
+    # Uma única resposta (a mais recente) por questão em cada sessão; usado pelo upsert das respostas.
+    __table_args__ = (
+        Index("uq_exam_responses_session_question", "session_id", "question_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("exam_sessions.id"))
@@ -22,7 +22,7 @@ class FraudLog(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    session_id = Column(Integer, ForeignKey("exam_sessions.id"))
+    session_id = Column(Integer, ForeignKey("exam_sessions.id"), index=True)
     event_type = Column(String, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     details = Column(String, nullable=True)
@@ -0,0 +1,50 @@
+"""Módulo que define o modelo de banco de dados para os jobs de correção.
+
+A tabela `grading_jobs` é a fila durável da correção assíncrona das sessões
+submetidas (ver `app.services.grading_jobs`).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class GradingJob(Base):
+    """Modelo de banco de dados para um job de correção de uma sessão de exame.
+
+    Atributos:
+        id (int): Identificador único do job (chave primária).
+        session_id (int): ID da sessão de exame a corrigir (único: no máximo um job por sessão).
+        status (str): Status do job ('pending', 'running', 'done' ou 'failed').
+        attempts (int): Número de tentativas já iniciadas.
+        run_after (datetime): Instante a partir do qual o job pode ser executado (adiado nas novas tentativas).
+        locked_by (str, optional): Identificador do worker que está executando o job.
+        locked_at (datetime, optional): Instante em que o job foi assumido pelo worker.
+        last_error (str, optional): Mensagem do último erro.
+        created_at (datetime): Carimbo de data/hora de criação do job.
+        updated_at (datetime): Carimbo de data/hora da última atualização do job.
+
+        exam_session (ExamSession): Relacionamento com a sessão de exame.
+    """
+    __tablename__ = "grading_jobs"
+    __table_args__ = (
+        # Busca dos próximos jobs a executar.
+        Index("ix_grading_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("exam_sessions.id"), unique=True, nullable=False)
+    status = Column(String, default="pending", nullable=False)  # pending, running, done, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # UTC, comparado com datetime.utcnow()
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)  # UTC
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    exam_session = relationship("ExamSession")
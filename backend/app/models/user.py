@@ -17,6 +17,8 @@ class User(Base):
         hashed_password (str): Senha do usuário com hash.
         is_active (bool): Indica se o usuário está ativo (padrão: True).
         role (str): Papel do usuário (ex: 'student', 'teacher'). Padrão: 'student'.
+        token_version (int): Versão dos tokens de acesso do usuário, incrementada a cada alteração de
+            papel, status ou e-mail; tokens emitidos com outra versão são recusados.
     """
     __tablename__ = "users"
 
@@ -24,4 +26,5 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
-    role = Column(String, default="student")
\ No newline at end of file
+    role = Column(String, default="student")
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
\ No newline at end of file
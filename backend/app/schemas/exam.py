@@ -2,7 +2,7 @@
 
 from typing import List, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class QuestionBase(BaseModel):
@@ -32,7 +32,7 @@ class Question(QuestionBase):
     id: int
     exam_id: int
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -42,6 +42,7 @@ class ExamBase(BaseModel):
     """Schema base para um exame."""
     title: str
     description: Optional[str] = None
+    duration_minutes: Optional[int] = Field(None, gt=0)
 
 
 class ExamCreate(ExamBase):
@@ -61,9 +62,50 @@ class Exam(ExamBase):
     id: int
     owner_id: int
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
     is_active: bool
     questions: List[Question] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ExamSummary(ExamBase):
+    """Schema resumido de um exame para listagens.
+
+    `questions` só é incluído quando solicitado com `?expand=questions`.
+    """
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    is_active: bool
+    question_count: int
+    questions: Optional[List[Question]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StudentQuestion(BaseModel):
+    """Schema de uma questão como entregue ao aluno durante a prova (sem o gabarito)."""
+    id: int
+    content: str
+    question_type: str
+    options: Optional[Any] = None
+    validation_rules: Optional[Any] = None
+    points: int = 1
+
+    class Config:
+        from_attributes = True
+
+
+class StudentExam(BaseModel):
+    """Schema do conteúdo de um exame como entregue ao aluno durante a prova."""
+    id: int
+    title: str
+    description: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    questions: List[StudentQuestion] = []
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,53 @@
+"""Módulo que define os schemas Pydantic para as estatísticas pré-calculadas dos exames."""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class ScoreHistogramBin(BaseModel):
+    """Schema para uma faixa do histograma das pontuações ([lower, upper); a última inclui `upper`)."""
+    lower: float
+    upper: float
+    count: int
+
+
+class QuestionAnalytics(BaseModel):
+    """Schema para as estatísticas de uma questão.
+
+    `correct_rate` é a proporção de acertos entre as sessões corrigidas e
+    `discrimination`, a correlação ponto-bisserial entre o acerto e a pontuação
+    da sessão. `option_counts` só é preenchido nas questões objetivas.
+    """
+    question_id: int
+    response_count: int
+    correct_count: int
+    correct_rate: Optional[float] = None
+    discrimination: Optional[float] = None
+    option_counts: Optional[Dict[str, int]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ExamAnalytics(BaseModel):
+    """Schema para as estatísticas de um exame, calculadas sobre as sessões corrigidas.
+
+    `stale` indica que há sessões corrigidas depois do último cálculo; elas são
+    incluídas no próximo recálculo em segundo plano.
+    """
+    exam_id: int
+    session_count: int = 0
+    max_points: float = 0.0
+    mean_score: Optional[float] = None
+    stddev_score: Optional[float] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    percentiles: Optional[Dict[str, float]] = None
+    histogram: Optional[List[ScoreHistogramBin]] = None
+    stale: bool = False
+    refreshed_at: Optional[datetime] = None
+    questions: List[QuestionAnalytics] = []
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,8 @@
 """Módulo que define os schemas Pydantic para sessões de exame e respostas."""
 
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 
 class ExamResponseBase(BaseModel):
@@ -16,9 +16,18 @@ class ExamResponseCreate(ExamResponseBase):
     pass
 
 
+class ExamResponseBatchResult(BaseModel):
+    """Schema para o resultado do envio de um lote de respostas."""
+    session_id: int
+    saved: int
+
+
 class ExamResponse(ExamResponseBase):
-    """Schema para representação completa de uma resposta de questão, incluindo metadados."""
-    id: int
+    """Schema para representação completa de uma resposta de questão, incluindo metadados.
+
+    `id` é nulo enquanto a resposta aguarda no buffer de autosave (write-behind).
+    """
+    id: Optional[int] = None
     session_id: int
     is_correct: Optional[bool] = None
     points_earned: Optional[int] = None
@@ -28,6 +37,17 @@ class ExamResponse(ExamResponseBase):
         from_attributes = True
 
 
+def _hide_running_score(session: BaseModel) -> BaseModel:
+    # Com a correção incremental, a nota parcial e a correção das respostas de uma
+    # sessão em andamento não são expostas ao aluno (ver `ExamSessionProgress` para o professor).
+    if session.status == "in_progress":
+        session.score = None
+        for response in session.responses or ():
+            response.is_correct = None
+            response.points_earned = None
+    return session
+
+
 class ExamSessionBase(BaseModel):
     """Schema base para uma sessão de exame."""
     exam_id: int
@@ -57,4 +77,76 @@ class ExamSession(ExamSessionBase):
     responses: List[ExamResponse] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+    @model_validator(mode="after")
+    def hide_running_score(self):
+        return _hide_running_score(self)
+
+
+class ExamSessionSummary(ExamSessionBase):
+    """Schema resumido de uma sessão de exame para listagens.
+
+    `responses` só é incluído quando solicitado com `?expand=responses`.
+    """
+    id: int
+    user_id: int
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    is_active: bool
+    status: str
+    score: Optional[float] = None
+    response_count: int
+    responses: Optional[List[ExamResponse]] = None
+
+    class Config:
+        from_attributes = True
+
+    @model_validator(mode="after")
+    def hide_running_score(self):
+        return _hide_running_score(self)
+
+
+class ExamSessionProgress(BaseModel):
+    """Schema do andamento de uma sessão de exame para o proprietário do exame.
+
+    Com a correção incremental, `score` e `correct_count` refletem as respostas
+    às questões objetivas já salvas, inclusive durante a prova.
+    """
+    id: int
+    user_id: int
+    status: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    score: Optional[float] = None
+    response_count: int
+    correct_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class BulkGradeResult(BaseModel):
+    """Schema para o resultado da correção em lote das sessões de um exame."""
+    exam_id: int
+    total_sessions: int
+    sessions_graded: int
+    responses_graded: int
+    question_correct_counts: Dict[int, int] = {}
+    elapsed_seconds: float
+    sessions_per_second: float
+
+class GradingJobStatus(BaseModel):
+    """Schema para o andamento da correção assíncrona de uma sessão de exame.
+
+    `status` é o status do job de correção ('pending', 'running', 'done' ou
+    'failed'), ou nulo se a sessão nunca foi enfileirada (ex: ainda em andamento
+    ou corrigida na própria submissão).
+    """
+    session_id: int
+    session_status: str
+    status: Optional[str] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+    score: Optional[float] = None
+    updated_at: Optional[datetime] = None
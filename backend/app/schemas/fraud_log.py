@@ -23,4 +23,9 @@ class FraudLog(FraudLogBase):
     timestamp: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class FraudLogBatchResult(BaseModel):
+    """Schema para o resultado do envio de eventos de fraude em lote."""
+    accepted: int
@@ -0,0 +1,205 @@
+"""Módulo de cache de gabaritos compilados por exame.
+
+O gabarito de cada exame é lido uma vez do banco, normalizado e compilado em
+registros compactos (`CompiledQuestion`) com um comparador específico para o
+tipo da questão. O cache é mantido em memória, por processo, e cada gabarito é
+guardado com a `Exam.content_version` lida antes da compilação. A versão é
+incrementada no banco, na mesma transação, a cada alteração nas questões do
+exame; `get_answer_key` a consulta (uma leitura pela chave primária) e
+recompila o gabarito quando ela muda, de modo que uma alteração feita em
+qualquer processo é vista por todos. `invalidate_answer_key` apenas libera a
+entrada local.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.exam import Exam, Question
+
+# Número máximo de exames mantidos no cache.
+ANSWER_KEY_CACHE_SIZE = 256
+
+# Valor que nunca é igual a nenhuma resposta normalizada.
+INVALID_ANSWER = object()
+
+_TRUE_VALUES = {"true", "t", "1", "yes", "sim", "verdadeiro", "v"}
+_FALSE_VALUES = {"false", "f", "0", "no", "nao", "não", "falso"}
+
+
+def _normalize_choice(value: Any) -> Any:
+    """Normaliza a resposta de uma questão de múltipla escolha."""
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _normalize_bool(value: Any) -> Any:
+    """Normaliza a resposta de uma questão de verdadeiro ou falso."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        return INVALID_ANSWER
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    return INVALID_ANSWER
+
+
+def _normalize_exact(value: Any) -> Any:
+    """Mantém a resposta sem alterações (comparação exata)."""
+    return value
+
+
+# Tipos de questão objetivos, corrigidos já no salvamento da resposta com `INCREMENTAL_SCORING`.
+OBJECTIVE_TYPES = frozenset({"multiple_choice", "true_false"})
+
+# Comparadores por tipo de questão; tipos não listados usam comparação exata.
+NORMALIZERS: Dict[str, Callable[[Any], Any]] = {
+    "multiple_choice": _normalize_choice,
+    "true_false": _normalize_bool,
+}
+
+
+class CompiledQuestion:
+    """Entrada compilada do gabarito de uma questão.
+
+    Atributos:
+        question_id (int): O ID da questão.
+        question_type (str): O tipo da questão.
+        points (int): Pontuação atribuída à questão.
+        expected (Any): A resposta correta já normalizada.
+    """
+    __slots__ = ("question_id", "question_type", "points", "expected", "_normalize")
+
+    def __init__(self, question_id: int, question_type: str, points: int, correct_answer: Any):
+        self.question_id = question_id
+        self.question_type = question_type
+        self.points = points
+        self._normalize = NORMALIZERS.get(question_type, _normalize_exact)
+        # Questões sem resposta correta não são corrigidas automaticamente.
+        self.expected = INVALID_ANSWER if correct_answer is None else self._normalize(correct_answer)
+
+    @property
+    def gradable(self) -> bool:
+        """Indica se a questão pode ser corrigida automaticamente."""
+        return self.expected is not INVALID_ANSWER
+
+    @property
+    def objective(self) -> bool:
+        """Indica se a questão é objetiva (múltipla escolha ou verdadeiro ou falso)."""
+        return self.question_type in OBJECTIVE_TYPES
+
+    def normalize(self, answer: Any) -> Any:
+        """Normaliza uma resposta com o comparador do tipo da questão."""
+        return self._normalize(answer)
+
+    def is_correct(self, answer: Any) -> bool:
+        """Indica se a resposta fornecida corresponde ao gabarito."""
+        if self.expected is INVALID_ANSWER:
+            return False
+        return self._normalize(answer) == self.expected
+
+
+# Gabarito compilado de um exame: question_id -> CompiledQuestion.
+AnswerKey = Dict[int, CompiledQuestion]
+
+
+class AnswerKeyCache:
+    """Cache LRU, seguro para threads, de gabaritos compilados por `exam_id` e versão do exame."""
+
+    def __init__(self, maxsize: int = ANSWER_KEY_CACHE_SIZE):
+        self.maxsize = maxsize
+        # exam_id -> (content_version, gabarito); só a versão mais recente de cada exame é mantida.
+        self._entries: "OrderedDict[int, Tuple[int, AnswerKey]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, exam_id: int, version: int) -> Optional[AnswerKey]:
+        with self._lock:
+            entry = self._entries.get(exam_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(exam_id)
+            return entry[1]
+
+    def set(self, exam_id: int, key: AnswerKey, version: int) -> None:
+        with self._lock:
+            current = self._entries.get(exam_id)
+            # Não substitui um gabarito de versão mais recente compilado em paralelo.
+            if current is not None and current[0] > version:
+                return
+            self._entries[exam_id] = (version, key)
+            self._entries.move_to_end(exam_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, exam_id: int) -> None:
+        with self._lock:
+            self._entries.pop(exam_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+answer_key_cache = AnswerKeyCache()
+
+
+def compile_answer_key(db: Session, exam_id: int) -> AnswerKey:
+    """Lê as questões de um exame com uma única consulta e compila o gabarito.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        AnswerKey: O gabarito compilado do exame.
+    """
+    rows = db.query(Question.id, Question.question_type, Question.points, Question.correct_answer).filter(
+        Question.exam_id == exam_id
+    ).all()
+    return {
+        question_id: CompiledQuestion(question_id, question_type, points or 0, correct_answer)
+        for question_id, question_type, points, correct_answer in rows
+    }
+
+
+def get_answer_key(db: Session, exam_id: int) -> AnswerKey:
+    """Obtém o gabarito compilado de um exame, recompilando-o apenas se a versão do exame mudou.
+
+    A versão do exame é lida a cada chamada; as questões só são lidas em caso de
+    falta no cache ou de versão diferente da guardada.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        AnswerKey: O gabarito compilado do exame (vazio se o exame não existir).
+    """
+    version = db.query(Exam.content_version).filter(Exam.id == exam_id).scalar()
+    if version is None:
+        return {}
+    key = answer_key_cache.get(exam_id, version)
+    if key is None:
+        key = compile_answer_key(db, exam_id)
+        answer_key_cache.set(exam_id, key, version)
+    return key
+
+
+def invalidate_answer_key(exam_id: int) -> None:
+    """Remove do cache local o gabarito de um exame após alterações em suas questões.
+
+    A validade do gabarito em cache não depende desta chamada: a versão do exame
+    no banco já descarta o gabarito anterior em todos os processos.
+
+    Args:
+        exam_id (int): O ID do exame.
+    """
+    answer_key_cache.invalidate(exam_id)
@@ -0,0 +1,347 @@
+"""Módulo de persistência das respostas de exame (autosave).
+
+Durante uma prova, a maior parte do tráfego é o salvamento automático de
+respostas que mudam várias vezes antes da submissão. Este módulo grava as
+respostas com semântica de upsert e oferece um buffer write-behind opcional
+(`AUTOSAVE_WRITE_BEHIND`): as respostas de sessões em andamento ficam em
+memória, agrupadas por (sessão, questão) — apenas a última resposta de cada
+questão é mantida — e são gravadas em lotes a cada
+`AUTOSAVE_FLUSH_INTERVAL_SECONDS`, na submissão da sessão e no encerramento da
+aplicação.
+
+O buffer é por processo: com write-behind ativo, todas as requisições de uma
+sessão devem ser atendidas pelo mesmo processo, e uma queda do processo pode
+perder até um intervalo de respostas. As respostas de uma sessão cuja gravação
+falha `AUTOSAVE_MAX_FLUSH_ATTEMPTS` vezes seguidas também são descartadas.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services.grading import refresh_running_scores, score_answer_rows
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert_chunk(db: Session, rows: List[dict], returning: bool, incremental: bool) -> Optional[List[ExamResponse]]:
+    # Um único comando (ou DELETE + INSERT) para um bloco de respostas.
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(ExamResponse).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExamResponse.session_id, ExamResponse.question_id],
+            set_={
+                "answer": stmt.excluded.answer,
+                "is_correct": stmt.excluded.is_correct if incremental else None,
+                "points_earned": stmt.excluded.points_earned if incremental else None,
+                "timestamp": func.now(),
+            },
+        )
+        if returning:
+            return list(db.scalars(stmt.returning(ExamResponse), execution_options={"populate_existing": True}))
+        db.execute(stmt)
+        return None
+    db.execute(
+        delete(ExamResponse)
+        .where(tuple_(ExamResponse.session_id, ExamResponse.question_id).in_([(row["session_id"], row["question_id"]) for row in rows]))
+        .execution_options(synchronize_session=False)
+    )
+    if returning:
+        return list(db.scalars(insert(ExamResponse).returning(ExamResponse), rows))
+    db.execute(insert(ExamResponse), rows)
+    return None
+
+
+def upsert_responses(db: Session, rows: List[dict], returning: bool = False, exam_ids: Optional[Dict[int, int]] = None):
+    """Grava respostas com semântica de upsert sobre (session_id, question_id).
+
+    Usa INSERT ... ON CONFLICT DO UPDATE no Postgres e no SQLite; nos demais bancos,
+    remove as respostas anteriores das mesmas questões e insere as novas na mesma
+    transação. As respostas são gravadas em blocos de `AUTOSAVE_UPSERT_CHUNK_SIZE`
+    linhas, para não exceder o limite de parâmetros por comando do banco (32766 no
+    SQLite). Uma resposta alterada volta a ficar sem correção (`is_correct` e
+    `points_earned` nulos) ou, com `INCREMENTAL_SCORING`, é corrigida na hora se a
+    questão for objetiva, e a pontuação parcial das sessões é atualizada (ver
+    `app.services.grading.score_answer_rows`). Não realiza commit.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        rows (List[dict]): As respostas, com `session_id`, `question_id` e `answer`.
+        returning (bool): Se deve retornar os objetos ExamResponse gravados.
+        exam_ids (Optional[Dict[int, int]]): O ID do exame de cada sessão, se já
+            conhecido; consultado quando necessário.
+
+    Returns:
+        Optional[List[ExamResponse]]: As respostas gravadas, quando `returning` é verdadeiro.
+    """
+    incremental = settings.INCREMENTAL_SCORING
+    chunk_size = settings.AUTOSAVE_UPSERT_CHUNK_SIZE
+    session_ids = list({row["session_id"] for row in rows})
+    if incremental:
+        if exam_ids is None:
+            exam_ids = dict(db.query(ExamSession.id, ExamSession.exam_id).filter(ExamSession.id.in_(session_ids)).all())
+        rows = score_answer_rows(db, rows, exam_ids)
+
+    written = [] if returning else None
+    for start in range(0, len(rows), chunk_size):
+        chunk = _upsert_chunk(db, rows[start:start + chunk_size], returning, incremental)
+        if returning:
+            written.extend(chunk)
+
+    if incremental:
+        for start in range(0, len(session_ids), chunk_size):
+            refresh_running_scores(db, session_ids[start:start + chunk_size])
+    return written
+
+
+class AutosaveBuffer:
+    """Buffer write-behind de respostas, agrupadas por sessão e questão.
+
+    Atributos:
+        max_pending (int): Número de respostas pendentes a partir do qual a gravação é antecipada.
+        received (int): Respostas recebidas pelo buffer.
+        written (int): Respostas gravadas no banco.
+        max_attempts (int): Gravações seguidas com falha após as quais as respostas de uma sessão são descartadas.
+        dropped (int): Respostas descartadas por pertencerem a sessões já encerradas.
+        failed (int): Respostas descartadas após `max_attempts` gravações com falha.
+        flushes (int): Número de gravações em lote realizadas.
+    """
+
+    def __init__(self, max_pending: int, max_attempts: int):
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._pending: Dict[int, Dict[int, Any]] = {}
+        # session_id -> gravações seguidas com falha das respostas da sessão.
+        self._attempts: Dict[int, int] = {}
+        # Sessões com respostas retiradas do buffer e ainda não gravadas.
+        self._in_flight: Set[int] = set()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._written_cond = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, session_id: int, answers: Dict[int, Any]) -> bool:
+        """Acumula respostas de uma sessão, substituindo as pendentes das mesmas questões.
+
+        Args:
+            session_id (int): O ID da sessão de exame.
+            answers (Dict[int, Any]): Resposta por ID de questão.
+
+        Returns:
+            bool: Se o buffer atingiu `max_pending` e deve ser gravado.
+        """
+        with self._lock:
+            session_answers = self._pending.setdefault(session_id, {})
+            before = len(session_answers)
+            session_answers.update(answers)
+            self._size += len(session_answers) - before
+            self.received += len(answers)
+            return self._size >= self.max_pending
+
+    def has_pending(self, session_id: int) -> bool:
+        """Indica se a sessão tem respostas no buffer ou sendo gravadas."""
+        with self._lock:
+            return session_id in self._pending or session_id in self._in_flight
+
+    def _take(self, session_ids: Optional[Iterable[int]]) -> Dict[int, Dict[int, Any]]:
+        # Aguarda as gravações em andamento das mesmas sessões: uma submissão não pode
+        # corrigir a sessão antes que as respostas retiradas por outra gravação estejam
+        # no banco (ou de volta ao buffer), e duas gravações da mesma sessão não podem
+        # concorrer, o que poderia sobrescrever uma resposta nova com uma antiga.
+        with self._written_cond:
+            if session_ids is None:
+                self._written_cond.wait_for(lambda: self._in_flight.isdisjoint(self._pending))
+                taken, self._pending = self._pending, {}
+            else:
+                wanted = set(session_ids)
+                self._written_cond.wait_for(lambda: self._in_flight.isdisjoint(wanted))
+                taken = {sid: self._pending.pop(sid) for sid in wanted if sid in self._pending}
+            self._size -= sum(len(answers) for answers in taken.values())
+            self._in_flight.update(taken)
+            return taken
+
+    def _release(self, taken: Dict[int, Dict[int, Any]]) -> None:
+        with self._written_cond:
+            self._in_flight.difference_update(taken)
+            self._written_cond.notify_all()
+
+    def _restore(self, taken: Dict[int, Dict[int, Any]]) -> None:
+        # Devolve ao buffer as respostas não gravadas, sem sobrescrever as que chegaram depois.
+        # Após `max_attempts` falhas seguidas, as respostas da sessão são descartadas, para que
+        # um lote que nunca é aceito pelo banco não volte ao buffer indefinidamente.
+        with self._lock:
+            for session_id, answers in taken.items():
+                attempts = self._attempts.get(session_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(session_id, None)
+                    self.failed += len(answers)
+                    logger.error("Dropping %d autosaved answers of session %d after %d failed flushes", len(answers), session_id, attempts)
+                    continue
+                self._attempts[session_id] = attempts
+                current = self._pending.get(session_id, {})
+                merged = {**answers, **current}
+                self._size += len(merged) - len(current)
+                self._pending[session_id] = merged
+
+    @staticmethod
+    def _write(db: Session, rows: List[dict], exam_ids: Dict[int, int]) -> None:
+        try:
+            upsert_responses(db, rows, exam_ids=exam_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def flush(self, db: Session, session_ids: Optional[Iterable[int]] = None) -> int:
+        """Grava no banco as respostas pendentes com upserts em lote.
+
+        As respostas são gravadas em blocos de `AUTOSAVE_UPSERT_CHUNK_SIZE`, cada um
+        com o seu commit. Um bloco recusado pelo banco é regravado sessão a sessão;
+        as respostas das sessões que ainda falharem voltam ao buffer (ver
+        `_restore`) e a exceção é propagada depois de gravadas as demais. Respostas de
+        sessões que não estão mais em andamento são descartadas, como seriam se
+        tivessem sido enviadas diretamente. Enquanto as respostas de uma sessão estão
+        sendo gravadas, outra gravação da mesma sessão aguarda o término desta.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+            session_ids (Optional[Iterable[int]]): As sessões a gravar; None grava todas.
+
+        Returns:
+            int: O número de respostas gravadas.
+        """
+        taken = self._take(session_ids)
+        if not taken:
+            return 0
+        try:
+            return self._flush_taken(db, taken)
+        finally:
+            self._release(taken)
+
+    def _flush_taken(self, db: Session, taken: Dict[int, Dict[int, Any]]) -> int:
+        try:
+            active_ids = dict(
+                db.query(ExamSession.id, ExamSession.exam_id).filter(ExamSession.id.in_(list(taken)), ExamSession.status == "in_progress")
+            )
+        except Exception:
+            db.rollback()
+            self._restore(taken)
+            raise
+        rows = [
+            {"session_id": session_id, "question_id": question_id, "answer": answer}
+            for session_id, answers in taken.items() if session_id in active_ids
+            for question_id, answer in answers.items()
+        ]
+
+        chunk_size = settings.AUTOSAVE_UPSERT_CHUNK_SIZE
+        written = 0
+        failed: Dict[int, Dict[int, Any]] = {}
+        error: Optional[Exception] = None
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                self._write(db, chunk, active_ids)
+                written += len(chunk)
+                continue
+            except Exception as exc:
+                error = exc
+            # Bloco recusado: grava sessão a sessão, para que só as sessões com respostas
+            # inválidas voltem ao buffer; falhas de conexão interrompem as tentativas.
+            by_session: Dict[int, List[dict]] = {}
+            for row in chunk:
+                by_session.setdefault(row["session_id"], []).append(row)
+            for session_id, session_rows in by_session.items():
+                if not isinstance(error, (OperationalError, InterfaceError)):
+                    try:
+                        self._write(db, session_rows, active_ids)
+                        written += len(session_rows)
+                        continue
+                    except Exception as exc:
+                        error = exc
+                failed[session_id] = {row["question_id"]: row["answer"] for row in session_rows}
+            if isinstance(error, (OperationalError, InterfaceError)):
+                for row in rows[start + chunk_size:]:
+                    failed.setdefault(row["session_id"], {})[row["question_id"]] = row["answer"]
+                break
+        if failed:
+            self._restore(failed)
+        with self._lock:
+            self.flushes += 1
+            self.written += written
+            self.dropped += sum(len(answers) for session_id, answers in taken.items() if session_id not in active_ids)
+            for session_id in taken:
+                if session_id not in failed:
+                    self._attempts.pop(session_id, None)
+        if error is not None:
+            raise error
+        return written
+
+    def start(self, session_factory: Callable[[], Session], interval: float) -> None:
+        """Inicia a thread que grava o buffer periodicamente."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.wait(interval):
+                self.flush_with(session_factory)
+
+        self._thread = threading.Thread(target=_run, name="autosave-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, session_factory: Callable[[], Session]) -> None:
+        """Interrompe a gravação periódica e grava o que restar no buffer."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush_with(session_factory)
+
+    def flush_with(self, session_factory: Callable[[], Session]) -> int:
+        """Grava todo o buffer usando uma nova sessão do banco; falhas são registradas no log."""
+        if not self._pending:
+            return 0
+        db = session_factory()
+        try:
+            return self.flush(db)
+        except Exception:
+            logger.exception("Autosave flush failed; answers kept in the buffer")
+            return 0
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """Retorna o tamanho e os contadores do buffer."""
+        with self._lock:
+            return {
+                "enabled": settings.AUTOSAVE_WRITE_BEHIND,
+                "pending": self._size,
+                "pending_sessions": len(self._pending),
+                "max_pending": self.max_pending,
+                "received": self.received,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+            }
+
+
+autosave_buffer = AutosaveBuffer(max_pending=settings.AUTOSAVE_MAX_PENDING, max_attempts=settings.AUTOSAVE_MAX_FLUSH_ATTEMPTS)
@@ -0,0 +1,187 @@
+"""Módulo de pontuação vetorizada de coortes de sessões de exame.
+
+As respostas de um conjunto de sessões são materializadas como uma matriz
+sessões x questões de códigos inteiros (cada resposta normalizada recebe um
+código por questão) e comparadas com o vetor de códigos do gabarito com NumPy,
+produzindo em um único passo as pontuações por sessão, o número de acertos por
+questão e os pontos distribuídos por questão.
+"""
+
+import json
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from app.services.answer_key import INVALID_ANSWER, AnswerKey
+
+# Código de resposta ausente ou inválida na matriz de respostas.
+MISSING = 0
+# Código do gabarito para questões que não são corrigidas automaticamente.
+UNGRADABLE = -1
+
+
+def _token(value: Any) -> Hashable:
+    """Converte uma resposta normalizada em uma chave hashable para o vocabulário."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True, default=str)
+
+
+class ResponseMatrix:
+    """Respostas de uma coorte codificadas como matrizes sessões x questões.
+
+    Atributos:
+        session_ids (np.ndarray): IDs das sessões, um por linha.
+        question_ids (np.ndarray): IDs das questões, um por coluna.
+        answers (np.ndarray): Códigos das respostas (`MISSING` quando não respondida).
+        response_ids (np.ndarray): IDs das respostas consideradas (0 quando não respondida).
+        key_codes (np.ndarray): Código da resposta correta de cada questão.
+        points (np.ndarray): Pontuação de cada questão.
+        discarded_response_ids (List[int]): Respostas que não entram na pontuação
+            (substituídas por uma resposta posterior ou de questões fora do gabarito).
+    """
+    __slots__ = ("session_ids", "question_ids", "answers", "response_ids", "key_codes", "points", "discarded_response_ids")
+
+    def __init__(self, session_ids, question_ids, answers, response_ids, key_codes, points, discarded_response_ids):
+        self.session_ids = session_ids
+        self.question_ids = question_ids
+        self.answers = answers
+        self.response_ids = response_ids
+        self.key_codes = key_codes
+        self.points = points
+        self.discarded_response_ids = discarded_response_ids
+
+
+def encode_responses(key: AnswerKey, session_ids: List[int], responses: Iterable[Tuple[int, int, int, Any]]) -> ResponseMatrix:
+    """Materializa as respostas de uma coorte como uma matriz de códigos.
+
+    Quando uma sessão possui mais de uma resposta para a mesma questão, vale a
+    de maior ID (a mais recente); as demais são listadas como descartadas.
+
+    Args:
+        key (AnswerKey): O gabarito compilado do exame.
+        session_ids (List[int]): IDs das sessões da coorte, na ordem das linhas.
+        responses (Iterable[Tuple[int, int, int, Any]]): Tuplas
+            (response_id, session_id, question_id, answer).
+
+    Returns:
+        ResponseMatrix: A matriz de respostas codificadas e o vetor do gabarito.
+    """
+    question_ids = sorted(key)
+    column = {question_id: index for index, question_id in enumerate(question_ids)}
+    row = {session_id: index for index, session_id in enumerate(session_ids)}
+
+    # Vocabulário por questão: resposta normalizada -> código (a partir de 1).
+    vocabularies: List[Dict[Hashable, int]] = []
+    key_codes = np.full(len(question_ids), UNGRADABLE, dtype=np.int32)
+    points = np.zeros(len(question_ids), dtype=np.float64)
+    for index, question_id in enumerate(question_ids):
+        entry = key[question_id]
+        vocabulary: Dict[Hashable, int] = {}
+        if entry.gradable:
+            vocabulary[_token(entry.expected)] = 1
+            key_codes[index] = 1
+        vocabularies.append(vocabulary)
+        points[index] = entry.points
+
+    # Cache por questão de resposta bruta -> código, evitando renormalizar respostas repetidas.
+    raw_codes: List[Dict[Hashable, int]] = [{} for _ in question_ids]
+    rows: List[int] = []
+    columns: List[int] = []
+    codes: List[int] = []
+    ids: List[int] = []
+    discarded: List[int] = []
+    for response_id, session_id, question_id, answer in responses:
+        j = column.get(question_id)
+        i = row.get(session_id)
+        if j is None or i is None:
+            discarded.append(response_id)
+            continue
+        try:
+            code = raw_codes[j].get(answer)
+            hashable = True
+        except TypeError:
+            code = None
+            hashable = False
+        if code is None:
+            normalized = key[question_id].normalize(answer)
+            if normalized is INVALID_ANSWER:
+                code = MISSING
+            else:
+                vocabulary = vocabularies[j]
+                code = vocabulary.setdefault(_token(normalized), len(vocabulary) + 1)
+            if hashable:
+                raw_codes[j][answer] = code
+        rows.append(i)
+        columns.append(j)
+        codes.append(code)
+        ids.append(response_id)
+
+    answers = np.full((len(session_ids), len(question_ids)), MISSING, dtype=np.int32)
+    response_ids = np.zeros((len(session_ids), len(question_ids)), dtype=np.int64)
+    if ids:
+        ids_array = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids_array, kind="stable")
+        cells = (np.asarray(rows, dtype=np.int64) * len(question_ids) + np.asarray(columns, dtype=np.int64))[order]
+        # Última ocorrência (maior ID) de cada célula sessão x questão.
+        _, reversed_first = np.unique(cells[::-1], return_index=True)
+        keep = np.zeros(len(cells), dtype=bool)
+        keep[len(cells) - 1 - reversed_first] = True
+        kept = order[keep]
+        answers.flat[cells[keep]] = np.asarray(codes, dtype=np.int32)[kept]
+        response_ids.flat[cells[keep]] = ids_array[kept]
+        discarded.extend(ids_array[order[~keep]].tolist())
+
+    return ResponseMatrix(
+        session_ids=np.asarray(session_ids, dtype=np.int64),
+        question_ids=np.asarray(question_ids, dtype=np.int64),
+        answers=answers,
+        response_ids=response_ids,
+        key_codes=key_codes,
+        points=points,
+        discarded_response_ids=discarded,
+    )
+
+
+def score_matrix(matrix: ResponseMatrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compara a matriz de respostas com o gabarito em um único passo vetorizado.
+
+    Args:
+        matrix (ResponseMatrix): As respostas codificadas da coorte.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: A matriz booleana de acertos
+            (sessões x questões), a pontuação de cada sessão e o número de
+            acertos de cada questão.
+    """
+    correct = matrix.answers == matrix.key_codes
+    scores = correct @ matrix.points
+    correct_counts = correct.sum(axis=0)
+    return correct, scores, correct_counts
+
+
+def response_updates(matrix: ResponseMatrix, correct: np.ndarray) -> List[dict]:
+    """Gera as linhas do UPDATE em lote de `ExamResponse` a partir da matriz de acertos.
+
+    Args:
+        matrix (ResponseMatrix): As respostas codificadas da coorte.
+        correct (np.ndarray): A matriz booleana de acertos.
+
+    Returns:
+        List[dict]: Linhas (id, is_correct, points_earned).
+    """
+    answered = matrix.response_ids != 0
+    ids = matrix.response_ids[answered].tolist()
+    hits = correct[answered].tolist()
+    earned = np.where(correct, matrix.points, 0)[answered].astype(np.int64).tolist()
+    rows = [
+        {"id": response_id, "is_correct": hit, "points_earned": points}
+        for response_id, hit, points in zip(ids, hits, earned)
+    ]
+    rows.extend(
+        {"id": response_id, "is_correct": False, "points_earned": 0}
+        for response_id in matrix.discarded_response_ids
+    )
+    return rows
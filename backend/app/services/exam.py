@@ -1,10 +1,15 @@
 """Módulo de serviços para operações relacionadas a exames e questões."""
 
-from sqlalchemy.orm import Session
-from typing import List, Optional, Union
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Set, Union
 
+from app.core.config import settings
 from app.models.exam import Exam, Question
 from app.schemas.exam import ExamCreate, ExamUpdate, QuestionCreate, QuestionUpdate
+from app.services.answer_key import invalidate_answer_key
+from app.services.exam_content import invalidate_exam_content
+from app.services.session_timer import session_deadlines
 from fastapi import HTTPException, status
 
 def validate_question_data(question: QuestionCreate | QuestionUpdate):
@@ -20,33 +25,90 @@ def validate_question_data(question: QuestionCreate | QuestionUpdate):
     # Adicione outras validações para outros tipos de questão aqui
 
 
+def bump_content_version(db: Session, exam_id: int) -> None:
+    """Incrementa a versão do conteúdo de um exame, sem commit.
 
+    Deve ser chamada na mesma transação de qualquer alteração no exame ou nas suas
+    questões: os gabaritos e o conteúdo em cache de versões anteriores deixam de
+    ser usados em todos os processos.
 
-def get_exam(db: Session, exam_id: int):
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+    """
+    db.query(Exam).filter(Exam.id == exam_id).update(
+        {Exam.content_version: Exam.content_version + 1, Exam.updated_at: func.now()}, synchronize_session=False
+    )
+
+
+
+
+def get_exam(db: Session, exam_id: int, with_questions: bool = False):
     """Obtém um exame pelo seu ID.
 
     Args:
         db (Session): A sessão do banco de dados.
         exam_id (int): O ID do exame a ser recuperado.
+        with_questions (bool): Se deve carregar as questões junto com o exame
+            (`selectinload`, duas consultas no total), para serializar o exame completo.
 
     Returns:
         Exam: O objeto Exam correspondente ao ID, ou None se não encontrado.
     """
-    return db.query(Exam).filter(Exam.id == exam_id).first()
+    query = db.query(Exam)
+    if with_questions:
+        query = query.options(selectinload(Exam.questions))
+    return query.filter(Exam.id == exam_id).first()
 
 
-def get_exams(db: Session, skip: int = 0, limit: int = 100):
-    """Obtém uma lista de exames.
+def get_exams(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    """Obtém uma lista de exames, ordenada por ID.
 
     Args:
         db (Session): A sessão do banco de dados.
         skip (int): O número de registros a serem ignorados.
         limit (int): O número máximo de registros a serem retornados.
+        after_id (Optional[int]): Retorna apenas exames com ID maior (paginação por cursor).
 
     Returns:
         List[Exam]: Uma lista de objetos Exam.
     """
-    return db.query(Exam).offset(skip).limit(limit).all()
+    query = db.query(Exam)
+    if after_id is not None:
+        query = query.filter(Exam.id > after_id)
+    return query.order_by(Exam.id).offset(skip).limit(limit).all()
+
+
+def get_exam_summaries(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, with_questions: bool = False):
+    """Obtém uma lista resumida de exames, ordenada por ID, para as listagens.
+
+    Sem `with_questions`, consulta apenas as colunas do exame e o número de
+    questões (uma única consulta, sem carregar as questões). Com `with_questions`,
+    carrega os exames e as suas questões com `selectinload` (duas consultas).
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        skip (int): O número de registros a serem ignorados.
+        limit (int): O número máximo de registros a serem retornados.
+        after_id (Optional[int]): Retorna apenas exames com ID maior (paginação por cursor).
+        with_questions (bool): Se deve carregar as questões de cada exame.
+
+    Returns:
+        List: Linhas com as colunas do exame e `question_count`, ou objetos Exam com as questões carregadas.
+    """
+    if with_questions:
+        query = db.query(Exam).options(selectinload(Exam.questions))
+    else:
+        question_count = (
+            select(func.count(Question.id)).where(Question.exam_id == Exam.id).scalar_subquery().label("question_count")
+        )
+        query = db.query(
+            Exam.id, Exam.title, Exam.description, Exam.duration_minutes, Exam.owner_id, Exam.is_active,
+            Exam.created_at, Exam.updated_at, question_count,
+        )
+    if after_id is not None:
+        query = query.filter(Exam.id > after_id)
+    return query.order_by(Exam.id).offset(skip).limit(limit).all()
 
 
 def create_exam(db: Session, exam: ExamCreate, owner_id: int):
@@ -80,10 +142,16 @@ def update_exam(db: Session, exam_id: int, exam: ExamUpdate):
     """
     db_exam = db.query(Exam).filter(Exam.id == exam_id).first()
     if db_exam:
-        for key, value in exam.dict(exclude_unset=True).items():
+        changes = exam.dict(exclude_unset=True)
+        for key, value in changes.items():
             setattr(db_exam, key, value)
+        db_exam.content_version = Exam.content_version + 1
         db.add(db_exam)
         db.commit()
+        invalidate_exam_content(exam_id)
+        if "duration_minutes" in changes and settings.SESSION_TIMER_ENABLED:
+            # Os prazos das sessões em andamento passam a seguir a nova duração.
+            session_deadlines.reschedule_exam(db, exam_id, changes["duration_minutes"])
         db.refresh(db_exam)
     return db_exam
 
@@ -102,6 +170,8 @@ def delete_exam(db: Session, exam_id: int):
     if db_exam:
         db.delete(db_exam)
         db.commit()
+        invalidate_answer_key(exam_id)
+        invalidate_exam_content(exam_id)
     return db_exam
 
 
@@ -118,19 +188,53 @@ def get_question(db: Session, question_id: int):
     return db.query(Question).filter(Question.id == question_id).first()
 
 
-def get_questions_by_exam(db: Session, exam_id: int, skip: int = 0, limit: int = 100):
-    """Obtém uma lista de questões para um exame específico.
+def get_questions_by_exam(db: Session, exam_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    """Obtém uma lista de questões para um exame específico, ordenada por ID.
 
     Args:
         db (Session): A sessão do banco de dados.
         exam_id (int): O ID do exame ao qual as questões pertencem.
         skip (int): O número de registros a serem ignorados.
         limit (int): O número máximo de registros a serem retornados.
+        after_id (Optional[int]): Retorna apenas questões com ID maior (paginação por cursor).
 
     Returns:
         List[Question]: Uma lista de objetos Question.
     """
-    return db.query(Question).filter(Question.exam_id == exam_id).offset(skip).limit(limit).all()
+    query = db.query(Question).filter(Question.exam_id == exam_id)
+    if after_id is not None:
+        query = query.filter(Question.id > after_id)
+    return query.order_by(Question.id).offset(skip).limit(limit).all()
+
+
+def get_exam_question_ids(db: Session, exam_id: int, question_ids: List[int]) -> Set[int]:
+    """Filtra, com uma única consulta, os IDs de questões que pertencem a um exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        question_ids (List[int]): Os IDs de questões a validar.
+
+    Returns:
+        Set[int]: Os IDs informados que pertencem ao exame.
+    """
+    if not question_ids:
+        return set()
+    rows = db.query(Question.id).filter(Question.exam_id == exam_id, Question.id.in_(set(question_ids)))
+    return {question_id for (question_id,) in rows}
+
+
+def get_question_ids_by_exam(db: Session, exam_id: int) -> Set[int]:
+    """Retorna os IDs de todas as questões de um exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        Set[int]: Os IDs das questões do exame.
+    """
+    return {question_id for (question_id,) in db.query(Question.id).filter(Question.exam_id == exam_id)}
 
 
 def create_question(db: Session, question: QuestionCreate, exam_id: int):
@@ -147,8 +251,11 @@ def create_question(db: Session, question: QuestionCreate, exam_id: int):
     """
     db_question = Question(**question.dict(), exam_id=exam_id)
     db.add(db_question)
+    bump_content_version(db, exam_id)
     db.commit()
     db.refresh(db_question)
+    invalidate_answer_key(exam_id)
+    invalidate_exam_content(exam_id)
     return db_question
 
 
@@ -169,8 +276,11 @@ def update_question(db: Session, question_id: int, question: QuestionUpdate):
         for key, value in question.dict(exclude_unset=True).items():
             setattr(db_question, key, value)
         db.add(db_question)
+        bump_content_version(db, db_question.exam_id)
         db.commit()
         db.refresh(db_question)
+        invalidate_answer_key(db_question.exam_id)
+        invalidate_exam_content(db_question.exam_id)
     return db_question
 
 
@@ -186,6 +296,10 @@ def delete_question(db: Session, question_id: int):
     """
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
+        exam_id = db_question.exam_id
         db.delete(db_question)
+        bump_content_version(db, exam_id)
         db.commit()
+        invalidate_answer_key(exam_id)
+        invalidate_exam_content(exam_id)
     return db_question
\ No newline at end of file
@@ -0,0 +1,449 @@
+"""Módulo de serviços das estatísticas pré-calculadas dos exames.
+
+As estatísticas de cada exame (distribuição, percentis e histograma das
+pontuações) e de cada questão (índice de acertos, discriminação
+ponto-bisserial e distribuição das respostas às questões objetivas) ficam
+gravadas nas tabelas `exam_analytics` e `question_analytics` e são servidas
+com duas leituras por chave, independentemente do número de sessões.
+
+Consideram-se as sessões corrigidas: submetidas ou corrigidas e com pontuação.
+A correção marca o exame como desatualizado: a correção em lote e os workers
+incrementam `generation` na mesma transação (uma gravação por lote), e as
+submissões corrigidas no salvamento das respostas (`INCREMENTAL_SCORING`), uma
+por aluno, apenas registram o exame em memória, sem disputar a linha do
+exame. Uma thread (`exam_analytics_refresher`) recalcula periodicamente os
+exames marcados, de modo que um pico de submissões gera um único recálculo por
+exame a cada `EXAM_ANALYTICS_REFRESH_SECONDS`.
+
+O recálculo é feito com três consultas agregadas no banco (pontuações das
+sessões, contagens por questão e contagens por resposta), sem carregar as
+respostas em memória. Marcas em memória de um processo que cair antes do
+recálculo se perdem; nesse caso, use a rota de recálculo do exame.
+
+O recálculo é completo, e não incremental: não há somas parciais por questão
+atualizadas a cada correção. Percentis, histograma e discriminação
+ponto-bisserial dependem da distribuição inteira das pontuações, e uma
+recorreção (ver `app.services.grading.rescore_exam`) mudaria contribuições já
+somadas. Em troca, o custo de cada recálculo cresce com o número de sessões do
+exame; o intervalo entre recálculos limita esse custo a um por exame a cada
+`EXAM_ANALYTICS_REFRESH_SECONDS`, e as estatísticas servidas podem estar
+atrasadas nesse intervalo (campo `stale`).
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import String, case, cast, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam import Exam
+from app.models.exam_analytics import ExamAnalytics, QuestionAnalytics
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services.answer_key import INVALID_ANSWER, get_answer_key
+
+logger = logging.getLogger(__name__)
+
+# Percentis das pontuações gravados em `ExamAnalytics.percentiles`.
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Status das sessões consideradas nas estatísticas (desde que já tenham pontuação).
+GRADED_STATUSES = ("submitted", "graded")
+
+
+def _upsert_exam_analytics(db: Session, rows: List[dict], set_: Dict[str, Any]) -> None:
+    # Insere as linhas de `exam_analytics` ou, se já existirem, aplica `set_`.
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.execute(dialect_insert(ExamAnalytics).values(rows).on_conflict_do_update(
+            index_elements=[ExamAnalytics.exam_id], set_=set_,
+        ))
+        return
+
+    exam_ids = [row["exam_id"] for row in rows]
+    existing = {
+        exam_id for (exam_id,) in db.query(ExamAnalytics.exam_id).filter(ExamAnalytics.exam_id.in_(exam_ids))
+    }
+    if existing:
+        db.execute(
+            update(ExamAnalytics).where(ExamAnalytics.exam_id.in_(existing)).values(**set_)
+            .execution_options(synchronize_session=False)
+        )
+    new_rows = [row for row in rows if row["exam_id"] not in existing]
+    if new_rows:
+        db.execute(insert(ExamAnalytics), new_rows)
+
+
+def mark_exam_analytics_stale(db: Session, exam_ids: Iterable[int]) -> None:
+    """Marca as estatísticas dos exames como desatualizadas (incrementa `generation`).
+
+    Não faz commit: a marca deve ser gravada na mesma transação que altera as
+    pontuações, para não se perder se o processo cair antes do recálculo.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_ids (Iterable[int]): Os IDs dos exames.
+    """
+    rows = [{"exam_id": exam_id, "generation": 1} for exam_id in dict.fromkeys(exam_ids)]
+    if rows:
+        _upsert_exam_analytics(db, rows, {"generation": ExamAnalytics.generation + 1})
+
+
+def get_exam_analytics(db: Session, exam_id: int) -> Optional[ExamAnalytics]:
+    """Obtém as estatísticas pré-calculadas de um exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        Optional[ExamAnalytics]: As estatísticas, ou None se o exame nunca foi corrigido.
+    """
+    return db.get(ExamAnalytics, exam_id)
+
+
+def get_question_analytics(db: Session, exam_id: int) -> List[QuestionAnalytics]:
+    """Obtém as estatísticas pré-calculadas das questões de um exame, ordenadas por ID da questão.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        List[QuestionAnalytics]: As estatísticas de cada questão.
+    """
+    return db.query(QuestionAnalytics).filter(QuestionAnalytics.exam_id == exam_id).order_by(QuestionAnalytics.question_id).all()
+
+
+def stale_exam_ids(db: Session, limit: int) -> List[int]:
+    """Retorna os exames cujas estatísticas estão desatualizadas no banco.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        limit (int): Número máximo de exames.
+
+    Returns:
+        List[int]: Os IDs dos exames.
+    """
+    return [
+        exam_id for (exam_id,) in db.query(ExamAnalytics.exam_id).filter(
+            ExamAnalytics.refreshed_generation < ExamAnalytics.generation
+        ).order_by(ExamAnalytics.exam_id).limit(limit)
+    ]
+
+
+def count_stale_exams(db: Session) -> int:
+    """Conta os exames cujas estatísticas estão desatualizadas no banco.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+
+    Returns:
+        int: O número de exames.
+    """
+    return db.query(func.count()).select_from(ExamAnalytics).filter(
+        ExamAnalytics.refreshed_generation < ExamAnalytics.generation
+    ).scalar()
+
+
+def _option_label(value: Any) -> str:
+    # Chave JSON da distribuição de respostas (resposta já normalizada).
+    return value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+
+
+def score_statistics(scores: np.ndarray, max_points: float, bins: int) -> dict:
+    """Calcula a distribuição das pontuações de um exame.
+
+    O histograma tem `bins` faixas de mesma largura entre 0 e a pontuação máxima
+    do exame; pontuações fora desse intervalo entram na primeira ou na última faixa.
+
+    Args:
+        scores (np.ndarray): As pontuações das sessões.
+        max_points (float): A pontuação máxima do exame.
+        bins (int): O número de faixas do histograma.
+
+    Returns:
+        dict: Os campos de pontuação de `ExamAnalytics`.
+    """
+    if not len(scores):
+        return {
+            "session_count": 0, "mean_score": None, "stddev_score": None, "min_score": None,
+            "max_score": None, "percentiles": None, "histogram": None,
+        }
+    upper = max_points if max_points > 0 else max(float(scores.max()), 1.0)
+    counts, edges = np.histogram(np.clip(scores, 0, upper), bins=bins, range=(0, upper))
+    return {
+        "session_count": int(len(scores)),
+        "mean_score": float(scores.mean()),
+        "stddev_score": float(scores.std()),
+        "min_score": float(scores.min()),
+        "max_score": float(scores.max()),
+        "percentiles": {f"p{p}": value for p, value in zip(PERCENTILES, np.percentile(scores, PERCENTILES).tolist())},
+        "histogram": [
+            {"lower": round(low, 6), "upper": round(high, 6), "count": count}
+            for low, high, count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist())
+        ],
+    }
+
+
+def point_biserial(correct_count: int, correct_score_sum: float, count: int, score_sum: float, stddev: float) -> Optional[float]:
+    """Calcula a correlação ponto-bisserial entre o acerto de uma questão e a pontuação total.
+
+    r = (M1 - M0) / s * sqrt(p * q), com M1 e M0 as médias das pontuações de quem
+    acertou e de quem errou, s o desvio padrão populacional das pontuações e p a
+    proporção de acertos. A pontuação total inclui a própria questão.
+
+    Args:
+        correct_count (int): Número de sessões que acertaram a questão.
+        correct_score_sum (float): Soma das pontuações dessas sessões.
+        count (int): Número total de sessões.
+        score_sum (float): Soma das pontuações de todas as sessões.
+        stddev (float): Desvio padrão populacional das pontuações.
+
+    Returns:
+        Optional[float]: A correlação, ou None se todos acertaram, todos erraram ou as pontuações não variam.
+    """
+    if count == 0 or not 0 < correct_count < count or not stddev:
+        return None
+    p = correct_count / count
+    mean_correct = correct_score_sum / correct_count
+    mean_wrong = (score_sum - correct_score_sum) / (count - correct_count)
+    return (mean_correct - mean_wrong) / stddev * (p * (1 - p)) ** 0.5
+
+
+def compute_exam_analytics(db: Session, exam_id: int, bins: Optional[int] = None) -> Tuple[dict, List[dict]]:
+    """Calcula as estatísticas de um exame e das suas questões a partir das sessões corrigidas.
+
+    Usa a correção gravada em `ExamResponse.is_correct` (inclusive a manual),
+    e não o gabarito atual. Questões não respondidas contam como erro.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        bins (Optional[int]): Faixas do histograma; `EXAM_ANALYTICS_HISTOGRAM_BINS` se None.
+
+    Returns:
+        Tuple[dict, List[dict]]: Os campos de `ExamAnalytics` e as linhas de `QuestionAnalytics`.
+    """
+    key = get_answer_key(db, exam_id)
+    graded = (ExamSession.exam_id == exam_id, ExamSession.status.in_(GRADED_STATUSES), ExamSession.score.isnot(None))
+    scores = np.fromiter(
+        (score for (score,) in db.execute(select(ExamSession.score).where(*graded))), dtype=np.float64,
+    )
+    max_points = float(sum(entry.points for entry in key.values()))
+    exam_row = {"max_points": max_points, **score_statistics(scores, max_points, bins or settings.EXAM_ANALYTICS_HISTOGRAM_BINS)}
+    count, score_sum, stddev = exam_row["session_count"], float(scores.sum()), exam_row["stddev_score"]
+
+    counts = {
+        row.question_id: row for row in db.execute(
+            select(
+                ExamResponse.question_id,
+                func.count().label("response_count"),
+                func.coalesce(func.sum(case((ExamResponse.is_correct.is_(True), 1), else_=0)), 0).label("correct_count"),
+                func.coalesce(func.sum(case((ExamResponse.is_correct.is_(True), ExamSession.score), else_=0.0)), 0.0).label("correct_score_sum"),
+            )
+            .join(ExamSession, ExamSession.id == ExamResponse.session_id)
+            .where(*graded)
+            .group_by(ExamResponse.question_id)
+        )
+    }
+
+    # Distribuição das respostas às questões objetivas, agrupadas pelo JSON bruto e normalizadas aqui.
+    objective_ids = [question_id for question_id, entry in key.items() if entry.objective]
+    options: Dict[int, Counter] = {question_id: Counter() for question_id in objective_ids}
+    if objective_ids and count:
+        answer_text = cast(ExamResponse.answer, String)
+        for question_id, raw, total in db.execute(
+            select(ExamResponse.question_id, answer_text, func.count())
+            .join(ExamSession, ExamSession.id == ExamResponse.session_id)
+            .where(*graded, ExamResponse.question_id.in_(objective_ids))
+            .group_by(ExamResponse.question_id, answer_text)
+        ):
+            try:
+                normalized = key[question_id].normalize(json.loads(raw)) if raw is not None else INVALID_ANSWER
+            except ValueError:
+                normalized = INVALID_ANSWER
+            if normalized is not INVALID_ANSWER:
+                options[question_id][_option_label(normalized)] += total
+
+    question_rows = []
+    for question_id in sorted(key):
+        row = counts.get(question_id)
+        correct_count = int(row.correct_count) if row else 0
+        question_rows.append({
+            "question_id": question_id,
+            "exam_id": exam_id,
+            "response_count": int(row.response_count) if row else 0,
+            "correct_count": correct_count,
+            "correct_rate": correct_count / count if count else None,
+            "discrimination": point_biserial(
+                correct_count, float(row.correct_score_sum) if row else 0.0, count, score_sum, stddev,
+            ),
+            "option_counts": dict(options[question_id]) if question_id in options else None,
+        })
+    return exam_row, question_rows
+
+
+def refresh_exam_analytics(db: Session, exam_id: int) -> Optional[ExamAnalytics]:
+    """Recalcula e grava as estatísticas de um exame.
+
+    O `generation` lido antes do cálculo é gravado em `refreshed_generation`:
+    uma correção concluída durante o cálculo mantém o exame desatualizado, e ele
+    é recalculado de novo na próxima passagem. Do mesmo modo, a marca em memória
+    do exame neste processo (ver `ExamAnalyticsRefresher.mark_stale`) é retirada
+    antes do cálculo — uma correção concluída durante o cálculo volta a marcá-lo —
+    e é restaurada se o recálculo falhar.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        Optional[ExamAnalytics]: As estatísticas gravadas, ou None se o exame não existir mais.
+    """
+    marked = exam_analytics_refresher.discard(exam_id)
+    try:
+        if db.get(Exam, exam_id) is None:
+            return None
+        generation = db.execute(select(ExamAnalytics.generation).where(ExamAnalytics.exam_id == exam_id)).scalar() or 0
+        exam_row, question_rows = compute_exam_analytics(db, exam_id)
+        values = {**exam_row, "refreshed_generation": generation, "refreshed_at": func.now()}
+        _upsert_exam_analytics(db, [{"exam_id": exam_id, "generation": generation, **values}], values)
+        db.execute(delete(QuestionAnalytics).where(QuestionAnalytics.exam_id == exam_id))
+        if question_rows:
+            db.execute(insert(QuestionAnalytics), question_rows)
+        db.commit()
+    except Exception:
+        if marked:
+            exam_analytics_refresher.mark_stale([exam_id])
+        raise
+    db.expire_all()
+    return db.get(ExamAnalytics, exam_id)
+
+
+class ExamAnalyticsRefresher:
+    """Thread que recalcula periodicamente as estatísticas dos exames desatualizados.
+
+    Atributos:
+        batch_size (int): Número máximo de exames marcados no banco recalculados por passagem.
+        refreshed (int): Exames recalculados por este processo.
+        failures (int): Recálculos que falharam (o exame continua marcado).
+        passes (int): Passagens com ao menos um exame recalculado.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.refreshed = 0
+        self.failures = 0
+        self.passes = 0
+        self._refresh_seconds_total = 0.0
+        self._last_refresh_seconds: Optional[float] = None
+        self._marked: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_stale(self, exam_ids: Iterable[int]) -> None:
+        """Registra em memória exames a recalcular na próxima passagem (sem gravar no banco)."""
+        with self._lock:
+            self._marked.update(exam_ids)
+
+    def discard(self, exam_id: int) -> bool:
+        """Retira a marca em memória de um exame; retorna se ele estava marcado."""
+        with self._lock:
+            if exam_id not in self._marked:
+                return False
+            self._marked.discard(exam_id)
+            return True
+
+    def is_marked(self, exam_id: int) -> bool:
+        """Indica se o exame aguarda recálculo por uma marca em memória deste processo."""
+        with self._lock:
+            return exam_id in self._marked
+
+    def run_once(self, session_factory: Callable[[], Session]) -> int:
+        """Recalcula os exames marcados em memória e no banco com uma nova sessão do banco.
+
+        Returns:
+            int: O número de exames recalculados.
+        """
+        with self._lock:
+            marked, self._marked = self._marked, set()
+        db = session_factory()
+        try:
+            try:
+                exam_ids = sorted(marked.union(stale_exam_ids(db, self.batch_size)))
+            except Exception:
+                logger.exception("Failed to list exams with stale analytics")
+                self.mark_stale(marked)
+                return 0
+            refreshed = 0
+            for exam_id in exam_ids:
+                started = time.perf_counter()
+                try:
+                    refresh_exam_analytics(db, exam_id)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Failed to refresh analytics of exam %s", exam_id)
+                    # Marcas em memória são mantidas para a próxima passagem; as do banco continuam gravadas.
+                    if exam_id in marked:
+                        self.mark_stale([exam_id])
+                    with self._lock:
+                        self.failures += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                refreshed += 1
+                with self._lock:
+                    self.refreshed += 1
+                    self._refresh_seconds_total += elapsed
+                    self._last_refresh_seconds = elapsed
+            if refreshed:
+                with self._lock:
+                    self.passes += 1
+            return refreshed
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session], interval: float) -> None:
+        """Inicia a thread que recalcula os exames desatualizados a cada `interval` segundos."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.wait(interval):
+                self.run_once(session_factory)
+
+        self._thread = threading.Thread(target=_run, name="exam-analytics-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a thread; os exames marcados no banco são recalculados após a reinicialização."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        """Retorna os exames marcados em memória e os contadores e a latência dos recálculos."""
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "marked": len(self._marked),
+                "refreshed": self.refreshed,
+                "failures": self.failures,
+                "passes": self.passes,
+                "refresh_ms_avg": round(self._refresh_seconds_total / self.refreshed * 1000, 3) if self.refreshed else None,
+                "refresh_ms_last": round(self._last_refresh_seconds * 1000, 3) if self._last_refresh_seconds is not None else None,
+            }
+
+
+exam_analytics_refresher = ExamAnalyticsRefresher(batch_size=settings.EXAM_ANALYTICS_BATCH_SIZE)
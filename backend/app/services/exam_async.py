@@ -0,0 +1,81 @@
+"""Versões assíncronas dos serviços de exames e questões.
+
+Cada função executa o serviço síncrono correspondente de `app.services.exam`
+sobre uma `AsyncSession` via `run_sync`: as regras de negócio continuam em um
+único lugar, enquanto a E/S do banco ocorre no driver assíncrono (asyncpg ou
+aiosqlite) sem ocupar uma thread do pool do Starlette.
+"""
+
+from typing import List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.exam import ExamCreate, ExamUpdate, QuestionCreate, QuestionUpdate
+from app.services import exam as exam_service
+from app.services import exam_content as exam_content_service
+from app.services.exam_content import ExamContent
+
+
+async def get_exam(db: AsyncSession, exam_id: int, with_questions: bool = False):
+    """Obtém um exame pelo seu ID. Ver `app.services.exam.get_exam`."""
+    return await db.run_sync(exam_service.get_exam, exam_id, with_questions=with_questions)
+
+
+async def get_exams(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    """Obtém uma lista de exames. Ver `app.services.exam.get_exams`."""
+    return await db.run_sync(exam_service.get_exams, skip=skip, limit=limit, after_id=after_id)
+
+
+async def create_exam(db: AsyncSession, exam: ExamCreate, owner_id: int):
+    """Cria um novo exame. Ver `app.services.exam.create_exam`."""
+    return await db.run_sync(exam_service.create_exam, exam=exam, owner_id=owner_id)
+
+
+async def update_exam(db: AsyncSession, exam_id: int, exam: ExamUpdate):
+    """Atualiza um exame existente. Ver `app.services.exam.update_exam`."""
+    return await db.run_sync(exam_service.update_exam, exam_id=exam_id, exam=exam)
+
+
+async def delete_exam(db: AsyncSession, exam_id: int):
+    """Deleta um exame. Ver `app.services.exam.delete_exam`."""
+    return await db.run_sync(exam_service.delete_exam, exam_id=exam_id)
+
+
+async def get_question(db: AsyncSession, question_id: int):
+    """Obtém uma questão pelo seu ID. Ver `app.services.exam.get_question`."""
+    return await db.run_sync(exam_service.get_question, question_id)
+
+
+async def get_questions_by_exam(db: AsyncSession, exam_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    """Obtém as questões de um exame. Ver `app.services.exam.get_questions_by_exam`."""
+    return await db.run_sync(exam_service.get_questions_by_exam, exam_id=exam_id, skip=skip, limit=limit, after_id=after_id)
+
+
+async def get_exam_question_ids(db: AsyncSession, exam_id: int, question_ids: List[int]) -> Set[int]:
+    """Filtra os IDs de questões que pertencem a um exame. Ver `app.services.exam.get_exam_question_ids`."""
+    return await db.run_sync(exam_service.get_exam_question_ids, exam_id=exam_id, question_ids=question_ids)
+
+
+async def create_question(db: AsyncSession, question: QuestionCreate, exam_id: int):
+    """Cria uma nova questão. Ver `app.services.exam.create_question`."""
+    return await db.run_sync(exam_service.create_question, question=question, exam_id=exam_id)
+
+
+async def update_question(db: AsyncSession, question_id: int, question: QuestionUpdate):
+    """Atualiza uma questão existente. Ver `app.services.exam.update_question`."""
+    return await db.run_sync(exam_service.update_question, question_id=question_id, question=question)
+
+
+async def delete_question(db: AsyncSession, question_id: int):
+    """Deleta uma questão. Ver `app.services.exam.delete_question`."""
+    return await db.run_sync(exam_service.delete_question, question_id=question_id)
+
+
+async def get_exam_content(db: AsyncSession, exam_id: int) -> Optional[ExamContent]:
+    """Obtém o conteúdo do exame para alunos. Ver `app.services.exam_content.get_exam_content`."""
+    return await db.run_sync(exam_content_service.get_exam_content, exam_id)
+
+
+async def can_view_exam_content(db: AsyncSession, content: ExamContent, user_id: int) -> bool:
+    """Indica se o usuário pode ver o conteúdo do exame. Ver `app.services.exam_content.can_view_exam_content`."""
+    return await db.run_sync(exam_content_service.can_view_exam_content, content, user_id)
@@ -0,0 +1,115 @@
+"""Módulo dos canais WebSocket das sessões de exame.
+
+Cada conexão WebSocket de uma sessão de exame (ver
+`app.api.endpoints.exam_session_ws`) é registrada aqui com a sua fila de saída.
+`publish` entrega uma mensagem a todas as conexões de uma sessão e pode ser
+chamada de qualquer thread — rotas síncronas, rotas assíncronas ou workers —,
+o que permite ao servidor avisar o aluno de que a prova foi submetida ou
+encerrada sem que o cliente precise consultar a API.
+
+O registro é por processo: mensagens publicadas em um processo só chegam às
+conexões atendidas por ele.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Set
+
+
+class ExamSessionConnection:
+    """Fila de saída de uma conexão WebSocket, ligada ao event loop que a atende.
+
+    Atributos:
+        session_id (int): O ID da sessão de exame.
+        user_id (int): O ID do usuário conectado.
+        outbox (asyncio.Queue): Mensagens a enviar ao cliente.
+    """
+
+    __slots__ = ("session_id", "user_id", "outbox", "_loop")
+
+    def __init__(self, session_id: int, user_id: int):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+
+    def send(self, message: dict) -> None:
+        """Enfileira uma mensagem para o cliente; pode ser chamada de qualquer thread."""
+        self._loop.call_soon_threadsafe(self.outbox.put_nowait, message)
+
+
+class ExamSessionChannels:
+    """Registro das conexões WebSocket abertas por sessão de exame.
+
+    Atributos:
+        published (int): Mensagens publicadas pelo servidor.
+        delivered (int): Entregas de mensagens publicadas a conexões abertas.
+    """
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self._connections: Dict[int, Set[ExamSessionConnection]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, connection: ExamSessionConnection) -> None:
+        with self._lock:
+            self._connections.setdefault(connection.session_id, set()).add(connection)
+
+    def unregister(self, connection: ExamSessionConnection) -> None:
+        with self._lock:
+            connections = self._connections.get(connection.session_id)
+            if connections is not None:
+                connections.discard(connection)
+                if not connections:
+                    del self._connections[connection.session_id]
+
+    def publish(self, session_id: int, message: dict) -> int:
+        """Envia uma mensagem a todas as conexões abertas de uma sessão.
+
+        Args:
+            session_id (int): O ID da sessão de exame.
+            message (dict): A mensagem, serializável em JSON.
+
+        Returns:
+            int: O número de conexões que receberam a mensagem.
+        """
+        with self._lock:
+            connections = list(self._connections.get(session_id, ()))
+            self.published += 1
+            self.delivered += len(connections)
+        for connection in connections:
+            connection.send(message)
+        return len(connections)
+
+    def stats(self) -> dict:
+        """Retorna o número de conexões abertas e os contadores de mensagens publicadas."""
+        with self._lock:
+            return {
+                "sessions": len(self._connections),
+                "connections": sum(len(connections) for connections in self._connections.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
+
+
+exam_session_channels = ExamSessionChannels()
+
+
+def notify_session_submitted(session_id: int, reason: str, score=None) -> None:
+    """Avisa as conexões da sessão de que ela foi encerrada.
+
+    A submissão pelo próprio aluno gera `submitted`; as demais (auto-submit por
+    violação ou fim do tempo) geram `force_submit`, para que o cliente encerre a prova.
+
+    Args:
+        session_id (int): O ID da sessão de exame.
+        reason (str): O motivo (`submit`, `auto_submit`, ...).
+        score (Optional[float]): A pontuação, se já calculada.
+    """
+    exam_session_channels.publish(session_id, {
+        "type": "submitted" if reason == "submit" else "force_submit",
+        "session_id": session_id,
+        "reason": reason,
+        "score": score,
+    })
@@ -0,0 +1,125 @@
+"""Módulo de cache do conteúdo de prova entregue aos alunos.
+
+Durante uma prova, todos os alunos buscam a mesma definição do exame e as
+mesmas questões. O conteúdo é montado uma vez por versão do exame — na variante
+segura para alunos, sem `correct_answer` —, serializado em JSON e mantido em
+memória, por processo. O ETag é derivado do próprio conteúdo, portanto é o
+mesmo em todos os processos e permite responder 304 a `If-None-Match`.
+
+O conteúdo em cache é guardado com a `Exam.content_version` do exame, que os
+serviços de `app.services.exam` incrementam no banco, na mesma transação, a
+cada alteração no exame ou nas suas questões. `get_exam_content` lê a versão
+(uma consulta pela chave primária) e remonta o conteúdo quando ela muda, de
+modo que uma alteração feita em qualquer processo é vista por todos.
+"""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.exam import Exam
+from app.models.exam_session import ExamSession
+from app.schemas.exam import StudentExam
+
+exam_content_cache = TTLCache(maxsize=settings.EXAM_CONTENT_CACHE_MAX_SIZE, ttl=settings.EXAM_CONTENT_CACHE_TTL_SECONDS)
+
+
+class ExamContent:
+    """Conteúdo serializado de um exame para os alunos.
+
+    Atributos:
+        exam_id (int): O ID do exame.
+        owner_id (int): O ID do proprietário do exame.
+        version (int): A `content_version` do exame na leitura do conteúdo.
+        body (bytes): O exame e as suas questões em JSON (schema `StudentExam`).
+        etag (str): O ETag do conteúdo.
+    """
+
+    __slots__ = ("exam_id", "owner_id", "version", "body", "etag")
+
+    def __init__(self, exam_id: int, owner_id: int, version: int, body: bytes):
+        self.exam_id = exam_id
+        self.owner_id = owner_id
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Indica se o cabeçalho `If-None-Match` da requisição corresponde a este conteúdo."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+
+def invalidate_exam_content(exam_id: int) -> None:
+    """Remove do cache local o conteúdo de um exame após alterações no exame ou nas suas questões.
+
+    A validade do conteúdo em cache não depende desta chamada: a versão do exame
+    no banco já descarta o conteúdo anterior em todos os processos.
+
+    Args:
+        exam_id (int): O ID do exame.
+    """
+    exam_content_cache.pop(exam_id)
+
+
+def build_exam_content(db: Session, exam_id: int) -> Optional[ExamContent]:
+    """Lê o exame e as suas questões (duas consultas) e serializa a variante para alunos.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        Optional[ExamContent]: O conteúdo do exame, ou None se o exame não for encontrado.
+    """
+    exam = db.query(Exam).options(selectinload(Exam.questions)).filter(Exam.id == exam_id).first()
+    if exam is None:
+        return None
+    body = StudentExam.model_validate(exam).model_dump_json().encode()
+    return ExamContent(exam.id, exam.owner_id, exam.content_version, body)
+
+
+def get_exam_content(db: Session, exam_id: int) -> Optional[ExamContent]:
+    """Obtém o conteúdo do exame para alunos, remontando-o apenas se a versão do exame mudou.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+
+    Returns:
+        Optional[ExamContent]: O conteúdo do exame, ou None se o exame não for encontrado.
+    """
+    version = db.query(Exam.content_version).filter(Exam.id == exam_id).scalar()
+    if version is None:
+        return None
+    content = exam_content_cache.get(exam_id)
+    if content is None or content.version != version:
+        content = build_exam_content(db, exam_id)
+        # Não substitui um conteúdo de versão mais recente montado em paralelo.
+        current = exam_content_cache.get(exam_id)
+        if content is not None and (current is None or current.version <= content.version):
+            exam_content_cache.set(exam_id, content)
+    return content
+
+
+def can_view_exam_content(db: Session, content: ExamContent, user_id: int) -> bool:
+    """Indica se o usuário pode ver o conteúdo: o proprietário ou quem tem uma sessão no exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        content (ExamContent): O conteúdo do exame.
+        user_id (int): O ID do usuário.
+
+    Returns:
+        bool: Se o usuário pode ver o conteúdo do exame.
+    """
+    if content.owner_id == user_id:
+        return True
+    return db.query(ExamSession.id).filter(
+        ExamSession.exam_id == content.exam_id, ExamSession.user_id == user_id
+    ).first() is not None
@@ -0,0 +1,227 @@
+"""Módulo de exportação dos resultados de um exame em CSV ou NDJSON.
+
+As sessões do exame (e, opcionalmente, as suas respostas) são lidas com um
+cursor no servidor (`yield_per`), em lotes de `EXPORT_YIELD_PER` linhas, e
+convertidas em texto à medida que chegam, para uma `StreamingResponse`. O uso
+de memória não depende do número de sessões e o download começa antes da
+primeira consulta, com o cabeçalho do arquivo.
+
+Com as respostas, a consulta é um único LEFT JOIN ordenado por sessão e
+questão; as linhas de cada sessão são agrupadas na ordem em que chegam. No
+CSV, cada questão do exame ocupa três colunas (`q<id>_answer`, `q<id>_correct`
+e `q<id>_points`); no NDJSON, as respostas vão em uma lista por sessão.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam_session import ExamSession, ExamResponse
+from app.models.user import User
+from app.services.autosave import autosave_buffer
+from app.services.exam import get_question_ids_by_exam
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+# Formatos de exportação e o tipo de mídia de cada um (o charset é acrescentado pela resposta).
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Colunas de cada sessão, na ordem do arquivo.
+SESSION_FIELDS = ("session_id", "user_id", "email", "status", "start_time", "end_time", "score")
+
+# Sessões convertidas por pedaço enviado ao cliente.
+ROWS_PER_CHUNK = 200
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def iter_session_results(
+    db: Session, exam_id: int, with_responses: bool = False, yield_per: Optional[int] = None,
+) -> Iterator[Tuple[Row, List[Row]]]:
+    """Percorre as sessões de um exame, ordenadas por ID, com um cursor no servidor.
+
+    As respostas pendentes no buffer de autosave das sessões em andamento são
+    gravadas antes.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        with_responses (bool): Se as respostas de cada sessão devem ser lidas.
+        yield_per (Optional[int]): Linhas lidas por vez; `EXPORT_YIELD_PER` se None.
+
+    Yields:
+        Tuple[Row, List[Row]]: A linha da sessão (`SESSION_FIELDS`) e as suas
+            respostas (question_id, answer, is_correct, points_earned), ordenadas
+            por questão; a lista é vazia sem `with_responses`.
+    """
+    if len(autosave_buffer):
+        active_ids = db.query(ExamSession.id).filter(ExamSession.exam_id == exam_id, ExamSession.status == "in_progress")
+        autosave_buffer.flush(db, [session_id for (session_id,) in active_ids if autosave_buffer.has_pending(session_id)])
+    columns = [
+        ExamSession.id.label("session_id"), ExamSession.user_id, User.email, ExamSession.status,
+        ExamSession.start_time, ExamSession.end_time, ExamSession.score,
+    ]
+    order = [ExamSession.id]
+    if with_responses:
+        columns += [ExamResponse.question_id, ExamResponse.answer, ExamResponse.is_correct, ExamResponse.points_earned]
+        order.append(ExamResponse.question_id)
+    stmt = select(*columns).outerjoin(User, User.id == ExamSession.user_id)
+    if with_responses:
+        stmt = stmt.outerjoin(ExamResponse, ExamResponse.session_id == ExamSession.id)
+    stmt = stmt.where(ExamSession.exam_id == exam_id).order_by(*order).execution_options(
+        yield_per=yield_per or settings.EXPORT_YIELD_PER,
+    )
+
+    result = db.execute(stmt)
+    if not with_responses:
+        for row in result:
+            yield row, []
+        return
+    for _, rows in groupby(result, key=lambda row: row.session_id):
+        rows = list(rows)
+        yield rows[0], [row for row in rows if row.question_id is not None]
+
+
+def _session_record(row: Row) -> dict:
+    return {
+        "session_id": row.session_id,
+        "user_id": row.user_id,
+        "email": row.email,
+        "status": row.status,
+        "start_time": _isoformat(row.start_time),
+        "end_time": _isoformat(row.end_time),
+        "score": row.score,
+    }
+
+
+def ndjson_chunks(db: Session, exam_id: int, with_responses: bool = False) -> Iterator[bytes]:
+    """Gera o NDJSON dos resultados de um exame: um objeto JSON por sessão, por linha.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        with_responses (bool): Inclui a lista `responses` de cada sessão.
+
+    Yields:
+        bytes: Pedaços do arquivo com até `ROWS_PER_CHUNK` sessões.
+    """
+    lines = []
+    for row, responses in iter_session_results(db, exam_id, with_responses):
+        record = _session_record(row)
+        if with_responses:
+            record["responses"] = [
+                {
+                    "question_id": response.question_id,
+                    "answer": response.answer,
+                    "is_correct": response.is_correct,
+                    "points_earned": response.points_earned,
+                }
+                for response in responses
+            ]
+        lines.append(_dumps(record))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _csv_value(value: Any) -> Any:
+    # Booleanos em minúsculas e respostas não textuais como JSON.
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def csv_chunks(db: Session, exam_id: int, with_responses: bool = False) -> Iterator[str]:
+    """Gera o CSV dos resultados de um exame: uma linha por sessão.
+
+    O cabeçalho é enviado antes da consulta das sessões.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        with_responses (bool): Inclui as colunas de resposta, acerto e pontos de cada questão do exame.
+
+    Yields:
+        str: Pedaços do arquivo com até `ROWS_PER_CHUNK` sessões.
+    """
+    question_ids = sorted(get_question_ids_by_exam(db, exam_id=exam_id)) if with_responses else []
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = list(SESSION_FIELDS)
+    for question_id in question_ids:
+        header += [f"q{question_id}_answer", f"q{question_id}_correct", f"q{question_id}_points"]
+    writer.writerow(header)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    rows = 0
+    for row, responses in iter_session_results(db, exam_id, with_responses):
+        values = [row.session_id, row.user_id, row.email, row.status, _isoformat(row.start_time), _isoformat(row.end_time), row.score]
+        by_question = {response.question_id: response for response in responses}
+        for question_id in question_ids:
+            response = by_question.get(question_id)
+            if response is None:
+                values += [None, None, None]
+            else:
+                values += [_csv_value(response.answer), _csv_value(response.is_correct), response.points_earned]
+        writer.writerow(values)
+        rows += 1
+        if rows >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if rows:
+        yield buffer.getvalue()
+
+
+def stream_exam_results(
+    session_factory: Callable[[], Session], exam_id: int, fmt: str = "csv", with_responses: bool = False,
+) -> Iterator[Any]:
+    """Gera o arquivo de resultados de um exame com uma sessão do banco própria.
+
+    A sessão do banco é aberta pelo gerador, e não pela requisição, porque a
+    resposta continua sendo enviada depois que a rota retorna; ela é fechada ao
+    fim do arquivo ou se o cliente interromper o download.
+
+    Args:
+        session_factory (Callable[[], Session]): Cria a sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        fmt (str): O formato do arquivo ('csv' ou 'ndjson').
+        with_responses (bool): Inclui as respostas de cada sessão.
+
+    Yields:
+        Any: Os pedaços do arquivo (str no CSV, bytes no NDJSON).
+    """
+    chunks = csv_chunks if fmt == "csv" else ndjson_chunks
+    db = session_factory()
+    try:
+        yield from chunks(db, exam_id, with_responses)
+    finally:
+        db.close()
@@ -1,12 +1,22 @@
 """Módulo de serviços para operações relacionadas a sessões de exame e respostas."""
 
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Any
 from datetime import datetime
 
-from app.models.exam import Exam, Question
+from app.models.exam import Exam
 from app.models.exam_session import ExamSession, ExamResponse
 from app.schemas.exam_session import ExamSessionCreate, ExamSessionUpdate, ExamResponseCreate
+from app.core.config import settings
+from app.services.autosave import autosave_buffer, upsert_responses
+from app.services.answer_key import get_answer_key
+from app.services.exam_analytics import exam_analytics_refresher
+from app.services.grading import grade_session, is_scored_on_save, running_score, unscored_sessions
+from app.services.grading_jobs import enqueue_grading_jobs, grading_workers
+from app.services.session_timer import session_deadline, session_deadlines
 
 
 def create_exam_session(db: Session, exam_session: ExamSessionCreate, user_id: int):
@@ -17,6 +27,9 @@ def create_exam_session(db: Session, exam_session: ExamSessionCreate, user_id: i
         exam_session (ExamSessionCreate): Os dados da sessão de exame a ser criada.
         user_id (int): O ID do usuário que está criando a sessão.
 
+    Raises:
+        HTTPException: Se o usuário já tiver uma sessão ativa para o exame (400).
+
     Returns:
         ExamSession: O objeto ExamSession recém-criado, ou None se o exame não for encontrado.
     """
@@ -26,37 +39,146 @@ def create_exam_session(db: Session, exam_session: ExamSessionCreate, user_id: i
 
     db_session = ExamSession(**exam_session.dict(), user_id=user_id)
     db.add(db_session)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # O índice único parcial impede duas sessões ativas simultâneas do mesmo usuário no exame.
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already has an active session for this exam")
     db.refresh(db_session)
+    # Agenda a submissão automática ao fim do prazo, se o exame tiver duração e o cronômetro estiver ativo.
+    if settings.SESSION_TIMER_ENABLED:
+        session_deadlines.schedule(db_session.id, session_deadline(db_session.start_time, db_exam.duration_minutes))
     return db_session
 
 
-def get_exam_session(db: Session, session_id: int):
+def get_exam_session(db: Session, session_id: int, with_responses: bool = False):
     """Obtém uma sessão de exame pelo seu ID.
 
     Args:
         db (Session): A sessão do banco de dados.
         session_id (int): O ID da sessão de exame a ser recuperada.
+        with_responses (bool): Se deve carregar as respostas junto com a sessão
+            (`selectinload`, duas consultas no total), para serializar a sessão completa.
 
     Returns:
         ExamSession: O objeto ExamSession correspondente ao ID, ou None se não encontrado.
     """
-    return db.query(ExamSession).filter(ExamSession.id == session_id).first()
+    query = db.query(ExamSession)
+    if with_responses:
+        query = query.options(selectinload(ExamSession.responses))
+    return query.filter(ExamSession.id == session_id).first()
+
+
+def get_exam_session_status(db: Session, session_id: int) -> Optional[str]:
+    """Obtém apenas o status de uma sessão de exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_id (int): O ID da sessão de exame.
+
+    Returns:
+        Optional[str]: O status da sessão, ou None se a sessão não for encontrada.
+    """
+    return db.query(ExamSession.status).filter(ExamSession.id == session_id).scalar()
 
 
-def get_exam_sessions_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    """Obtém uma lista de sessões de exame para um usuário específico.
+def get_active_exam_session(db: Session, exam_id: int, user_id: int):
+    """Obtém a sessão ativa de um usuário para um exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        user_id (int): O ID do usuário.
+
+    Returns:
+        ExamSession: A sessão ativa, ou None se o usuário não tiver sessão ativa para o exame.
+    """
+    return db.query(ExamSession).filter(
+        ExamSession.exam_id == exam_id,
+        ExamSession.user_id == user_id,
+        ExamSession.is_active == True
+    ).first()
+
+
+def get_exam_sessions_by_user(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    with_responses: bool = False,
+):
+    """Obtém uma lista resumida de sessões de exame para um usuário, ordenada por ID.
+
+    Sem `with_responses`, consulta apenas as colunas da sessão e o número de
+    respostas (uma única consulta). Com `with_responses`, carrega as sessões e as
+    suas respostas com `selectinload` (duas consultas).
 
     Args:
         db (Session): A sessão do banco de dados.
         user_id (int): O ID do usuário.
         skip (int): O número de registros a serem ignorados.
         limit (int): O número máximo de registros a serem retornados.
+        after_id (Optional[int]): Retorna apenas sessões com ID maior (paginação por cursor).
+        with_responses (bool): Se deve carregar as respostas de cada sessão.
+
+    Returns:
+        List: Linhas com as colunas da sessão e `response_count`, ou objetos ExamSession com as respostas carregadas.
+    """
+    if len(autosave_buffer):
+        active_ids = db.query(ExamSession.id).filter(ExamSession.user_id == user_id, ExamSession.status == "in_progress")
+        autosave_buffer.flush(db, [session_id for (session_id,) in active_ids if autosave_buffer.has_pending(session_id)])
+    if with_responses:
+        query = db.query(ExamSession).options(selectinload(ExamSession.responses))
+    else:
+        response_count = (
+            select(func.count(ExamResponse.id)).where(ExamResponse.session_id == ExamSession.id).scalar_subquery().label("response_count")
+        )
+        query = db.query(
+            ExamSession.id, ExamSession.exam_id, ExamSession.user_id, ExamSession.start_time, ExamSession.end_time,
+            ExamSession.is_active, ExamSession.status, ExamSession.score, response_count,
+        )
+    query = query.filter(ExamSession.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(ExamSession.id > after_id)
+    return query.order_by(ExamSession.id).offset(skip).limit(limit).all()
+
+
+def get_exam_progress(db: Session, exam_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    """Obtém o andamento das sessões de um exame, ordenadas por ID, para o proprietário do exame.
+
+    Consulta apenas as colunas da sessão e as contagens de respostas e de acertos
+    (uma única consulta). Com a correção incremental, a pontuação das sessões em
+    andamento é a parcial, sem precisar corrigi-las.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        skip (int): O número de registros a serem ignorados.
+        limit (int): O número máximo de registros a serem retornados.
+        after_id (Optional[int]): Retorna apenas sessões com ID maior (paginação por cursor).
 
     Returns:
-        List[ExamSession]: Uma lista de objetos ExamSession.
+        List: Linhas com as colunas da sessão, `response_count` e `correct_count`.
     """
-    return db.query(ExamSession).filter(ExamSession.user_id == user_id).offset(skip).limit(limit).all()
+    if len(autosave_buffer):
+        active_ids = db.query(ExamSession.id).filter(ExamSession.exam_id == exam_id, ExamSession.status == "in_progress")
+        autosave_buffer.flush(db, [session_id for (session_id,) in active_ids if autosave_buffer.has_pending(session_id)])
+    response_count = (
+        select(func.count(ExamResponse.id)).where(ExamResponse.session_id == ExamSession.id).scalar_subquery().label("response_count")
+    )
+    correct_count = (
+        select(func.count(ExamResponse.id)).where(ExamResponse.session_id == ExamSession.id, ExamResponse.is_correct == True)
+        .scalar_subquery().label("correct_count")
+    )
+    query = db.query(
+        ExamSession.id, ExamSession.user_id, ExamSession.status, ExamSession.start_time, ExamSession.end_time,
+        ExamSession.score, response_count, correct_count,
+    ).filter(ExamSession.exam_id == exam_id)
+    if after_id is not None:
+        query = query.filter(ExamSession.id > after_id)
+    return query.order_by(ExamSession.id).offset(skip).limit(limit).all()
 
 
 def update_exam_session(db: Session, session_id: int, session_update: ExamSessionUpdate):
@@ -77,6 +199,8 @@ def update_exam_session(db: Session, session_id: int, session_update: ExamSessio
         db.add(db_session)
         db.commit()
         db.refresh(db_session)
+        if db_session.status != "in_progress":
+            session_deadlines.cancel(session_id)
     return db_session
 
 
@@ -97,27 +221,135 @@ def end_exam_session(db: Session, session_id: int):
         db.add(db_session)
         db.commit()
         db.refresh(db_session)
+        session_deadlines.cancel(session_id)
     return db_session
 
 
-def create_exam_response(db: Session, response: ExamResponseCreate, session_id: int):
-    """Cria uma nova resposta de exame para uma sessão específica.
+def submit_exam_session(db: Session, session_id: int, end_time: datetime) -> Optional[ExamSession]:
+    """Submete uma sessão em andamento e enfileira a sua correção (ver `app.services.grading_jobs`).
+
+    A mudança de status e o job de correção são gravados na mesma transação; a
+    pontuação fica nula até que um worker corrija a sessão. Exames corrigidos no
+    salvamento das respostas (`INCREMENTAL_SCORING`) não geram job: a pontuação
+    parcial já é a final.
 
     Args:
         db (Session): A sessão do banco de dados.
-        response (ExamResponseCreate): Os dados da resposta a ser criada.
+        session_id (int): O ID da sessão de exame a ser submetida.
+        end_time (datetime): O horário de término da sessão.
+
+    Returns:
+        Optional[ExamSession]: A sessão submetida, ou None se ela não estiver mais em progresso.
+    """
+    db_session = db.get(ExamSession, session_id)
+    if db_session is None:
+        return None
+    exam_id = db_session.exam_id
+    # Exame só com questões objetivas: a pontuação parcial já é a final; nos demais, fica nula até a correção.
+    scored = is_scored_on_save(get_answer_key(db, exam_id)) and not unscored_sessions(db, [session_id])
+    result = db.execute(
+        update(ExamSession)
+        .where(ExamSession.id == session_id, ExamSession.status == "in_progress")
+        .values(status="submitted", end_time=end_time, score=running_score() if scored else None)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        return None
+    if not scored:
+        enqueue_grading_jobs(db, [session_id])
+    db.commit()
+    session_deadlines.cancel(session_id)
+    if scored:
+        exam_analytics_refresher.mark_stale([exam_id])
+    else:
+        grading_workers.wake()
+    db.refresh(db_session)
+    return db_session
+
+
+def create_exam_response(db: Session, response: ExamResponseCreate, session_id: int, exam_id: Optional[int] = None):
+    """Grava a resposta de uma questão em uma sessão específica.
+
+    Se a questão já tiver uma resposta na sessão, ela é substituída pela nova. Com
+    `AUTOSAVE_WRITE_BEHIND` ativo, a resposta é acumulada no buffer de autosave e
+    gravada depois; o objeto retornado ainda não tem ID.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        response (ExamResponseCreate): Os dados da resposta a ser gravada.
         session_id (int): O ID da sessão de exame à qual a resposta pertence.
+        exam_id (Optional[int]): O ID do exame da sessão, se já conhecido (usado na correção incremental).
 
     Returns:
-        ExamResponse: O objeto ExamResponse recém-criado.
+        ExamResponse: O objeto ExamResponse gravado.
     """
-    db_response = ExamResponse(**response.dict(), session_id=session_id)
-    db.add(db_response)
+    if settings.AUTOSAVE_WRITE_BEHIND:
+        _buffer_responses(db, session_id, {response.question_id: response.answer})
+        return ExamResponse(**response.dict(), session_id=session_id, timestamp=datetime.utcnow())
+    db_response = upsert_responses(db, [{**response.dict(), "session_id": session_id}], returning=True, exam_ids=_exam_ids(session_id, exam_id))[0]
     db.commit()
     db.refresh(db_response)
     return db_response
 
 
+def create_exam_responses(db: Session, responses: List[ExamResponseCreate], session_id: int, exam_id: Optional[int] = None) -> int:
+    """Grava várias respostas de uma sessão com um único upsert em lote e um commit.
+
+    Respostas já existentes para as mesmas questões são substituídas; se o lote
+    tiver mais de uma resposta para a mesma questão, prevalece a última.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        responses (List[ExamResponseCreate]): As respostas a serem gravadas.
+        session_id (int): O ID da sessão de exame à qual as respostas pertencem.
+        exam_id (Optional[int]): O ID do exame da sessão, se já conhecido (usado na correção incremental).
+
+    Returns:
+        int: O número de respostas gravadas.
+    """
+    if not responses:
+        return 0
+    latest = {response.question_id: response.answer for response in responses}
+    if settings.AUTOSAVE_WRITE_BEHIND:
+        _buffer_responses(db, session_id, latest)
+    else:
+        upsert_responses(
+            db, [{"session_id": session_id, "question_id": question_id, "answer": answer} for question_id, answer in latest.items()],
+            exam_ids=_exam_ids(session_id, exam_id),
+        )
+        db.commit()
+    return len(latest)
+
+
+def _exam_ids(session_id: int, exam_id: Optional[int]) -> Optional[dict]:
+    # Exame da sessão para `upsert_responses`; None faz a consulta quando necessária.
+    return {session_id: exam_id} if exam_id is not None else None
+
+
+def _buffer_responses(db: Session, session_id: int, answers: dict) -> None:
+    # Antecipa a gravação do buffer quando ele fica cheio.
+    if autosave_buffer.add(session_id, answers):
+        autosave_buffer.flush(db)
+
+
+def flush_exam_responses(db: Session, session_id: int) -> int:
+    """Grava as respostas de uma sessão que estejam pendentes no buffer de autosave.
+
+    Deve ser chamada antes de ler as respostas da sessão ou de submetê-la.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_id (int): O ID da sessão de exame.
+
+    Returns:
+        int: O número de respostas gravadas.
+    """
+    if not autosave_buffer.has_pending(session_id):
+        return 0
+    return autosave_buffer.flush(db, [session_id])
+
+
 def get_exam_responses_by_session(db: Session, session_id: int, skip: int = 0, limit: int = 100):
     """Obtém uma lista de respostas de exame para uma sessão específica.
 
@@ -149,6 +381,8 @@ def get_exam_response(db: Session, response_id: int):
 def grade_exam_session(db: Session, session_id: int):
     """Avalia uma sessão de exame, calculando a pontuação com base nas respostas corretas.
 
+    O gabarito é carregado com uma única consulta e as respostas são atualizadas em lote.
+
     Args:
         db (Session): A sessão do banco de dados.
         session_id (int): O ID da sessão de exame a ser avaliada.
@@ -160,20 +394,5 @@ def grade_exam_session(db: Session, session_id: int):
     if not db_session:
         return None
 
-    total_points = 0
-    for response in db_session.responses:
-        question = db.query(Question).filter(Question.id == response.question_id).first()
-        if question and question.correct_answer == response.answer: # Simple comparison, needs more robust logic
-            response.is_correct = True
-            response.points_earned = question.points
-            total_points += question.points
-        else:
-            response.is_correct = False
-            response.points_earned = 0
-        db.add(response)
-
-    db_session.status = "graded"
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-    return db_session
\ No newline at end of file
+    grade_session(db, db_session, status="graded")
+    return db_session
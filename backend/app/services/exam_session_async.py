@@ -0,0 +1,132 @@
+"""Versões assíncronas dos serviços de sessões de exame e respostas.
+
+Cada função executa o serviço síncrono correspondente de
+`app.services.exam_session` sobre uma `AsyncSession` via `run_sync` (ver
+`app.services.exam_async`).
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import json_response
+
+from app.schemas.exam_session import ExamSessionCreate, ExamSessionUpdate, ExamResponseCreate
+from app.services import exam_session as exam_session_service
+from app.services import grading_jobs as grading_job_service
+from app.services.score_calculator import calculate_exam_score
+
+
+async def create_exam_session(db: AsyncSession, exam_session: ExamSessionCreate, user_id: int):
+    """Cria uma nova sessão de exame. Ver `app.services.exam_session.create_exam_session`."""
+    return await db.run_sync(exam_session_service.create_exam_session, exam_session=exam_session, user_id=user_id)
+
+
+async def get_exam_session(db: AsyncSession, session_id: int, with_responses: bool = False):
+    """Obtém uma sessão de exame pelo seu ID. Ver `app.services.exam_session.get_exam_session`."""
+    return await db.run_sync(exam_session_service.get_exam_session, session_id, with_responses=with_responses)
+
+
+async def get_exam_sessions_by_user(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    with_responses: bool = False,
+):
+    """Obtém as sessões de um usuário. Ver `app.services.exam_session.get_exam_sessions_by_user`."""
+    return await db.run_sync(
+        exam_session_service.get_exam_sessions_by_user,
+        user_id=user_id, skip=skip, limit=limit, after_id=after_id, with_responses=with_responses,
+    )
+
+
+async def get_active_exam_session(db: AsyncSession, exam_id: int, user_id: int):
+    """Obtém a sessão ativa de um usuário para um exame. Ver `app.services.exam_session.get_active_exam_session`."""
+    return await db.run_sync(exam_session_service.get_active_exam_session, exam_id=exam_id, user_id=user_id)
+
+
+async def update_exam_session(db: AsyncSession, session_id: int, session_update: ExamSessionUpdate):
+    """Atualiza uma sessão de exame. Ver `app.services.exam_session.update_exam_session`."""
+    return await db.run_sync(exam_session_service.update_exam_session, session_id=session_id, session_update=session_update)
+
+
+async def end_exam_session(db: AsyncSession, session_id: int):
+    """Finaliza uma sessão de exame. Ver `app.services.exam_session.end_exam_session`."""
+    return await db.run_sync(exam_session_service.end_exam_session, session_id=session_id)
+
+
+async def submit_exam_session(db: AsyncSession, session_id: int, end_time: datetime):
+    """Submete uma sessão e enfileira a sua correção. Ver `app.services.exam_session.submit_exam_session`."""
+    return await db.run_sync(exam_session_service.submit_exam_session, session_id=session_id, end_time=end_time)
+
+
+async def get_grading_status(db: AsyncSession, db_session: Any) -> dict:
+    """Obtém o andamento da correção de uma sessão. Ver `app.services.grading_jobs.get_grading_status`."""
+    return await db.run_sync(grading_job_service.get_grading_status, db_session)
+
+
+async def create_exam_response(db: AsyncSession, response: ExamResponseCreate, session_id: int, exam_id: Optional[int] = None):
+    """Cria uma nova resposta de exame. Ver `app.services.exam_session.create_exam_response`."""
+    return await db.run_sync(exam_session_service.create_exam_response, response=response, session_id=session_id, exam_id=exam_id)
+
+
+async def create_exam_responses(
+    db: AsyncSession, responses: List[ExamResponseCreate], session_id: int, exam_id: Optional[int] = None
+) -> int:
+    """Cria um lote de respostas de exame. Ver `app.services.exam_session.create_exam_responses`."""
+    return await db.run_sync(exam_session_service.create_exam_responses, responses=responses, session_id=session_id, exam_id=exam_id)
+
+
+async def flush_exam_responses(db: AsyncSession, session_id: int) -> int:
+    """Grava as respostas pendentes de uma sessão. Ver `app.services.exam_session.flush_exam_responses`."""
+    return await db.run_sync(exam_session_service.flush_exam_responses, session_id=session_id)
+
+
+async def get_exam_responses_by_session(db: AsyncSession, session_id: int, skip: int = 0, limit: int = 100):
+    """Obtém as respostas de uma sessão. Ver `app.services.exam_session.get_exam_responses_by_session`."""
+    return await db.run_sync(exam_session_service.get_exam_responses_by_session, session_id=session_id, skip=skip, limit=limit)
+
+
+async def get_exam_response(db: AsyncSession, response_id: int):
+    """Obtém uma resposta de exame pelo seu ID. Ver `app.services.exam_session.get_exam_response`."""
+    return await db.run_sync(exam_session_service.get_exam_response, response_id)
+
+
+async def grade_exam_session(db: AsyncSession, session_id: int):
+    """Avalia uma sessão de exame. Ver `app.services.exam_session.grade_exam_session`."""
+    return await db.run_sync(exam_session_service.grade_exam_session, session_id=session_id)
+
+
+async def calculate_score(db: AsyncSession, exam_session: Any) -> float:
+    """Calcula a pontuação de uma sessão de exame. Ver `app.services.score_calculator.calculate_exam_score`."""
+    return await db.run_sync(calculate_exam_score, exam_session)
+
+
+async def serialize(db: AsyncSession, schema: type[BaseModel], obj: Any) -> Any:
+    """Converte objetos ORM no schema de resposta dentro do contexto assíncrono.
+
+    Relacionamentos carregados sob demanda (ex: `ExamSession.responses`) só podem
+    ser lidos dentro de `run_sync`; por isso a validação do schema é feita aqui,
+    e não pelo FastAPI após o retorno da rota.
+    """
+    def _dump(_):
+        if isinstance(obj, list):
+            return [schema.model_validate(item) for item in obj]
+        return schema.model_validate(obj)
+    return await db.run_sync(_dump)
+
+
+async def serialize_json(
+    db: AsyncSession, schema: type[BaseModel], obj: Any, response: Optional[Response] = None, exclude_unset: bool = False
+) -> Response:
+    """Gera a resposta JSON (ver `app.core.responses.json_response`) dentro do contexto assíncrono.
+
+    Como em `serialize`, a validação do schema acontece em `run_sync`; o JSON é
+    gerado em seguida, sem que o FastAPI valide o retorno da rota novamente.
+    """
+    return await db.run_sync(lambda _: json_response(schema, obj, response=response, exclude_unset=exclude_unset))
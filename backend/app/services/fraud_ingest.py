@@ -0,0 +1,266 @@
+"""Módulo de ingestão em lote dos eventos de fraude.
+
+Os navegadores enviam eventos de troca de aba, perda de foco, cópia etc. em
+rajadas de dezenas por segundo por aluno. Gravar cada evento com o seu próprio
+commit transforma essas rajadas em milhares de transações pequenas. Aqui os
+eventos são enfileirados em memória e gravados por uma thread em INSERTs em
+lote de até `FRAUD_INGEST_BATCH_SIZE` linhas, a cada
+`FRAUD_INGEST_FLUSH_INTERVAL_MS` milissegundos ou assim que um lote completo se
+acumula.
+
+A fila é limitada a `FRAUD_INGEST_MAX_PENDING` eventos: acima disso, novos
+eventos são recusados com `FraudQueueFull` (503 na API), em vez de crescer sem
+limite enquanto o banco não acompanha. Assim como o buffer de autosave, a fila
+é por processo, e uma queda do processo pode perder os eventos ainda não
+gravados. Um lote recusado pelo banco é regravado evento a evento, e os eventos
+recusados são descartados, para que um único evento inválido não volte à fila
+indefinidamente; só falhas de conexão devolvem o lote à fila.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam_session import ExamSession
+from app.models.fraud_log import FraudLog
+from app.models.user import User
+from app.schemas.fraud_log import FraudLogCreate
+
+logger = logging.getLogger(__name__)
+
+
+class FraudQueueFull(RuntimeError):
+    """A fila de ingestão de eventos de fraude está cheia."""
+
+
+class FraudEventQueue:
+    """Fila limitada de eventos de fraude, gravados em lotes por uma thread.
+
+    Atributos:
+        max_pending (int): Número máximo de eventos aguardando gravação.
+        batch_size (int): Número máximo de eventos por INSERT em lote.
+        accepted (int): Eventos aceitos pela fila.
+        rejected (int): Eventos recusados por falta de espaço na fila.
+        written (int): Eventos gravados no banco.
+        dropped (int): Eventos descartados por referenciarem sessões ou usuários inexistentes ou por serem recusados pelo banco.
+        flushes (int): Número de lotes gravados.
+    """
+
+    def __init__(self, max_pending: int, batch_size: int):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self._flush_seconds_total = 0.0
+        self._flush_seconds_max = 0.0
+        self._last_flush_seconds: Optional[float] = None
+        self._pending: Deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, events: Iterable[FraudLogCreate]) -> int:
+        """Enfileira eventos para gravação; todos são aceitos ou nenhum é.
+
+        O horário do evento é o do recebimento, e não o da gravação.
+
+        Args:
+            events (Iterable[FraudLogCreate]): Os eventos de fraude.
+
+        Raises:
+            FraudQueueFull: Se os eventos não couberem na fila.
+
+        Returns:
+            int: O número de eventos enfileirados.
+        """
+        now = datetime.utcnow()
+        rows = [{**event.model_dump(), "timestamp": now} for event in events]
+        with self._lock:
+            if len(self._pending) + len(rows) > self.max_pending:
+                self.rejected += len(rows)
+                raise FraudQueueFull("Fraud event queue is full")
+            self._pending.extend(rows)
+            self.accepted += len(rows)
+            full_batch = len(self._pending) >= self.batch_size
+        if full_batch:
+            self._wake.set()
+        return len(rows)
+
+    def _take(self) -> List[dict]:
+        with self._lock:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _restore(self, rows: List[dict]) -> None:
+        # Devolve o lote ao início da fila, preservando a ordem de chegada.
+        with self._lock:
+            self._pending.extendleft(reversed(rows))
+
+    def _valid_rows(self, db: Session, rows: List[dict]) -> List[dict]:
+        # Mantém apenas os eventos cujas sessões e usuários existem.
+        session_ids = {row["session_id"] for row in rows}
+        user_ids = {row["user_id"] for row in rows if row["user_id"] is not None}
+        existing_sessions = {sid for (sid,) in db.query(ExamSession.id).filter(ExamSession.id.in_(session_ids))}
+        existing_users = {uid for (uid,) in db.query(User.id).filter(User.id.in_(user_ids))} if user_ids else set()
+        return [
+            row for row in rows
+            if row["session_id"] in existing_sessions and (row["user_id"] is None or row["user_id"] in existing_users)
+        ]
+
+    @staticmethod
+    def _insert(db: Session, rows: List[dict]) -> None:
+        try:
+            db.execute(insert(FraudLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def _count_dropped(self, count: int, reason: str) -> None:
+        if count:
+            with self._lock:
+                self.dropped += count
+            logger.warning("Dropped %d fraud events %s", count, reason)
+
+    def _write(self, db: Session, rows: List[dict]) -> int:
+        # Falhas de conexão são propagadas e o lote volta à fila (ver `flush`); as demais
+        # falhas são do próprio lote e não se resolvem com novas tentativas.
+        try:
+            self._insert(db, rows)
+            return len(rows)
+        except (OperationalError, InterfaceError):
+            raise
+        except IntegrityError:
+            # Um único evento com chave estrangeira inválida não pode bloquear o lote inteiro.
+            valid = self._valid_rows(db, rows)
+            self._count_dropped(len(rows) - len(valid), "referencing missing sessions or users")
+        except Exception:
+            valid = rows
+        if not valid:
+            return 0
+        if valid is not rows:
+            try:
+                self._insert(db, valid)
+                return len(valid)
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception:
+                pass
+        # Lote ainda recusado: grava evento a evento e descarta os recusados.
+        written = rejected = 0
+        for index, row in enumerate(valid):
+            try:
+                self._insert(db, [row])
+                written += 1
+            except (OperationalError, InterfaceError):
+                # Os eventos restantes voltam à fila; a próxima gravação do lote propaga a falha.
+                self._restore(valid[index:])
+                break
+            except Exception:
+                rejected += 1
+        self._count_dropped(rejected, "rejected by the database")
+        return written
+
+    def flush(self, db: Session) -> int:
+        """Grava todos os eventos enfileirados, em lotes de até `batch_size` linhas.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+
+        Returns:
+            int: O número de eventos gravados.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._take()
+                if not rows:
+                    return written
+                started = time.perf_counter()
+                try:
+                    count = self._write(db, rows)
+                except Exception:
+                    db.rollback()
+                    self._restore(rows)
+                    raise
+                elapsed = time.perf_counter() - started
+                written += count
+                with self._lock:
+                    self.flushes += 1
+                    self.written += count
+                    self._flush_seconds_total += elapsed
+                    self._flush_seconds_max = max(self._flush_seconds_max, elapsed)
+                    self._last_flush_seconds = elapsed
+
+    def start(self, session_factory: Callable[[], Session], interval: float) -> None:
+        """Inicia a thread que grava a fila periodicamente ou quando um lote se completa."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                self.flush_with(session_factory)
+
+        self._thread = threading.Thread(target=_run, name="fraud-ingest-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, session_factory: Callable[[], Session]) -> None:
+        """Interrompe a gravação periódica e grava o que restar na fila."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush_with(session_factory)
+
+    def flush_with(self, session_factory: Callable[[], Session]) -> int:
+        """Grava a fila usando uma nova sessão do banco; falhas são registradas no log."""
+        if not self._pending:
+            return 0
+        db = session_factory()
+        try:
+            return self.flush(db)
+        except Exception:
+            logger.exception("Fraud event flush failed; events kept in the queue")
+            return 0
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """Retorna a profundidade da fila, os contadores e a latência das gravações em lote."""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "batch_size": self.batch_size,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "written": self.written,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+                "flush_ms_avg": round(self._flush_seconds_total / self.flushes * 1000, 3) if self.flushes else None,
+                "flush_ms_max": round(self._flush_seconds_max * 1000, 3),
+                "flush_ms_last": round(self._last_flush_seconds * 1000, 3) if self._last_flush_seconds is not None else None,
+            }
+
+
+fraud_event_queue = FraudEventQueue(max_pending=settings.FRAUD_INGEST_MAX_PENDING, batch_size=settings.FRAUD_INGEST_BATCH_SIZE)
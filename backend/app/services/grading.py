@@ -0,0 +1,335 @@
+"""Módulo de serviços para a correção de sessões de exame.
+
+Este módulo concentra o motor de correção: o gabarito compilado de um exame é
+obtido do cache (ou carregado com uma única consulta), as respostas são avaliadas em memória e os resultados
+são gravados com um UPDATE em lote, evitando uma consulta por resposta.
+
+Com `INCREMENTAL_SCORING`, as respostas às questões objetivas são corrigidas já
+no salvamento (ver `score_answer_rows`) e a pontuação parcial da sessão é
+mantida a cada gravação (ver `refresh_running_scores`). Em exames só com
+questões objetivas, a submissão não precisa corrigir nada (ver
+`is_scored_on_save`). Alterações no gabarito durante a prova não corrigem as
+respostas já salvas; nesse caso, use `rescore_exam` após a submissão
+(exposto em `POST /exams/{exam_id}/grade/?rescore=true`).
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services.answer_key import AnswerKey, get_answer_key
+from app.services.cohort_scoring import encode_responses, response_updates, score_matrix
+from app.services.exam_analytics import exam_analytics_refresher, mark_exam_analytics_stale
+
+logger = logging.getLogger(__name__)
+
+
+def grade_responses(key: AnswerKey, responses: Iterable[Tuple[int, int, Any]]) -> Tuple[List[dict], float]:
+    """Avalia um conjunto de respostas em memória contra o gabarito.
+
+    Apenas a resposta mais recente (maior ID) de cada questão é pontuada; as
+    respostas anteriores à mesma questão são marcadas como incorretas.
+
+    Args:
+        key (AnswerKey): O gabarito do exame.
+        responses (Iterable[Tuple[int, int, Any]]): Tuplas (response_id, question_id, answer).
+
+    Returns:
+        Tuple[List[dict], float]: As linhas para o UPDATE em lote das respostas
+            (id, is_correct, points_earned) e a pontuação total obtida.
+    """
+    latest: Dict[int, Tuple[int, Any]] = {}
+    rows = []
+    for response_id, question_id, answer in responses:
+        previous = latest.get(question_id)
+        if previous is not None and previous[0] > response_id:
+            rows.append({"id": response_id, "is_correct": False, "points_earned": 0})
+            continue
+        if previous is not None:
+            rows.append({"id": previous[0], "is_correct": False, "points_earned": 0})
+        latest[question_id] = (response_id, answer)
+
+    total_points = 0
+    for question_id, (response_id, answer) in latest.items():
+        entry = key.get(question_id)
+        if entry is not None and entry.is_correct(answer):
+            points = entry.points
+            rows.append({"id": response_id, "is_correct": True, "points_earned": points})
+            total_points += points
+        else:
+            rows.append({"id": response_id, "is_correct": False, "points_earned": 0})
+    return rows, float(total_points)
+
+
+def apply_grades(db: Session, response_rows: List[dict], session_rows: List[dict]) -> None:
+    """Grava os resultados da correção com UPDATEs em lote por chave primária.
+
+    Não faz commit; cabe ao chamador confirmar a transação.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        response_rows (List[dict]): Linhas (id, is_correct, points_earned) de `ExamResponse`.
+        session_rows (List[dict]): Linhas (id, score, ...) de `ExamSession`.
+    """
+    if response_rows:
+        db.execute(update(ExamResponse), response_rows)
+    if session_rows:
+        db.execute(update(ExamSession), session_rows)
+
+
+def is_scored_on_save(key: AnswerKey) -> bool:
+    """Indica se a pontuação das sessões de um exame já está completa quando elas são submetidas.
+
+    É o caso, com `INCREMENTAL_SCORING`, dos exames que só têm questões objetivas.
+
+    Args:
+        key (AnswerKey): O gabarito do exame.
+
+    Returns:
+        bool: Se a submissão pode dispensar a correção.
+    """
+    return settings.INCREMENTAL_SCORING and all(entry.objective for entry in key.values())
+
+
+def score_answer_rows(db: Session, rows: List[dict], exam_ids: Dict[int, int]) -> List[dict]:
+    """Corrige, contra o gabarito em cache, as respostas às questões objetivas antes de gravá-las.
+
+    Como na correção completa, respostas a questões objetivas sem resposta
+    correta valem zero. Respostas a questões não objetivas ou de outro exame ficam
+    sem correção (`is_correct` e `points_earned` nulos) até a submissão.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        rows (List[dict]): As respostas, com `session_id`, `question_id` e `answer`.
+        exam_ids (Dict[int, int]): O ID do exame de cada sessão.
+
+    Returns:
+        List[dict]: As respostas com `is_correct` e `points_earned`.
+    """
+    keys: Dict[int, AnswerKey] = {}
+    scored = []
+    for row in rows:
+        exam_id = exam_ids.get(row["session_id"])
+        if exam_id is not None and exam_id not in keys:
+            keys[exam_id] = get_answer_key(db, exam_id)
+        entry = keys[exam_id].get(row["question_id"]) if exam_id is not None else None
+        if entry is not None and entry.objective:
+            correct = entry.is_correct(row["answer"])
+            scored.append({**row, "is_correct": correct, "points_earned": entry.points if correct else 0})
+        else:
+            scored.append({**row, "is_correct": None, "points_earned": None})
+    return scored
+
+
+def running_score():
+    """Subconsulta correlacionada com a soma dos pontos das respostas da sessão (para UPDATEs em `ExamSession`)."""
+    return (
+        select(func.coalesce(func.sum(ExamResponse.points_earned), 0))
+        .where(ExamResponse.session_id == ExamSession.id)
+        .scalar_subquery()
+    )
+
+
+def unscored_sessions(db: Session, session_ids: Iterable[int]) -> Set[int]:
+    """Retorna as sessões com respostas ainda não corrigidas (`is_correct` nulo).
+
+    Em exames corrigidos no salvamento, só ocorre com respostas gravadas antes da
+    ativação de `INCREMENTAL_SCORING`; essas sessões precisam da correção completa.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_ids (Iterable[int]): Os IDs das sessões.
+
+    Returns:
+        Set[int]: Os IDs das sessões com respostas não corrigidas.
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return set()
+    return {
+        session_id for (session_id,) in db.query(ExamResponse.session_id).filter(
+            ExamResponse.session_id.in_(session_ids), ExamResponse.is_correct.is_(None)
+        ).distinct()
+    }
+
+
+def refresh_running_scores(db: Session, session_ids: Iterable[int]) -> None:
+    """Atualiza a pontuação parcial das sessões com a soma dos pontos das suas respostas.
+
+    Um único UPDATE com subconsulta correlacionada, que percorre apenas as
+    respostas de cada sessão pelo índice (session_id, question_id). Recalcular a
+    soma, em vez de somar a diferença de pontos, evita contagens duplicadas
+    quando a mesma questão é salva em requisições simultâneas. Não faz commit.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_ids (Iterable[int]): Os IDs das sessões.
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+    db.execute(
+        update(ExamSession).where(ExamSession.id.in_(session_ids)).values(score=running_score())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def grade_session(db: Session, db_session: ExamSession, status: Optional[str] = None, key: Optional[AnswerKey] = None) -> float:
+    """Corrige uma sessão de exame e grava `is_correct`, `points_earned` e `score`.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        db_session (ExamSession): A sessão de exame a ser corrigida.
+        status (Optional[str]): Novo status da sessão (ex: 'graded'); mantido se None.
+        key (Optional[AnswerKey]): Gabarito já compilado; obtido do cache se None.
+
+    Returns:
+        float: A pontuação total da sessão.
+    """
+    if key is None:
+        key = get_answer_key(db, db_session.exam_id)
+    responses = db.query(ExamResponse.id, ExamResponse.question_id, ExamResponse.answer).filter(
+        ExamResponse.session_id == db_session.id
+    ).all()
+    response_rows, score = grade_responses(key, responses)
+
+    session_row = {"id": db_session.id, "score": score}
+    if status is not None:
+        session_row["status"] = status
+    apply_grades(db, response_rows, [session_row])
+    db.commit()
+    db.refresh(db_session)
+    # Correção de uma única sessão: marca em memória, sem gravar na linha de estatísticas do exame.
+    exam_analytics_refresher.mark_stale([db_session.exam_id])
+    return score
+
+
+def _grade_chunk(db: Session, key: AnswerKey, session_ids: List[int], status: Optional[str] = None):
+    # Pontua as sessões de forma vetorizada e grava os resultados, sem commit.
+    responses = db.query(ExamResponse.id, ExamResponse.session_id, ExamResponse.question_id, ExamResponse.answer).filter(
+        ExamResponse.session_id.in_(session_ids)
+    )
+    matrix = encode_responses(key, session_ids, responses)
+    correct, scores, correct_counts = score_matrix(matrix)
+
+    response_rows = response_updates(matrix, correct)
+    session_rows = [{"id": session_id, "score": score} for session_id, score in zip(session_ids, scores.tolist())]
+    if status is not None:
+        for row in session_rows:
+            row["status"] = status
+    apply_grades(db, response_rows, session_rows)
+    return matrix, scores, correct_counts, response_rows
+
+
+def grade_sessions(db: Session, exam_id: int, session_ids: List[int], status: Optional[str] = None) -> Dict[int, float]:
+    """Corrige um conjunto de sessões de um mesmo exame com uma única passagem vetorizada.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame das sessões.
+        session_ids (List[int]): Os IDs das sessões a corrigir.
+        status (Optional[str]): Novo status das sessões (ex: 'graded'); mantido se None.
+
+    Returns:
+        Dict[int, float]: A pontuação de cada sessão.
+    """
+    if not session_ids:
+        return {}
+    session_ids = list(session_ids)
+    _, scores, _, _ = _grade_chunk(db, get_answer_key(db, exam_id), session_ids, status=status)
+    mark_exam_analytics_stale(db, [exam_id])
+    db.commit()
+    return dict(zip(session_ids, scores.tolist()))
+
+
+def grade_exam_sessions_bulk(
+    db: Session,
+    exam_id: int,
+    chunk_size: int = 500,
+    progress: Optional[Callable[[dict], None]] = None,
+    statuses: Sequence[str] = ("submitted",),
+) -> dict:
+    """Corrige todas as sessões de um exame com os status informados em uma única passagem.
+
+    O gabarito é carregado uma vez; as respostas são lidas em blocos de
+    `chunk_size` sessões, pontuadas de forma vetorizada (ver
+    `app.services.cohort_scoring`) e os resultados de cada bloco são gravados
+    com UPDATEs em lote e um commit por bloco.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        chunk_size (int): Número de sessões processadas por bloco.
+        progress (Optional[Callable[[dict], None]]): Função chamada após cada bloco
+            com as estatísticas parciais.
+        statuses (Sequence[str]): Status das sessões a corrigir. Use
+            ("submitted", "graded") para recalcular uma coorte após corrigir o gabarito.
+
+    Returns:
+        dict: Estatísticas finais (sessões e respostas corrigidas, acertos por
+            questão, tempo decorrido e sessões por segundo).
+    """
+    started = time.perf_counter()
+    key = get_answer_key(db, exam_id)
+    session_ids = [
+        session_id for (session_id,) in db.query(ExamSession.id).filter(
+            ExamSession.exam_id == exam_id,
+            ExamSession.status.in_(statuses),
+        ).order_by(ExamSession.id)
+    ]
+
+    stats = {
+        "exam_id": exam_id,
+        "total_sessions": len(session_ids),
+        "sessions_graded": 0,
+        "responses_graded": 0,
+        "question_correct_counts": {question_id: 0 for question_id in key},
+        "elapsed_seconds": 0.0,
+        "sessions_per_second": 0.0,
+    }
+    for start in range(0, len(session_ids), chunk_size):
+        chunk = session_ids[start:start + chunk_size]
+        matrix, _, correct_counts, response_rows = _grade_chunk(db, key, chunk, status="graded")
+        mark_exam_analytics_stale(db, [exam_id])
+        db.commit()
+
+        for question_id, count in zip(matrix.question_ids.tolist(), correct_counts.tolist()):
+            stats["question_correct_counts"][question_id] += count
+        elapsed = time.perf_counter() - started
+        stats["sessions_graded"] += len(chunk)
+        stats["responses_graded"] += len(response_rows)
+        stats["elapsed_seconds"] = elapsed
+        stats["sessions_per_second"] = stats["sessions_graded"] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            "Exam %s: graded %d/%d sessions (%.1f sessions/s)",
+            exam_id, stats["sessions_graded"], stats["total_sessions"], stats["sessions_per_second"],
+        )
+        if progress is not None:
+            progress(dict(stats))
+
+    stats["elapsed_seconds"] = time.perf_counter() - started
+    return stats
+
+
+def rescore_exam(db: Session, exam_id: int, chunk_size: int = 5000, progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """Recalcula a pontuação de toda a coorte de um exame (ex: após corrigir o gabarito).
+
+    Inclui sessões já corrigidas e submetidas; sessões em andamento são ignoradas.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        exam_id (int): O ID do exame.
+        chunk_size (int): Número de sessões processadas por bloco.
+        progress (Optional[Callable[[dict], None]]): Função chamada após cada bloco.
+
+    Returns:
+        dict: As mesmas estatísticas de `grade_exam_sessions_bulk`.
+    """
+    return grade_exam_sessions_bulk(
+        db, exam_id, chunk_size=chunk_size, progress=progress, statuses=("submitted", "graded"),
+    )
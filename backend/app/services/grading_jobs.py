@@ -0,0 +1,385 @@
+"""Módulo da fila de correção assíncrona das sessões de exame.
+
+Com `GRADING_JOBS_ENABLED`, a submissão de uma sessão apenas muda o status para
+'submitted' e grava um job na tabela `grading_jobs` na mesma transação; a
+correção é feita depois por um pool de threads (`GRADING_WORKERS`). Assim, o
+pico de submissões no fim de uma prova não espera pela correção, e a vazão da
+correção cresce com o número de workers.
+
+A tabela é a própria fila, o que a torna durável: jobs pendentes sobrevivem à
+reinicialização do processo e podem ser executados por qualquer processo da
+implantação. Cada worker assume um lote de jobs com um UPDATE condicional que
+grava um token próprio em `locked_by`, de modo que dois workers nunca executam
+o mesmo job; jobs 'running' cujo worker caiu são reassumidos após
+`GRADING_JOB_TIMEOUT_SECONDS`. A correção é idempotente (recalcula a pontuação
+a partir das respostas), então reexecutar um job não altera o resultado.
+Falhas são repetidas com espera exponencial até `GRADING_JOB_MAX_ATTEMPTS`
+tentativas; depois disso o job fica 'failed' e pode ser corrigido com a rota
+`/grade/` ou a correção em lote do exame.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import Row, and_, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam_session import ExamSession
+from app.models.grading_job import GradingJob
+from app.services.grading import grade_sessions
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo da mensagem de erro gravada em `last_error`.
+MAX_ERROR_LENGTH = 500
+
+
+def enqueue_grading_jobs(db: Session, session_ids: Iterable[int]) -> int:
+    """Grava (ou reinicia) os jobs de correção das sessões informadas.
+
+    Um job já existente para a sessão volta a 'pending' com as tentativas
+    zeradas. Não faz commit: o job deve ser gravado na mesma transação que
+    muda o status da sessão.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_ids (Iterable[int]): Os IDs das sessões a corrigir.
+
+    Returns:
+        int: O número de jobs gravados.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"session_id": session_id, "status": "pending", "attempts": 0, "run_after": now}
+        for session_id in dict.fromkeys(session_ids)
+    ]
+    if not rows:
+        return 0
+    reset = {"status": "pending", "attempts": 0, "run_after": now, "locked_by": None, "locked_at": None, "last_error": None}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(GradingJob).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[GradingJob.session_id], set_={**reset, "updated_at": func.now()},
+        ))
+        return len(rows)
+
+    existing = {
+        session_id for (session_id,) in db.query(GradingJob.session_id).filter(
+            GradingJob.session_id.in_([row["session_id"] for row in rows])
+        )
+    }
+    if existing:
+        db.execute(
+            update(GradingJob).where(GradingJob.session_id.in_(existing)).values(**reset)
+            .execution_options(synchronize_session=False)
+        )
+    new_rows = [row for row in rows if row["session_id"] not in existing]
+    if new_rows:
+        db.add_all(GradingJob(**row) for row in new_rows)
+    return len(rows)
+
+
+def get_grading_job(db: Session, session_id: int) -> Optional[GradingJob]:
+    """Obtém o job de correção de uma sessão de exame.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_id (int): O ID da sessão de exame.
+
+    Returns:
+        Optional[GradingJob]: O job, ou None se a sessão nunca foi enfileirada.
+    """
+    return db.query(GradingJob).filter(GradingJob.session_id == session_id).first()
+
+
+def get_grading_status(db: Session, db_session: ExamSession) -> dict:
+    """Monta o andamento da correção de uma sessão de exame.
+
+    A pontuação só é informada depois que o job é concluído (ou se a sessão foi
+    corrigida sem passar pela fila).
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        db_session (ExamSession): A sessão de exame.
+
+    Returns:
+        dict: Os campos de `GradingJobStatus`.
+    """
+    job = get_grading_job(db, db_session.id)
+    if job is None:
+        graded = db_session.status == "graded" or (db_session.status == "submitted" and db_session.score is not None)
+        return {
+            "session_id": db_session.id,
+            "session_status": db_session.status,
+            "score": db_session.score if graded else None,
+        }
+    return {
+        "session_id": db_session.id,
+        "session_status": db_session.status,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "score": db_session.score if job.status == "done" else None,
+        "updated_at": job.updated_at,
+    }
+
+
+def count_grading_jobs(db: Session) -> Dict[str, int]:
+    """Conta os jobs de correção por status.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+
+    Returns:
+        Dict[str, int]: O número de jobs em cada status.
+    """
+    return {status: count for status, count in db.query(GradingJob.status, func.count()).group_by(GradingJob.status)}
+
+
+def retry_delay(attempts: int) -> float:
+    """Calcula a espera, em segundos, antes da próxima tentativa de um job.
+
+    Args:
+        attempts (int): O número de tentativas já realizadas.
+
+    Returns:
+        float: `GRADING_JOB_RETRY_BACKOFF_SECONDS` dobrado a cada tentativa.
+    """
+    return settings.GRADING_JOB_RETRY_BACKOFF_SECONDS * 2 ** max(0, attempts - 1)
+
+
+class GradingWorkerPool:
+    """Pool de threads que executa os jobs de correção da tabela `grading_jobs`.
+
+    Atributos:
+        workers (int): Número de threads de correção.
+        batch_size (int): Número máximo de jobs assumidos por vez por um worker.
+        max_attempts (int): Tentativas antes de marcar um job como 'failed'.
+        lock_timeout (float): Segundos após os quais um job 'running' é considerado abandonado.
+        completed (int): Jobs concluídos por este processo.
+        retried (int): Jobs reagendados após uma falha.
+        failed (int): Jobs que esgotaram as tentativas.
+        batches (int): Lotes executados.
+    """
+
+    def __init__(self, workers: int, batch_size: int, max_attempts: int, lock_timeout: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lock_timeout = lock_timeout
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self._batch_seconds_total = 0.0
+        self._last_batch_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def wake(self) -> None:
+        """Acorda os workers ociosos (ex: após enfileirar novos jobs)."""
+        self._wake.set()
+
+    def claim(self, db: Session) -> List[Row]:
+        """Assume até `batch_size` jobs prontos para execução.
+
+        Os jobs são marcados como 'running' com um token exclusivo em `locked_by`
+        por um UPDATE condicional, que só afeta jobs ainda disponíveis: se outro
+        worker assumir o mesmo job antes, ele é simplesmente ignorado aqui.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+
+        Returns:
+            List[Row]: Os jobs assumidos (id, session_id, attempts e locked_by).
+        """
+        now = datetime.utcnow()
+        available = or_(
+            and_(GradingJob.status == "pending", GradingJob.run_after <= now),
+            and_(GradingJob.status == "running", GradingJob.locked_at < now - timedelta(seconds=self.lock_timeout)),
+        )
+        candidates = [
+            job_id for (job_id,) in db.execute(
+                select(GradingJob.id).where(available).order_by(GradingJob.run_after).limit(self.batch_size)
+            )
+        ]
+        if not candidates:
+            db.rollback()
+            return []
+        token = uuid.uuid4().hex
+        db.execute(
+            update(GradingJob)
+            .where(GradingJob.id.in_(candidates), available)
+            .values(status="running", locked_by=token, locked_at=now, attempts=GradingJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        # Linhas simples, e não objetos ORM, que seriam expirados pelos commits da correção.
+        return db.query(GradingJob.id, GradingJob.session_id, GradingJob.attempts, GradingJob.locked_by).filter(
+            GradingJob.locked_by == token, GradingJob.status == "running"
+        ).all()
+
+    def _finish(self, db: Session, jobs: List[Row]) -> None:
+        db.execute(
+            update(GradingJob)
+            .where(GradingJob.id.in_([job.id for job in jobs]), GradingJob.locked_by == jobs[0].locked_by)
+            .values(status="done", locked_by=None, locked_at=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def _fail(self, db: Session, jobs: List[Row], error: Exception) -> None:
+        # Reagenda os jobs com espera exponencial ou, esgotadas as tentativas, marca-os como 'failed'.
+        db.rollback()
+        message = f"{type(error).__name__}: {error}"[:MAX_ERROR_LENGTH]
+        now = datetime.utcnow()
+        retried = failed = 0
+        for job in jobs:
+            values = {"locked_by": None, "locked_at": None, "last_error": message}
+            if job.attempts >= self.max_attempts:
+                values["status"] = "failed"
+                failed += 1
+            else:
+                values["status"] = "pending"
+                values["run_after"] = now + timedelta(seconds=retry_delay(job.attempts))
+                retried += 1
+            db.execute(
+                update(GradingJob).where(GradingJob.id == job.id, GradingJob.locked_by == job.locked_by).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        with self._lock:
+            self.retried += retried
+            self.failed += failed
+
+    def run_jobs(self, db: Session, jobs: List[Row]) -> Dict[int, float]:
+        """Corrige as sessões dos jobs assumidos, agrupadas por exame.
+
+        Cada exame é corrigido com uma única passagem vetorizada (ver
+        `app.services.grading.grade_sessions`); uma falha afeta apenas os jobs
+        do mesmo exame. A sessão mantém o status 'submitted'.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+            jobs (List[Row]): Os jobs assumidos por `claim`.
+
+        Returns:
+            Dict[int, float]: A pontuação de cada sessão corrigida.
+        """
+        jobs_by_session = {job.session_id: job for job in jobs}
+        rows = db.query(ExamSession.id, ExamSession.exam_id).filter(
+            ExamSession.id.in_(list(jobs_by_session)), ExamSession.status.in_(("submitted", "graded"))
+        ).all()
+        by_exam: Dict[int, List[int]] = defaultdict(list)
+        for row in rows:
+            by_exam[row.exam_id].append(row.id)
+        # Sessões removidas ou reabertas não têm o que corrigir.
+        found = {row.id for row in rows}
+        skipped = [job for session_id, job in jobs_by_session.items() if session_id not in found]
+        if skipped:
+            self._finish(db, skipped)
+
+        scores: Dict[int, float] = {}
+        for exam_id, session_ids in by_exam.items():
+            exam_jobs = [jobs_by_session[session_id] for session_id in session_ids]
+            try:
+                scores.update(grade_sessions(db, exam_id, session_ids))
+                self._finish(db, exam_jobs)
+            except Exception as exc:
+                logger.exception("Failed to grade %d sessions of exam %s", len(session_ids), exam_id)
+                self._fail(db, exam_jobs, exc)
+        with self._lock:
+            self.completed += len(scores) + len(skipped)
+        return scores
+
+    def run_once(self, session_factory: Callable[[], Session]) -> int:
+        """Assume e executa um lote de jobs com uma nova sessão do banco.
+
+        Returns:
+            int: O número de jobs assumidos (0 se a fila estiver vazia).
+        """
+        db = session_factory()
+        try:
+            jobs = self.claim(db)
+            if not jobs:
+                return 0
+            started = time.perf_counter()
+            self.run_jobs(db, jobs)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.batches += 1
+                self._batch_seconds_total += elapsed
+                self._last_batch_seconds = elapsed
+            return len(jobs)
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session], poll_interval: float) -> None:
+        """Inicia as threads de correção.
+
+        Cada worker executa lotes enquanto houver jobs prontos e, com a fila vazia,
+        aguarda `poll_interval` segundos ou até ser acordado por `wake`.
+        """
+        if self._threads:
+            return
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.is_set():
+                try:
+                    claimed = self.run_once(session_factory)
+                except Exception:
+                    logger.exception("Grading worker failed to claim jobs")
+                    claimed = 0
+                if not claimed:
+                    self._wake.wait(poll_interval)
+                    self._wake.clear()
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=_run, name=f"grading-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Interrompe as threads de correção; jobs pendentes continuam na tabela."""
+        if not self._threads:
+            return
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> dict:
+        """Retorna o número de workers e os contadores e a latência dos lotes deste processo."""
+        with self._lock:
+            return {
+                "running": bool(self._threads),
+                "workers": self.workers,
+                "batch_size": self.batch_size,
+                "completed": self.completed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "batches": self.batches,
+                "batch_ms_avg": round(self._batch_seconds_total / self.batches * 1000, 3) if self.batches else None,
+                "batch_ms_last": round(self._last_batch_seconds * 1000, 3) if self._last_batch_seconds is not None else None,
+            }
+
+
+grading_workers = GradingWorkerPool(
+    workers=settings.GRADING_WORKERS,
+    batch_size=settings.GRADING_JOB_BATCH_SIZE,
+    max_attempts=settings.GRADING_JOB_MAX_ATTEMPTS,
+    lock_timeout=settings.GRADING_JOB_TIMEOUT_SECONDS,
+)
@@ -1,24 +1,22 @@
 from sqlalchemy.orm import Session
 from app.models.exam_session import ExamSession
-from app.models.exam import Question
-from app.models.exam_session import ExamResponse
+from app.services.answer_key import get_answer_key
+from app.services.exam_analytics import exam_analytics_refresher
+from app.services.grading import grade_session, is_scored_on_save, refresh_running_scores, unscored_sessions
 
 def calculate_exam_score(db: Session, exam_session: ExamSession) -> float:
-    """Calcula a pontuação de uma sessão de exame."""
-    total_score = 0.0
-    # Obter todas as respostas do aluno para esta sessão
-    student_responses = db.query(ExamResponse).filter(ExamResponse.session_id == exam_session.id).all()
+    """Calcula a pontuação de uma sessão de exame.
 
-    for response in student_responses:
-        # Obter a questão correspondente à resposta
-        question = db.query(Question).filter(Question.id == response.question_id).first()
-        if question:
-            # Comparar a resposta do aluno com a resposta correta da questão
-            # Esta lógica pode precisar ser mais sofisticada dependendo do tipo de questão (múltipla escolha, V/F, etc.)
-            if response.answer == question.correct_answer:
-                total_score += 1.0  # Assumindo 1 ponto por questão correta
-    exam_session.score = total_score
-    db.add(exam_session)
-    db.commit()
-    db.refresh(exam_session)
-    return total_score
\ No newline at end of file
+    Usa o motor de correção em lote: o gabarito é lido com uma única consulta e
+    `is_correct`, `points_earned` e `score` são gravados com um UPDATE em lote.
+    Em exames corrigidos no salvamento das respostas (`INCREMENTAL_SCORING`), a
+    pontuação parcial já é a final e apenas é confirmada.
+    """
+    key = get_answer_key(db, exam_session.exam_id)
+    if is_scored_on_save(key) and not unscored_sessions(db, [exam_session.id]):
+        refresh_running_scores(db, [exam_session.id])
+        db.commit()
+        db.refresh(exam_session)
+        exam_analytics_refresher.mark_stale([exam_session.exam_id])
+        return exam_session.score
+    return grade_session(db, exam_session, key=key)
@@ -0,0 +1,334 @@
+"""Módulo do cronômetro das sessões de exame no servidor.
+
+Exames com `duration_minutes` têm prazo: cada sessão em andamento expira em
+`start_time + duration_minutes`. Os prazos ficam em um heap ordenado por
+horário (agendar e remover custam O(log n)) e uma única thread dorme até o
+prazo mais próximo, sem consultar o banco periodicamente. Ao vencer, as sessões
+expiradas são submetidas em lote (ver `expire_exam_sessions`) — e corrigidas
+em seguida ou, com `GRADING_JOBS_ENABLED`, enfileiradas para correção — e o
+canal WebSocket de cada uma recebe `force_submit`.
+
+Sessões submetidas antes do prazo são apenas removidas do índice de prazos; a
+entrada correspondente no heap é descartada quando chega ao topo. O heap é
+por processo: é carregado do banco na inicialização e atualizado pelas sessões
+criadas, submetidas ou cujo exame mudou de duração neste processo. Em
+implantações com vários processos, cada um carrega todas as sessões em
+andamento; a submissão é idempotente (só afeta sessões ainda em andamento).
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam import Exam
+from app.models.exam_session import ExamSession
+from app.services.autosave import autosave_buffer
+from app.services.exam_analytics import mark_exam_analytics_stale
+from app.services.exam_channels import notify_session_submitted
+from app.services.answer_key import get_answer_key
+from app.services.grading import grade_sessions, is_scored_on_save, refresh_running_scores, unscored_sessions
+from app.services.grading_jobs import enqueue_grading_jobs, grading_workers
+
+logger = logging.getLogger(__name__)
+
+# Espera, em segundos, antes de tentar novamente um lote cuja submissão falhou.
+RETRY_DELAY_SECONDS = 5.0
+
+
+def session_deadline(start_time: Optional[datetime], duration_minutes: Optional[int]) -> Optional[float]:
+    """Calcula o prazo (epoch, em segundos) de uma sessão.
+
+    Horários sem fuso (SQLite) são considerados em UTC, como gravados por `func.now()`.
+
+    Args:
+        start_time (Optional[datetime]): O início da sessão.
+        duration_minutes (Optional[int]): A duração do exame.
+
+    Returns:
+        Optional[float]: O prazo da sessão, ou None se o exame não tiver duração.
+    """
+    if not duration_minutes:
+        return None
+    if start_time is None:
+        started = time.time()
+    elif start_time.tzinfo is None:
+        started = start_time.replace(tzinfo=timezone.utc).timestamp()
+    else:
+        started = start_time.timestamp()
+    return started + duration_minutes * 60
+
+
+def expire_exam_sessions(db: Session, session_ids: List[int]) -> Dict[int, Optional[float]]:
+    """Submete e corrige em lote as sessões cujo prazo terminou.
+
+    As respostas pendentes no buffer de autosave são gravadas antes; sessões que
+    já não estão em andamento são ignoradas. Sessões de exames corrigidos no
+    salvamento das respostas (`INCREMENTAL_SCORING`) mantêm a pontuação parcial.
+    Com `GRADING_JOBS_ENABLED`, os jobs de correção das demais são gravados na
+    mesma transação da submissão, e a correção fica a cargo dos workers.
+
+    Args:
+        db (Session): A sessão do banco de dados.
+        session_ids (List[int]): Os IDs das sessões expiradas.
+
+    Returns:
+        Dict[int, Optional[float]]: A pontuação de cada sessão submetida (None se enfileirada).
+    """
+    autosave_buffer.flush(db, session_ids)
+    rows = db.query(ExamSession.id, ExamSession.exam_id).filter(
+        ExamSession.id.in_(session_ids), ExamSession.status == "in_progress"
+    ).all()
+    if not rows:
+        return {}
+    expired_ids = [row.id for row in rows]
+    db.execute(
+        update(ExamSession)
+        .where(ExamSession.id.in_(expired_ids), ExamSession.status == "in_progress")
+        .values(status="submitted", end_time=func.now(), score=None)
+        .execution_options(synchronize_session=False)
+    )
+    by_exam: Dict[int, List[int]] = defaultdict(list)
+    for row in rows:
+        by_exam[row.exam_id].append(row.id)
+    # Exames corrigidos no salvamento das respostas já têm a pontuação final.
+    candidates = [
+        session_id for exam_id, ids in by_exam.items() if is_scored_on_save(get_answer_key(db, exam_id))
+        for session_id in ids
+    ]
+    scored_ids = set(candidates) - unscored_sessions(db, candidates)
+    refresh_running_scores(db, scored_ids)
+    mark_exam_analytics_stale(db, {exam_id for exam_id, ids in by_exam.items() if scored_ids.intersection(ids)})
+    pending: Dict[int, List[int]] = {}
+    for exam_id, ids in by_exam.items():
+        ids = [session_id for session_id in ids if session_id not in scored_ids]
+        if ids:
+            pending[exam_id] = ids
+    if settings.GRADING_JOBS_ENABLED:
+        enqueue_grading_jobs(db, [session_id for ids in pending.values() for session_id in ids])
+    db.commit()
+
+    scores: Dict[int, Optional[float]] = dict.fromkeys(expired_ids)
+    if scored_ids:
+        scores.update(db.query(ExamSession.id, ExamSession.score).filter(ExamSession.id.in_(scored_ids)).all())
+    if settings.GRADING_JOBS_ENABLED:
+        if pending:
+            grading_workers.wake()
+        return scores
+    for exam_id, ids in pending.items():
+        scores.update(grade_sessions(db, exam_id, ids))
+    return scores
+
+
+class SessionDeadlineScheduler:
+    """Heap de prazos das sessões de exame, com uma thread que submete as expiradas.
+
+    Atributos:
+        batch_size (int): Número máximo de sessões submetidas por lote.
+        grace_seconds (float): Tolerância após o prazo, para respostas ainda em trânsito.
+        expired (int): Sessões submetidas por expiração do prazo.
+        batches (int): Lotes processados.
+        failures (int): Lotes cuja submissão falhou (e foram reagendados).
+    """
+
+    def __init__(self, batch_size: int, grace_seconds: float):
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds
+        self.expired = 0
+        self.batches = 0
+        self.failures = 0
+        self._last_batch_seconds: Optional[float] = None
+        self._heap: List[Tuple[float, int]] = []
+        # session_id -> prazo vigente; entradas do heap com outro prazo estão obsoletas.
+        self._deadlines: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def _push(self, session_id: int, deadline: float) -> None:
+        self._deadlines[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id))
+        # Descarta as entradas obsoletas quando elas passam a dominar o heap.
+        if len(self._heap) > 2 * len(self._deadlines) + 1024:
+            self._heap = [(deadline, sid) for sid, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def schedule(self, session_id: int, deadline: Optional[float]) -> None:
+        """Agenda (ou reagenda) o prazo de uma sessão; None remove o prazo.
+
+        Args:
+            session_id (int): O ID da sessão de exame.
+            deadline (Optional[float]): O prazo (epoch, em segundos).
+        """
+        if deadline is None:
+            self.cancel(session_id)
+            return
+        with self._cond:
+            self._push(session_id, deadline)
+            if self._heap[0] == (deadline, session_id):
+                self._cond.notify()
+
+    def cancel(self, session_id: int) -> None:
+        """Remove o prazo de uma sessão (ex: submetida antes do fim do tempo)."""
+        with self._cond:
+            self._deadlines.pop(session_id, None)
+
+    def deadline(self, session_id: int) -> Optional[float]:
+        """Retorna o prazo agendado de uma sessão, se houver."""
+        with self._cond:
+            return self._deadlines.get(session_id)
+
+    def load(self, db: Session) -> int:
+        """Carrega os prazos de todas as sessões em andamento de exames com duração.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+
+        Returns:
+            int: O número de sessões agendadas.
+        """
+        rows = db.query(ExamSession.id, ExamSession.start_time, Exam.duration_minutes).join(
+            Exam, Exam.id == ExamSession.exam_id
+        ).filter(ExamSession.status == "in_progress", Exam.duration_minutes.isnot(None))
+        entries = [(session_deadline(row.start_time, row.duration_minutes), row.id) for row in rows]
+        with self._cond:
+            for deadline, session_id in entries:
+                self._deadlines[session_id] = deadline
+            self._heap.extend(entries)
+            heapq.heapify(self._heap)
+            self._cond.notify()
+        return len(entries)
+
+    def reschedule_exam(self, db: Session, exam_id: int, duration_minutes: Optional[int]) -> int:
+        """Recalcula os prazos das sessões em andamento de um exame cuja duração mudou.
+
+        Args:
+            db (Session): A sessão do banco de dados.
+            exam_id (int): O ID do exame.
+            duration_minutes (Optional[int]): A nova duração do exame.
+
+        Returns:
+            int: O número de sessões afetadas.
+        """
+        rows = db.query(ExamSession.id, ExamSession.start_time).filter(
+            ExamSession.exam_id == exam_id, ExamSession.status == "in_progress"
+        ).all()
+        for row in rows:
+            self.schedule(row.id, session_deadline(row.start_time, duration_minutes))
+        return len(rows)
+
+    def _pop_due(self, cutoff: float) -> List[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= cutoff and len(due) < self.batch_size:
+            deadline, session_id = heapq.heappop(self._heap)
+            if self._deadlines.get(session_id) == deadline:
+                del self._deadlines[session_id]
+                due.append(session_id)
+        return due
+
+    def _next_due(self) -> Optional[List[int]]:
+        # Aguarda o próximo prazo vencido; retorna None quando o agendador é interrompido.
+        with self._cond:
+            while not self._stop:
+                now = time.time()
+                due = self._pop_due(now - self.grace_seconds)
+                if due:
+                    return due
+                timeout = self._heap[0][0] + self.grace_seconds - now if self._heap else None
+                self._cond.wait(timeout)
+            return None
+
+    def expire(self, session_factory: Callable[[], Session], session_ids: Iterable[int]) -> Dict[int, Optional[float]]:
+        """Submete um lote de sessões expiradas com uma nova sessão do banco e avisa os seus canais.
+
+        Em caso de falha, as sessões são reagendadas após `RETRY_DELAY_SECONDS`.
+        """
+        session_ids = list(session_ids)
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            scores = expire_exam_sessions(db, session_ids)
+        except Exception:
+            logger.exception("Failed to auto-submit %d expired exam sessions; retrying", len(session_ids))
+            db.rollback()
+            retry_at = time.time() + RETRY_DELAY_SECONDS - self.grace_seconds
+            for session_id in session_ids:
+                self.schedule(session_id, retry_at)
+            with self._cond:
+                self.failures += 1
+            return {}
+        finally:
+            db.close()
+        for session_id, score in scores.items():
+            notify_session_submitted(session_id, "time_expired", score=score)
+        with self._cond:
+            self.batches += 1
+            self.expired += len(scores)
+            self._last_batch_seconds = time.perf_counter() - started
+        return scores
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Carrega os prazos do banco e inicia a thread que submete as sessões expiradas."""
+        if self._thread is not None:
+            return
+        db = session_factory()
+        try:
+            logger.info("Scheduled %d exam session deadlines", self.load(db))
+        finally:
+            db.close()
+        with self._cond:
+            self._stop = False
+
+        def _run():
+            while True:
+                due = self._next_due()
+                if due is None:
+                    return
+                self.expire(session_factory, due)
+
+        self._thread = threading.Thread(target=_run, name="session-timer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a thread do agendador."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        """Retorna o número de prazos agendados, o próximo prazo e os contadores de expiração."""
+        with self._cond:
+            next_deadline = None
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if self._heap:
+                next_deadline = datetime.fromtimestamp(self._heap[0][0], tz=timezone.utc).isoformat()
+            return {
+                "running": self._thread is not None,
+                "scheduled": len(self._deadlines),
+                "heap_size": len(self._heap),
+                "next_deadline": next_deadline,
+                "expired": self.expired,
+                "batches": self.batches,
+                "failures": self.failures,
+                "last_batch_ms": round(self._last_batch_seconds * 1000, 3) if self._last_batch_seconds is not None else None,
+            }
+
+
+session_deadlines = SessionDeadlineScheduler(
+    batch_size=settings.SESSION_TIMER_BATCH_SIZE, grace_seconds=settings.SESSION_TIMER_GRACE_SECONDS,
+)
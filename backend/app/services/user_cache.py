@@ -0,0 +1,106 @@
+"""Módulo de cache de usuários autenticados.
+
+Evita a consulta ao banco em `get_current_user` a cada requisição autenticada:
+um cache TTL/LRU, por processo, guarda um retrato do usuário (id, e-mail,
+papel, status e `token_version`) indexado pelo `sub` do token.
+
+Cada token de acesso carrega o claim `ver` com a `token_version` do usuário na
+emissão. A versão é persistida e incrementada a cada alteração de papel, status
+ou e-mail do usuário via ORM; tokens com outra versão são recusados, em todos os
+processos, assim que o retrato em cache expira (`USER_CACHE_TTL_SECONDS`) — no
+processo que fez a alteração, imediatamente.
+"""
+
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Atributos cuja alteração incrementa `token_version` e invalida o cache.
+_VERSIONED_ATTRS = ("role", "is_active", "email")
+
+
+def _snapshot(user: User) -> dict:
+    return {
+        "id": user.id, "email": user.email, "role": user.role, "is_active": user.is_active,
+        "token_version": user.token_version,
+    }
+
+
+def get_cached_user(email: str) -> Optional[User]:
+    """Retorna uma cópia (não vinculada a sessão) do usuário em cache, se houver.
+
+    Args:
+        email (str): O e-mail do usuário (claim `sub` do token).
+
+    Returns:
+        Optional[User]: O usuário em cache, ou None em caso de falta.
+    """
+    data = user_cache.get(email)
+    if data is None:
+        return None
+    return User(**data)
+
+
+def cache_user(user: User) -> None:
+    """Armazena no cache o retrato de um usuário carregado do banco."""
+    user_cache.set(user.email, _snapshot(user))
+
+
+def invalidate_user(email: str) -> None:
+    """Remove um usuário do cache deste processo.
+
+    Args:
+        email (str): O e-mail do usuário.
+    """
+    user_cache.pop(email)
+
+
+def user_claims(user: User) -> dict:
+    """Retorna os claims adicionais do token de acesso: a `token_version` atual do usuário."""
+    return {"ver": user.token_version or 0}
+
+
+def token_is_current(payload: dict, user: User) -> bool:
+    """Indica se o token foi emitido na versão atual do usuário.
+
+    Tokens sem o claim `ver` são tratados como emitidos na versão 0.
+
+    Args:
+        payload (dict): O payload decodificado do token.
+        user (User): O usuário do token (do cache ou do banco).
+
+    Returns:
+        bool: Se o claim `ver` do token corresponde à `token_version` do usuário.
+    """
+    return payload.get("ver", 0) == (user.token_version or 0)
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target: User) -> None:
+    """Incrementa `token_version` quando papel, status ou e-mail do usuário mudam."""
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _VERSIONED_ATTRS):
+        target.token_version = User.token_version + 1
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target: User) -> None:
+    """Invalida o cache quando papel, status ou e-mail do usuário mudam."""
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in _VERSIONED_ATTRS):
+        return
+    invalidate_user(target.email)
+    for old_email in state.attrs.email.history.deleted:
+        invalidate_user(old_email)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: User) -> None:
+    """Invalida o cache quando o usuário é removido."""
+    invalidate_user(target.email)
@@ -0,0 +1,143 @@
+"""Benchmark da correção por sessão versus a pontuação vetorizada de coortes.
+
+Compara, para coortes de 1k, 10k e 100k sessões:
+
+- `kernel`: apenas a avaliação em memória (`grade_responses` sessão a sessão
+  versus `encode_responses` + `score_matrix` sobre a coorte inteira);
+- `db`: o caminho completo em SQLite em memória (`grade_exam_session` chamado
+  para cada sessão versus `grade_exam_sessions_bulk`), limitado por `--db-max`
+  porque a correção sessão a sessão leva minutos nas coortes maiores.
+
+Uso (a partir de `backend/`):
+
+    python -m benchmarks.grading_benchmark --sizes 1000 10000 100000 --questions 20
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import user, fraud_log  # noqa: F401 (registra as tabelas)
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services.answer_key import CompiledQuestion, answer_key_cache
+from app.services.cohort_scoring import encode_responses, score_matrix
+from app.services.exam_session import grade_exam_session
+from app.services.grading import grade_exam_sessions_bulk, grade_responses
+
+OPTIONS = ["a", "b", "c", "d"]
+
+
+def synthetic_cohort(sessions: int, questions: int, seed: int = 42):
+    """Gera um gabarito compilado e respostas aleatórias em memória."""
+    rng = random.Random(seed)
+    key = {
+        question_id: CompiledQuestion(question_id, "multiple_choice", 1, rng.choice(OPTIONS))
+        for question_id in range(1, questions + 1)
+    }
+    responses = []
+    response_id = 0
+    for session_id in range(1, sessions + 1):
+        for question_id in key:
+            response_id += 1
+            responses.append((response_id, session_id, question_id, rng.choice(OPTIONS)))
+    return key, list(range(1, sessions + 1)), responses
+
+
+def bench_kernel(sessions: int, questions: int) -> None:
+    key, session_ids, responses = synthetic_cohort(sessions, questions)
+    by_session = {}
+    for response_id, session_id, question_id, answer in responses:
+        by_session.setdefault(session_id, []).append((response_id, question_id, answer))
+
+    started = time.perf_counter()
+    loop_scores = [grade_responses(key, by_session[session_id])[1] for session_id in session_ids]
+    loop_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matrix = encode_responses(key, session_ids, responses)
+    encode_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    _, scores, _ = score_matrix(matrix)
+    score_elapsed = time.perf_counter() - started
+
+    assert loop_scores == scores.tolist()
+    vector_elapsed = encode_elapsed + score_elapsed
+    print(
+        f"kernel  sessions={sessions:>7} loop={loop_elapsed:8.3f}s "
+        f"vectorized={vector_elapsed:8.3f}s (encode={encode_elapsed:.3f}s score={score_elapsed:.4f}s) "
+        f"speedup={loop_elapsed / vector_elapsed:5.1f}x scoring-only={loop_elapsed / max(score_elapsed, 1e-9):7.1f}x"
+    )
+
+
+def seed_database(db, sessions: int, questions: int) -> int:
+    rng = random.Random(42)
+    exam = Exam(title="benchmark")
+    db.add(exam)
+    db.commit()
+    question_ids = []
+    for _ in range(questions):
+        question = Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=OPTIONS, correct_answer=rng.choice(OPTIONS), points=1)
+        db.add(question)
+        db.flush()
+        question_ids.append(question.id)
+    db.execute(insert(ExamSession), [{"exam_id": exam.id, "status": "submitted"} for _ in range(sessions)])
+    session_ids = [row.id for row in db.query(ExamSession.id).filter(ExamSession.exam_id == exam.id)]
+    db.execute(insert(ExamResponse), [
+        {"session_id": session_id, "question_id": question_id, "answer": rng.choice(OPTIONS)}
+        for session_id in session_ids for question_id in question_ids
+    ])
+    db.commit()
+    return exam.id
+
+
+def bench_db(sessions: int, questions: int) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    answer_key_cache.clear()
+    exam_id = seed_database(db, sessions, questions)
+    session_ids = [row.id for row in db.query(ExamSession.id).filter(ExamSession.exam_id == exam_id)]
+
+    started = time.perf_counter()
+    for session_id in session_ids:
+        grade_exam_session(db, session_id)
+    per_session_elapsed = time.perf_counter() - started
+
+    db.query(ExamSession).update({"status": "submitted"})
+    db.commit()
+    started = time.perf_counter()
+    grade_exam_sessions_bulk(db, exam_id, chunk_size=5000)
+    bulk_elapsed = time.perf_counter() - started
+    print(
+        f"db      sessions={sessions:>7} grade_exam_session={per_session_elapsed:8.3f}s "
+        f"bulk={bulk_elapsed:8.3f}s speedup={per_session_elapsed / bulk_elapsed:5.1f}x"
+    )
+    db.close()
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--db-max", type=int, default=10000, help="Maior coorte executada no benchmark com banco de dados.")
+    args = parser.parse_args()
+
+    for sessions in args.sizes:
+        bench_kernel(sessions, args.questions)
+    for sessions in args.sizes:
+        if sessions <= args.db_max:
+            bench_db(sessions, args.questions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark da serialização das respostas de exames grandes.
+
+Compara, para exames com 50, 500 e 2000 questões (objetos ORM em memória, sem
+banco de dados), o custo de gerar o corpo da resposta de `GET /exams/{id}`:
+
+- `fastapi+json`: o caminho padrão do FastAPI (validação do `response_model`,
+  `field.serialize` e `JSONResponse`, que usa `json.dumps`);
+- `fastapi+orjson`: o mesmo caminho com `ORJSONResponse` como classe padrão
+  (`ORJSON_RESPONSES`);
+- `json_response`: o caminho rápido de `app.core.responses` (validação e
+  geração do JSON no pydantic-core).
+
+Os três corpos são comparados após decodificação para garantir que o JSON
+retornado é o mesmo.
+
+Uso (a partir de `backend/`):
+
+    python -m benchmarks.serialization_benchmark --sizes 50 500 2000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import dump_json
+from app.models import user, fraud_log, exam_session  # noqa: F401 (registra os mapeamentos)
+from app.models.exam import Exam as DBExam, Question as DBQuestion
+from app.schemas.exam import Exam
+
+CONTENT = "Considere o trecho a seguir e assinale a alternativa correta. " * 4
+
+
+def synthetic_exam(questions: int) -> DBExam:
+    """Gera um exame com questões de múltipla escolha, apenas em memória."""
+    now = datetime.now(timezone.utc)
+    exam = DBExam(id=1, title="benchmark", description="Exame sintético", owner_id=1, is_active=True, created_at=now)
+    exam.questions = [
+        DBQuestion(
+            id=index + 1, exam_id=1, content=CONTENT, question_type="multiple_choice",
+            options=[f"Alternativa {option}" for option in "abcde"], correct_answer="Alternativa a",
+            validation_rules={"shuffle": True}, points=1, created_at=now,
+        )
+        for index in range(questions)
+    ]
+    return exam
+
+
+def fastapi_body(field, exam: DBExam, response_class) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=exam))
+    return response_class(content).body
+
+
+def timed(call, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - started) / repeat
+
+
+def bench(questions: int, repeat: int) -> None:
+    exam = synthetic_exam(questions)
+    field = create_response_field(name="Response_read_exam", type_=Exam, mode="serialization")
+
+    bodies = {
+        "fastapi+json": fastapi_body(field, exam, JSONResponse),
+        "fastapi+orjson": fastapi_body(field, exam, ORJSONResponse),
+        "json_response": dump_json(Exam, exam),
+    }
+    expected = json.loads(bodies["fastapi+json"])
+    assert all(json.loads(body) == expected for body in bodies.values())
+
+    baseline = timed(lambda: fastapi_body(field, exam, JSONResponse), repeat)
+    orjson_elapsed = timed(lambda: fastapi_body(field, exam, ORJSONResponse), repeat)
+    fast_elapsed = timed(lambda: dump_json(Exam, exam), repeat)
+    print(
+        f"questions={questions:>5} size={len(bodies['json_response']) / 1024:8.1f}KiB "
+        f"fastapi+json={baseline * 1000:8.2f}ms "
+        f"fastapi+orjson={orjson_elapsed * 1000:8.2f}ms ({baseline / orjson_elapsed:4.1f}x) "
+        f"json_response={fast_elapsed * 1000:8.2f}ms ({baseline / fast_elapsed:4.1f}x)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for questions in args.sizes:
+        bench(questions, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
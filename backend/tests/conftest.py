@@ -0,0 +1,78 @@
+"""Fixtures compartilhadas pelos testes.
+
+Os testes usam, por padrão, um SQLite em memória criado a partir dos modelos.
+Com `--database-url`, os testes que aceitam um banco externo (ver
+`test_query_plans`) usam um banco existente, já migrado.
+"""
+
+import os
+from contextlib import contextmanager
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import user, exam, exam_session, fraud_log, grading_job, exam_analytics  # noqa: F401 (registra as tabelas)
+from app.services.answer_key import answer_key_cache
+from app.services.exam_content import exam_content_cache
+
+
+def pytest_addoption(parser):
+    parser.addoption("--database-url", default=None, help="Banco já migrado para os testes de plano de consulta; por padrão, SQLite em memória.")
+
+
+@pytest.fixture(scope="module")
+def memory_engine():
+    """SQLite em memória, compartilhado entre as threads, com as tabelas dos modelos.
+
+    Os caches do processo indexados por ID são esvaziados, já que os IDs se repetem a cada banco novo.
+    """
+    answer_key_cache.clear()
+    exam_content_cache.clear()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def engine(request):
+    """Engine do módulo de teste: o banco de `--database-url` ou um SQLite em memória."""
+    database_url = request.config.getoption("--database-url")
+    if not database_url:
+        yield request.getfixturevalue("memory_engine")
+        return
+    engine = create_engine(database_url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Conta os comandos SQL emitidos pelo engine dentro de um bloco.
+
+    Uso:
+        with count_queries() as counter:
+            ...
+        assert counter.count <= 2
+    """
+    @contextmanager
+    def _count_queries():
+        class Counter:
+            count = 0
+
+        counter = Counter()
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            counter.count += 1
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+    return _count_queries
@@ -0,0 +1,210 @@
+"""Testes da gravação de respostas com semântica de upsert (autosave)."""
+
+import importlib.util
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services import exam_session as exam_session_service
+from app.services.answer_key import answer_key_cache
+from app.services.autosave import AutosaveBuffer, upsert_responses
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "alembic" / "versions"
+
+
+@pytest.fixture
+def db(engine):
+    """Sessão em uma transação desfeita ao final do teste (funciona também com `--database-url`)."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+@pytest.fixture
+def ids(db):
+    exam = Exam(title="autosave")
+    db.add(exam)
+    db.flush()
+    questions = [
+        Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=1)
+        for _ in range(3)
+    ]
+    sessions = [ExamSession(exam_id=exam.id, user_id=None, status="in_progress") for _ in range(2)]
+    db.add_all(questions + sessions)
+    db.flush()
+    return {"exam_id": exam.id, "question_ids": [q.id for q in questions], "session_ids": [s.id for s in sessions]}
+
+
+def _answers(db, session_ids):
+    rows = db.execute(
+        select(ExamResponse.session_id, ExamResponse.question_id, ExamResponse.answer)
+        .where(ExamResponse.session_id.in_(session_ids))
+    ).all()
+    return {(session_id, question_id): answer for session_id, question_id, answer in rows}
+
+
+def _assert_one_row_per_question(db, session_ids):
+    duplicates = db.execute(
+        select(ExamResponse.session_id, ExamResponse.question_id)
+        .where(ExamResponse.session_id.in_(session_ids))
+        .group_by(ExamResponse.session_id, ExamResponse.question_id)
+        .having(func.count() > 1)
+    ).all()
+    assert duplicates == []
+
+
+@pytest.fixture(params=["on_conflict", "generic"])
+def dialect(request, db, monkeypatch):
+    """Exercita o ON CONFLICT do banco em uso e o DELETE + INSERT dos demais bancos."""
+    if request.param == "generic":
+        monkeypatch.setattr(db.get_bind().dialect, "name", "generic")
+    return request.param
+
+
+def test_repeated_saves_keep_one_row_per_question(db, ids, dialect):
+    session_id, other_id = ids["session_ids"]
+    first, second, _ = ids["question_ids"]
+
+    for answer in ["b", "a", "b", "a"]:
+        upsert_responses(db, [
+            {"session_id": session_id, "question_id": first, "answer": answer},
+            {"session_id": other_id, "question_id": first, "answer": "b"},
+        ])
+        db.flush()
+    upsert_responses(db, [{"session_id": session_id, "question_id": second, "answer": "b"}])
+    db.flush()
+
+    _assert_one_row_per_question(db, ids["session_ids"])
+    assert _answers(db, ids["session_ids"]) == {
+        (session_id, first): "a",
+        (session_id, second): "b",
+        (other_id, first): "b",
+    }
+
+
+def test_last_write_wins_within_a_batch(db, ids, dialect, monkeypatch):
+    session_id = ids["session_ids"][0]
+    first, second, _ = ids["question_ids"]
+    rows = [
+        {"session_id": session_id, "question_id": first, "answer": "b"},
+        {"session_id": session_id, "question_id": second, "answer": "a"},
+        {"session_id": session_id, "question_id": first, "answer": "a"},
+    ]
+    # Blocos de uma linha: a última resposta da mesma questão chega em um comando posterior.
+    monkeypatch.setattr("app.services.autosave.settings.AUTOSAVE_UPSERT_CHUNK_SIZE", 1)
+
+    upsert_responses(db, rows)
+    db.flush()
+
+    _assert_one_row_per_question(db, ids["session_ids"])
+    assert _answers(db, [session_id]) == {(session_id, first): "a", (session_id, second): "a"}
+
+
+def test_changed_answer_is_rescored(db, ids, dialect):
+    session_id = ids["session_ids"][0]
+    question_id = ids["question_ids"][0]
+
+    upsert_responses(db, [{"session_id": session_id, "question_id": question_id, "answer": "a"}])
+    written = upsert_responses(db, [{"session_id": session_id, "question_id": question_id, "answer": "b"}], returning=True)
+
+    assert [(r.answer, r.is_correct, r.points_earned) for r in written] == [("b", False, 0)]
+
+
+def test_migration_keeps_latest_response_per_question():
+    pytest.importorskip("alembic.migration")
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    spec = importlib.util.spec_from_file_location("unique_exam_response", MIGRATIONS / "4b7e2d91a3c5_unique_exam_response_per_question.py")
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX uq_exam_responses_session_question"))
+        connection.execute(insert(ExamResponse), [
+            {"id": 1, "session_id": 1, "question_id": 1, "answer": "old"},
+            {"id": 2, "session_id": 1, "question_id": 2, "answer": "only"},
+            {"id": 3, "session_id": 1, "question_id": 1, "answer": "new"},
+            {"id": 4, "session_id": 2, "question_id": 1, "answer": "other"},
+        ])
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+        rows = connection.execute(select(ExamResponse.id, ExamResponse.answer).order_by(ExamResponse.id)).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [(2, "only"), (3, "new"), (4, "other")]
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """SQLite em arquivo, com uma conexão por thread."""
+    answer_key_cache.clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'autosave.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+    answer_key_cache.clear()
+
+
+def test_submit_waits_for_in_flight_background_flush(file_session_factory, monkeypatch):
+    with file_session_factory() as db:
+        exam = Exam(title="autosave")
+        db.add(exam)
+        db.flush()
+        question = Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=2)
+        session = ExamSession(exam_id=exam.id, user_id=None, status="in_progress")
+        db.add_all([question, session])
+        db.commit()
+        session_id, question_id = session.id, question.id
+
+    buffer = AutosaveBuffer(max_pending=100, max_attempts=5)
+    monkeypatch.setattr(exam_session_service, "autosave_buffer", buffer)
+    writing, release = threading.Event(), threading.Event()
+
+    def _blocked_write(db, rows, exam_ids):
+        writing.set()
+        release.wait(5)
+        AutosaveBuffer._write(db, rows, exam_ids)
+
+    monkeypatch.setattr(buffer, "_write", _blocked_write)
+    buffer.add(session_id, {question_id: "a"})
+
+    background = threading.Thread(target=buffer.flush_with, args=(file_session_factory,))
+    background.start()
+    assert writing.wait(5)
+
+    def _submit():
+        with file_session_factory() as db:
+            exam_session_service.flush_exam_responses(db, session_id)
+            exam_session_service.submit_exam_session(db, session_id, datetime.now())
+
+    submit = threading.Thread(target=_submit)
+    submit.start()
+    submit.join(0.2)
+    assert submit.is_alive(), "a submissão não aguardou a gravação em andamento"
+
+    release.set()
+    background.join(5)
+    submit.join(5)
+
+    with file_session_factory() as db:
+        submitted = db.get(ExamSession, session_id)
+        answers = db.scalars(select(ExamResponse.answer).where(ExamResponse.session_id == session_id)).all()
+    assert submitted.status == "submitted"
+    assert answers == ["a"]
+    assert submitted.score == 2.0
+    assert buffer.stats()["dropped"] == 0
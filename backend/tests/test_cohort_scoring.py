@@ -0,0 +1,79 @@
+"""Verifica que a pontuação vetorizada concorda com a correção sessão a sessão."""
+
+import random
+
+import pytest
+
+from app.services.answer_key import CompiledQuestion
+from app.services.cohort_scoring import encode_responses, response_updates, score_matrix
+from app.services.grading import grade_responses
+
+KEY = {
+    1: CompiledQuestion(1, "multiple_choice", 2, "a"),
+    2: CompiledQuestion(2, "true_false", 3, True),
+    3: CompiledQuestion(3, "true_false", 1, False),
+    4: CompiledQuestion(4, "short_answer", 5, ["x", "y"]),
+    # Sem resposta correta: nunca pontua.
+    5: CompiledQuestion(5, "essay", 4, None),
+}
+
+
+def _by_id(rows):
+    return {row["id"]: (row["is_correct"], row["points_earned"]) for row in rows}
+
+
+def _assert_equivalent(key, session_ids, responses):
+    by_session = {session_id: [] for session_id in session_ids}
+    for response_id, session_id, question_id, answer in responses:
+        by_session[session_id].append((response_id, question_id, answer))
+    loop_rows, loop_scores = [], []
+    for session_id in session_ids:
+        rows, score = grade_responses(key, by_session[session_id])
+        loop_rows.extend(rows)
+        loop_scores.append(score)
+
+    matrix = encode_responses(key, session_ids, responses)
+    correct, scores, _ = score_matrix(matrix)
+
+    assert scores.tolist() == loop_scores
+    assert _by_id(response_updates(matrix, correct)) == _by_id(loop_rows)
+
+
+def test_duplicates_keep_the_latest_answer():
+    responses = [
+        (1, 10, 1, "a"), (5, 10, 1, "b"),  # a mais recente (ID 5) está errada
+        (3, 11, 1, "b"), (2, 11, 1, "a"),  # a mais recente (ID 3) está errada, fora de ordem
+        (4, 12, 1, "b"), (6, 12, 1, " a "),
+    ]
+    _assert_equivalent(KEY, [10, 11, 12], responses)
+
+
+def test_unknown_question_ids_do_not_score():
+    responses = [(1, 10, 99, "a"), (2, 10, 1, "a"), (3, 11, 99, "x")]
+    _assert_equivalent(KEY, [10, 11], responses)
+
+
+def test_true_false_normalization():
+    answers = [True, False, "sim", "Verdadeiro", "f", "0", 1, 0, "nao"]
+    responses = [(index + 1, 10 + index, 2, answer) for index, answer in enumerate(answers)]
+    responses += [(100 + index, 10 + index, 3, answer) for index, answer in enumerate(answers)]
+    _assert_equivalent(KEY, [10 + index for index in range(len(answers))], responses)
+
+
+def test_answers_that_do_not_normalize():
+    responses = [
+        (1, 10, 2, "talvez"), (2, 10, 2, 7), (3, 10, 3, None), (4, 10, 1, ["a"]),
+        (5, 11, 4, ["x", "y"]), (6, 11, 4, {"x": 1}), (7, 11, 5, "qualquer"), (8, 12, 2, 2.5),
+    ]
+    _assert_equivalent(KEY, [10, 11, 12], responses)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_cohorts(seed):
+    rng = random.Random(seed)
+    pool = ["a", "b", " a", True, False, "true", "no", 1, None, ["x", "y"], "x"]
+    session_ids = list(range(1, 41))
+    responses = []
+    for response_id in rng.sample(range(1, 10000), 300):
+        responses.append((response_id, rng.choice(session_ids), rng.choice([1, 2, 3, 4, 5, 99]), rng.choice(pool)))
+    _assert_equivalent(KEY, session_ids, responses)
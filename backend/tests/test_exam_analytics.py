@@ -0,0 +1,56 @@
+"""Testes do recálculo sob demanda das estatísticas de um exame."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services import exam_analytics as exam_analytics_service
+from app.services.exam_analytics import exam_analytics_refresher, refresh_exam_analytics
+
+
+@pytest.fixture
+def db(memory_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def exam_id(db):
+    exam = Exam(title="analytics")
+    db.add(exam)
+    db.flush()
+    question = Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=1)
+    session = ExamSession(exam_id=exam.id, user_id=None, status="graded", is_active=False, score=1.0)
+    db.add_all([question, session])
+    db.flush()
+    db.add(ExamResponse(session_id=session.id, question_id=question.id, answer="a", is_correct=True, points_earned=1))
+    db.commit()
+    yield exam.id
+    exam_analytics_refresher.discard(exam.id)
+
+
+def test_refresh_clears_in_memory_mark(db, exam_id):
+    exam_analytics_refresher.mark_stale([exam_id])
+
+    analytics = refresh_exam_analytics(db, exam_id)
+
+    assert analytics.session_count == 1
+    assert not analytics.stale
+    assert not exam_analytics_refresher.is_marked(exam_id)
+
+
+def test_failed_refresh_keeps_in_memory_mark(db, exam_id, monkeypatch):
+    def _fail(db, exam_id, bins=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(exam_analytics_service, "compute_exam_analytics", _fail)
+    exam_analytics_refresher.mark_stale([exam_id])
+
+    with pytest.raises(RuntimeError):
+        refresh_exam_analytics(db, exam_id)
+
+    assert exam_analytics_refresher.is_marked(exam_id)
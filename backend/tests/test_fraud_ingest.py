@@ -0,0 +1,97 @@
+"""Testes da gravação em lote dos eventos de fraude."""
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import DataError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam
+from app.models.exam_session import ExamSession
+from app.models.fraud_log import FraudLog
+from app.schemas.fraud_log import FraudLogCreate
+from app.services.fraud_ingest import FraudEventQueue
+
+
+@pytest.fixture
+def db(memory_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def session_id(db):
+    exam = Exam(title="fraude")
+    db.add(exam)
+    db.flush()
+    session = ExamSession(exam_id=exam.id, user_id=None, status="in_progress")
+    db.add(session)
+    db.commit()
+    return session.id
+
+
+@pytest.fixture
+def reject(memory_engine):
+    """Faz o banco recusar os INSERTs com `details` contendo o texto dado, como o Postgres com um byte NUL."""
+    rejected = {}
+
+    def _reject(conn, cursor, statement, parameters, context, executemany):
+        batch = parameters if executemany else [parameters]
+        if statement.startswith("INSERT INTO fraud_logs") and any(rejected["marker"] in str(p) for p in batch):
+            raise rejected["error"]("INSERT INTO fraud_logs", parameters, Exception("rejected"))
+
+    def _configure(marker, error=DataError):
+        rejected.update(marker=marker, error=error)
+
+    event.listen(memory_engine, "before_cursor_execute", _reject)
+    yield _configure
+    event.remove(memory_engine, "before_cursor_execute", _reject)
+
+
+def _details(db, session_id):
+    return sorted(db.scalars(select(FraudLog.details).where(FraudLog.session_id == session_id)))
+
+
+def test_rejected_event_is_dropped_without_blocking_the_batch(db, session_id, reject):
+    reject("poison")
+    queue = FraudEventQueue(max_pending=10, batch_size=10)
+    queue.put([FraudLogCreate(session_id=session_id, event_type="blur", details=d) for d in ["a", "poison", "b"]])
+
+    assert queue.flush(db) == 2
+
+    assert len(queue) == 0
+    assert queue.stats()["dropped"] == 1
+    assert _details(db, session_id) == ["a", "b"]
+
+
+def test_missing_session_and_rejected_event_are_both_dropped(db, session_id, reject):
+    reject("poison")
+    queue = FraudEventQueue(max_pending=10, batch_size=10)
+    queue.put([
+        FraudLogCreate(session_id=session_id, event_type="blur", details="a"),
+        FraudLogCreate(session_id=session_id + 1000, event_type="blur", details="orphan"),
+        FraudLogCreate(session_id=session_id, event_type="blur", details="poison"),
+    ])
+    db.connection().exec_driver_sql("PRAGMA foreign_keys = ON")
+
+    try:
+        assert queue.flush(db) == 1
+    finally:
+        db.connection().exec_driver_sql("PRAGMA foreign_keys = OFF")
+
+    assert queue.stats()["dropped"] == 2
+    assert _details(db, session_id) == ["a"]
+
+
+def test_connection_failure_keeps_the_batch_queued(db, session_id, reject):
+    reject("", OperationalError)
+    queue = FraudEventQueue(max_pending=10, batch_size=10)
+    queue.put([FraudLogCreate(session_id=session_id, event_type="blur", details=d) for d in ["a", "b"]])
+
+    with pytest.raises(OperationalError):
+        queue.flush(db)
+
+    assert len(queue) == 2
+    assert queue.stats()["dropped"] == 0
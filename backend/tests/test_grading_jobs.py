@@ -0,0 +1,139 @@
+"""Testes da fila de correção assíncrona (`grading_jobs`)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession
+from app.models.grading_job import GradingJob
+from app.services.autosave import upsert_responses
+from app.services.grading_jobs import GradingWorkerPool, enqueue_grading_jobs
+
+
+@pytest.fixture
+def db(memory_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    db.query(GradingJob).delete()
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def session_ids(db):
+    """Três sessões submetidas de um exame com uma questão, cada uma com um job pendente."""
+    exam = Exam(title="jobs")
+    db.add(exam)
+    db.flush()
+    question = Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=2)
+    sessions = [ExamSession(exam_id=exam.id, user_id=None, status="in_progress") for _ in range(3)]
+    db.add_all([question, *sessions])
+    db.flush()
+    ids = [session.id for session in sessions]
+    upsert_responses(db, [{"session_id": sid, "question_id": question.id, "answer": "a"} for sid in ids], exam_ids=dict.fromkeys(ids, exam.id))
+    db.execute(update(ExamSession).where(ExamSession.id.in_(ids)).values(status="submitted", score=None))
+    enqueue_grading_jobs(db, ids)
+    db.commit()
+    return ids
+
+
+def _pool(**kwargs):
+    options = {"workers": 1, "batch_size": 10, "max_attempts": 3, "lock_timeout": 60}
+    return GradingWorkerPool(**{**options, **kwargs})
+
+
+def _jobs(db):
+    db.expire_all()
+    return {job.session_id: job for job in db.query(GradingJob)}
+
+
+def test_claim_skips_jobs_taken_by_another_worker(db, memory_engine, session_ids):
+    stolen = session_ids[0]
+    state = {"done": False}
+
+    def _steal(conn, cursor, statement, parameters, context, executemany):
+        # Outro worker assume um dos candidatos entre a consulta e o UPDATE condicional.
+        if statement.startswith("UPDATE grading_jobs") and not state["done"]:
+            state["done"] = True
+            cursor.execute(
+                "UPDATE grading_jobs SET status = 'running', locked_by = 'other', locked_at = ?, attempts = attempts + 1 WHERE session_id = ?",
+                (datetime.utcnow(), stolen),
+            )
+
+    event.listen(memory_engine, "before_cursor_execute", _steal)
+    try:
+        claimed = _pool().claim(db)
+    finally:
+        event.remove(memory_engine, "before_cursor_execute", _steal)
+
+    assert sorted(job.session_id for job in claimed) == session_ids[1:]
+    assert len({job.locked_by for job in claimed}) == 1
+    jobs = _jobs(db)
+    assert (jobs[stolen].locked_by, jobs[stolen].attempts) == ("other", 1)
+    assert _pool().claim(db) == []
+
+
+def test_claim_respects_the_batch_size(db, session_ids):
+    first = _pool(batch_size=2).claim(db)
+    second = _pool(batch_size=2).claim(db)
+
+    assert len(first) == 2
+    assert {job.session_id for job in first} | {job.session_id for job in second} == set(session_ids)
+    assert {job.session_id for job in first}.isdisjoint(job.session_id for job in second)
+
+
+def test_stale_lock_is_reclaimed_after_lock_timeout(db, session_ids):
+    crashed = _pool(lock_timeout=60).claim(db)
+    assert _pool(lock_timeout=60).claim(db) == []
+
+    db.execute(update(GradingJob).values(locked_at=datetime.utcnow() - timedelta(seconds=61)))
+    db.commit()
+    reclaimed = _pool(lock_timeout=60).claim(db)
+
+    assert sorted(job.session_id for job in reclaimed) == session_ids
+    assert {job.attempts for job in reclaimed} == {2}
+    # O worker antigo não conclui jobs que já não são seus.
+    _pool()._finish(db, crashed)
+    assert {job.status for job in _jobs(db).values()} == {"running"}
+
+
+def test_failures_back_off_exponentially_until_failed(db, session_ids, monkeypatch):
+    monkeypatch.setattr("app.services.grading_jobs.settings.GRADING_JOB_RETRY_BACKOFF_SECONDS", 2.0)
+    pool = _pool(max_attempts=3)
+
+    for attempt, delay in [(1, 2), (2, 4)]:
+        jobs = pool.claim(db)
+        started = datetime.utcnow()
+        pool._fail(db, jobs, RuntimeError("boom"))
+        for job in _jobs(db).values():
+            assert (job.status, job.attempts, job.locked_by, job.last_error) == ("pending", attempt, None, "RuntimeError: boom")
+            assert timedelta(seconds=delay - 1) < job.run_after - started <= timedelta(seconds=delay + 1)
+        assert pool.claim(db) == []  # ainda dentro da espera
+        db.execute(update(GradingJob).values(run_after=datetime.utcnow()))
+        db.commit()
+
+    pool._fail(db, pool.claim(db), RuntimeError("boom"))
+
+    assert {(job.status, job.attempts) for job in _jobs(db).values()} == {("failed", 3)}
+    assert (pool.retried, pool.failed) == (6, 3)
+    assert pool.claim(db) == []
+
+
+def test_run_jobs_skips_deleted_and_reopened_sessions(db, session_ids):
+    graded, reopened, deleted = session_ids
+    db.get(ExamSession, reopened).status = "in_progress"
+    db.delete(db.get(ExamSession, deleted))
+    db.commit()
+    pool = _pool()
+
+    scores = pool.run_jobs(db, pool.claim(db))
+
+    assert scores == {graded: 2.0}
+    assert {job.status for job in _jobs(db).values()} == {"done"}
+    assert db.get(ExamSession, reopened).score is None
+    assert pool.completed == 3
@@ -0,0 +1,115 @@
+"""Verifica o número de consultas SQL de cada caminho de leitura e de submissão da API.
+
+Cada teste executa o que o endpoint faz (serviço + validação do schema de
+resposta, que é onde carregamentos preguiçosos aconteceriam) sobre um SQLite
+em memória com dados suficientes para expor N+1 e compara o número de
+comandos emitidos com o orçamento do caminho.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam as DBExam, Question as DBQuestion
+from app.models.exam_session import ExamSession as DBExamSession
+from app.models.user import User
+from app.schemas.exam import Exam, ExamSummary
+from app.schemas.exam_session import ExamSession, ExamSessionSummary, ExamSessionUpdate
+from app.services import exam as exam_service
+from app.services import exam_session as exam_session_service
+from app.services.answer_key import answer_key_cache
+from app.services.autosave import upsert_responses
+from app.services.score_calculator import calculate_exam_score
+
+EXAMS = 30
+QUESTIONS = 20
+
+
+def seed(db) -> dict:
+    user = User(email="teacher@example.com", hashed_password="x", role="teacher")
+    db.add(user)
+    db.flush()
+    session_ids = []
+    for index in range(EXAMS):
+        exam = DBExam(title=f"exam {index}", owner_id=user.id)
+        db.add(exam)
+        db.flush()
+        questions = [
+            DBQuestion(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=1)
+            for _ in range(QUESTIONS)
+        ]
+        db.add_all(questions)
+        db.flush()
+        session = DBExamSession(exam_id=exam.id, user_id=user.id, status="in_progress")
+        db.add(session)
+        db.flush()
+        session_ids.append(session.id)
+        # Gravadas como pela API, corrigidas no salvamento com INCREMENTAL_SCORING.
+        upsert_responses(
+            db, [{"session_id": session.id, "question_id": question.id, "answer": "a"} for question in questions],
+            exam_ids={session.id: exam.id},
+        )
+    db.commit()
+    # Sessões distintas para a leitura e para cada caminho de submissão.
+    return {"user_id": user.id, "exam_id": exam.id, "session_id": session_ids[-1], "submit_ids": session_ids[:2]}
+
+
+def submit(db, session_id: int) -> ExamSession:
+    session = exam_session_service.submit_exam_session(db, session_id=session_id, end_time=datetime.utcnow())
+    return ExamSession.model_validate(session)
+
+
+def submit_inline(db, session_id: int) -> ExamSession:
+    session = exam_session_service.update_exam_session(db, session_id=session_id, session_update=ExamSessionUpdate(status="submitted"))
+    calculate_exam_score(db, session)
+    return ExamSession.model_validate(session)
+
+
+# Caminho -> (orçamento de consultas, chamada equivalente à do endpoint).
+PATHS = {
+    "GET /exams/": (1, lambda db, ids: [ExamSummary.model_validate(row) for row in exam_service.get_exam_summaries(db)]),
+    "GET /exams/?expand=questions": (2, lambda db, ids: [
+        ExamSummary.model_validate(row) for row in exam_service.get_exam_summaries(db, with_questions=True)
+    ]),
+    "GET /exams/{id}": (2, lambda db, ids: Exam.model_validate(exam_service.get_exam(db, ids["exam_id"], with_questions=True))),
+    "GET /exams/{id}/questions/": (1, lambda db, ids: exam_service.get_questions_by_exam(db, ids["exam_id"])),
+    "GET /exam-sessions/me/": (1, lambda db, ids: [
+        ExamSessionSummary.model_validate(row) for row in exam_session_service.get_exam_sessions_by_user(db, ids["user_id"])
+    ]),
+    "GET /exam-sessions/me/?expand=responses": (2, lambda db, ids: [
+        ExamSessionSummary.model_validate(row)
+        for row in exam_session_service.get_exam_sessions_by_user(db, ids["user_id"], with_responses=True)
+    ]),
+    "GET /exam-sessions/{id}": (2, lambda db, ids: ExamSession.model_validate(
+        exam_session_service.get_exam_session(db, ids["session_id"], with_responses=True)
+    )),
+    "POST /exam-sessions/{id}/submit/": (7, lambda db, ids: submit(db, ids["submit_ids"][0])),
+    "POST /exam-sessions/{id}/submit/ (inline)": (9, lambda db, ids: submit_inline(db, ids["submit_ids"][1])),
+}
+
+
+@pytest.fixture(scope="module")
+def engine(memory_engine):
+    # Sempre o SQLite em memória: os orçamentos não dependem de `--database-url`.
+    return memory_engine
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db, seed(db)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("path", list(PATHS))
+def test_query_budget(seeded, count_queries, path):
+    db, ids = seeded
+    budget, call = PATHS[path]
+    db.expire_all()
+    answer_key_cache.clear()
+    with count_queries() as counter:
+        call(db, ids)
+    assert counter.count <= budget, f"{path}: {counter.count} queries, budget {budget}"
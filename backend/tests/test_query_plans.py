@@ -0,0 +1,124 @@
+"""Verifica se as consultas dos serviços usam índices (sem varredura sequencial).
+
+Cada teste executa uma função de serviço do fluxo de prova e de correção,
+captura os SELECTs que ela emite e roda EXPLAIN em cada um; o teste falha se
+alguma consulta varrer sequencialmente uma das tabelas da aplicação.
+
+Tudo é executado em uma transação desfeita ao final, de modo que os testes
+também podem rodar contra um banco existente (`pytest --database-url ...`). No
+Postgres, `enable_seqscan` é desativado para que o resultado não dependa do
+tamanho das tabelas.
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession, ExamResponse
+from app.services import exam as exam_service
+from app.services import exam_session as exam_session_service
+from app.services.answer_key import compile_answer_key
+from app.services.exam_analytics import (
+    compute_exam_analytics, count_stale_exams, get_question_analytics, mark_exam_analytics_stale, stale_exam_ids,
+)
+from app.services.exam_export import iter_session_results
+from app.services.grading import grade_exam_sessions_bulk, unscored_sessions
+from app.services.grading_jobs import enqueue_grading_jobs, get_grading_job, grading_workers
+
+TABLES = {
+    "users", "exams", "questions", "exam_sessions", "exam_responses", "fraud_logs", "grading_jobs",
+    "exam_analytics", "question_analytics",
+}
+
+# Consulta de serviço -> chamada, com a sessão do banco e os IDs criados por `seed`.
+SERVICE_QUERIES = {
+    "get_exam": lambda db, ids: exam_service.get_exam(db, ids["exam_id"]),
+    "get_questions_by_exam": lambda db, ids: exam_service.get_questions_by_exam(db, ids["exam_id"]),
+    "get_exam_question_ids": lambda db, ids: exam_service.get_exam_question_ids(db, ids["exam_id"], [ids["question_id"]]),
+    "get_exam_session": lambda db, ids: exam_session_service.get_exam_session(db, ids["session_id"]),
+    "get_active_exam_session": lambda db, ids: exam_session_service.get_active_exam_session(db, ids["exam_id"], 1),
+    "get_exam_sessions_by_user": lambda db, ids: exam_session_service.get_exam_sessions_by_user(db, 1),
+    "get_exam_responses_by_session": lambda db, ids: exam_session_service.get_exam_responses_by_session(db, ids["session_id"]),
+    "get_exam_progress": lambda db, ids: exam_session_service.get_exam_progress(db, ids["exam_id"]),
+    "unscored_sessions": lambda db, ids: unscored_sessions(db, [ids["session_id"]]),
+    "compile_answer_key": lambda db, ids: compile_answer_key(db, ids["exam_id"]),
+    "grade_exam_sessions_bulk": lambda db, ids: grade_exam_sessions_bulk(db, ids["exam_id"]),
+    "get_grading_job": lambda db, ids: get_grading_job(db, ids["session_id"]),
+    "claim_grading_jobs": lambda db, ids: grading_workers.claim(db),
+    "mark_exam_analytics_stale": lambda db, ids: mark_exam_analytics_stale(db, [ids["exam_id"]]),
+    "stale_exam_ids": lambda db, ids: stale_exam_ids(db, 50),
+    "count_stale_exams": lambda db, ids: count_stale_exams(db),
+    "compute_exam_analytics": lambda db, ids: compute_exam_analytics(db, ids["exam_id"]),
+    "get_question_analytics": lambda db, ids: get_question_analytics(db, ids["exam_id"]),
+    "export_exam_results": lambda db, ids: list(iter_session_results(db, ids["exam_id"], with_responses=True)),
+}
+
+
+def seed(db: Session) -> dict:
+    exam = Exam(title="query plans")
+    db.add(exam)
+    db.flush()
+    question = Question(exam_id=exam.id, content="q", question_type="multiple_choice", options=["a", "b"], correct_answer="a", points=1)
+    session = ExamSession(exam_id=exam.id, user_id=None, status="submitted", is_active=False)
+    db.add_all([question, session])
+    db.flush()
+    db.add(ExamResponse(session_id=session.id, question_id=question.id, answer="a"))
+    enqueue_grading_jobs(db, [session.id])
+    db.flush()
+    return {"exam_id": exam.id, "question_id": question.id, "session_id": session.id}
+
+
+def sequential_scans(connection, statement: str, parameters) -> list:
+    """Retorna as tabelas da aplicação varridas sequencialmente pelo comando."""
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        nodes, scans = [plan[0]["Plan"]], []
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in TABLES:
+                scans.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return scans
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    scans = []
+    for row in rows:
+        detail = row[-1].split()
+        if detail[0] == "SCAN" and detail[1] in TABLES and "INDEX" not in detail:
+            scans.append(detail[1])
+    return scans
+
+
+@pytest.fixture(scope="module")
+def plan_db(engine):
+    """Conexão, sessão e IDs dos dados de teste, em uma transação desfeita ao final do módulo."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield connection, db, seed(db)
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+@pytest.mark.parametrize("name", list(SERVICE_QUERIES))
+def test_service_query_uses_indexes(plan_db, name):
+    connection, db, ids = plan_db
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        db.expire_all()
+        SERVICE_QUERIES[name](db, ids)
+    finally:
+        event.remove(connection, "before_cursor_execute", _capture)
+
+    scans = sorted({table for statement, parameters in statements for table in sequential_scans(connection, statement, parameters)})
+    assert not scans, f"{name} scans {', '.join(scans)} sequentially"
@@ -0,0 +1,102 @@
+"""Verifica que a pontuação parcial (`INCREMENTAL_SCORING`) coincide com a correção completa."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession, ExamResponse
+from app.models.grading_job import GradingJob
+from app.schemas.exam_session import ExamResponseCreate
+from app.services import exam_session as exam_session_service
+from app.services.answer_key import get_answer_key
+from app.services.grading import grade_responses, grade_sessions
+
+
+@pytest.fixture
+def db(memory_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def incremental_scoring(monkeypatch):
+    monkeypatch.setattr("app.services.autosave.settings.INCREMENTAL_SCORING", True)
+    monkeypatch.setattr("app.services.autosave.settings.AUTOSAVE_WRITE_BEHIND", False)
+    monkeypatch.setattr("app.services.autosave.settings.GRADING_JOBS_ENABLED", True)
+
+
+def _exam(db, *questions):
+    exam = Exam(title="running score")
+    db.add(exam)
+    db.flush()
+    db_questions = [
+        Question(exam_id=exam.id, content="q", question_type=question_type, options=["a", "b"], correct_answer=correct, points=points)
+        for question_type, correct, points in questions
+    ]
+    session = ExamSession(exam_id=exam.id, user_id=None, status="in_progress")
+    db.add_all([*db_questions, session])
+    db.commit()
+    return exam.id, [question.id for question in db_questions], session.id
+
+
+def _save(db, exam_id, session_id, answers):
+    responses = [ExamResponseCreate(question_id=question_id, answer=answer) for question_id, answer in answers.items()]
+    exam_session_service.create_exam_responses(db, responses, session_id=session_id, exam_id=exam_id)
+
+
+def _running_score(db, session_id):
+    db.expire_all()
+    return db.get(ExamSession, session_id).score
+
+
+def _full_score(db, exam_id, session_id):
+    responses = db.query(ExamResponse.id, ExamResponse.question_id, ExamResponse.answer).filter(ExamResponse.session_id == session_id).all()
+    return grade_responses(get_answer_key(db, exam_id), responses)[1]
+
+
+def test_running_score_follows_changed_answers(db):
+    exam_id, (choice, true_false), session_id = _exam(db, ("multiple_choice", "a", 2), ("true_false", True, 3))
+
+    for answers in [{choice: "a"}, {choice: "b", true_false: "sim"}, {choice: "a"}, {true_false: False}, {true_false: "verdadeiro"}]:
+        _save(db, exam_id, session_id, answers)
+        assert _running_score(db, session_id) == _full_score(db, exam_id, session_id)
+    assert _running_score(db, session_id) == 5.0
+
+    submitted = exam_session_service.submit_exam_session(db, session_id, datetime.utcnow())
+
+    assert submitted.score == 5.0
+    assert db.query(GradingJob).filter(GradingJob.session_id == session_id).count() == 0
+
+
+def test_mixed_exam_falls_back_to_a_grading_job(db):
+    exam_id, (choice, essay), session_id = _exam(db, ("multiple_choice", "a", 2), ("essay", None, 4))
+    _save(db, exam_id, session_id, {choice: "a", essay: "texto"})
+    assert _running_score(db, session_id) == 2.0
+
+    submitted = exam_session_service.submit_exam_session(db, session_id, datetime.utcnow())
+
+    assert submitted.score is None
+    assert db.query(GradingJob.status).filter(GradingJob.session_id == session_id).scalar() == "pending"
+    assert grade_sessions(db, exam_id, [session_id]) == {session_id: _full_score(db, exam_id, session_id)}
+
+
+def test_answers_saved_before_incremental_scoring_are_graded_on_submit(db, monkeypatch):
+    exam_id, (first, second), session_id = _exam(db, ("multiple_choice", "a", 2), ("multiple_choice", "b", 3))
+    monkeypatch.setattr("app.services.autosave.settings.INCREMENTAL_SCORING", False)
+    _save(db, exam_id, session_id, {first: "a"})
+    monkeypatch.setattr("app.services.autosave.settings.INCREMENTAL_SCORING", True)
+    _save(db, exam_id, session_id, {second: "b"})
+    # A resposta antiga não foi corrigida: a pontuação parcial está incompleta.
+    assert _running_score(db, session_id) == 3.0
+
+    submitted = exam_session_service.submit_exam_session(db, session_id, datetime.utcnow())
+
+    assert submitted.score is None
+    assert db.query(GradingJob.status).filter(GradingJob.session_id == session_id).scalar() == "pending"
+    assert grade_sessions(db, exam_id, [session_id]) == {session_id: 5.0}
+    assert _running_score(db, session_id) == _full_score(db, exam_id, session_id)
@@ -0,0 +1,122 @@
+"""Testes do cronômetro das sessões de exame no servidor."""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.exam import Exam, Question
+from app.models.exam_session import ExamSession
+from app.models.grading_job import GradingJob
+from app.models.user import User
+from app.schemas.exam_session import ExamSessionCreate
+from app.services import exam_session as exam_session_service
+from app.services.autosave import upsert_responses
+from app.services.session_timer import SessionDeadlineScheduler, expire_exam_sessions, session_deadlines
+
+
+@pytest.fixture
+def db(memory_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _exam(db, question_types):
+    exam = Exam(title="timer", duration_minutes=30)
+    db.add(exam)
+    db.flush()
+    questions = [
+        Question(exam_id=exam.id, content="q", question_type=question_type, options=["a", "b"], correct_answer="a", points=2)
+        for question_type in question_types
+    ]
+    db.add_all(questions)
+    db.flush()
+    return exam, questions
+
+
+def _session(db, exam, questions, answer="a"):
+    session = ExamSession(exam_id=exam.id, user_id=None, status="in_progress")
+    db.add(session)
+    db.flush()
+    upsert_responses(db, [{"session_id": session.id, "question_id": q.id, "answer": answer} for q in questions], exam_ids={session.id: exam.id})
+    db.commit()
+    return session.id
+
+
+def test_pop_due_skips_stale_and_cancelled_entries():
+    scheduler = SessionDeadlineScheduler(batch_size=10, grace_seconds=0)
+    scheduler.schedule(1, 10.0)
+    scheduler.schedule(2, 20.0)
+    scheduler.schedule(3, 30.0)
+    scheduler.schedule(1, 40.0)  # reagendada: a entrada de 10.0 fica obsoleta no heap
+    scheduler.cancel(2)
+
+    assert scheduler._pop_due(35.0) == [3]
+    assert scheduler._pop_due(35.0) == []
+    assert scheduler.deadline(1) == 40.0
+    assert scheduler._pop_due(40.0) == [1]
+    assert len(scheduler) == 0
+
+
+def test_pop_due_limits_the_batch():
+    scheduler = SessionDeadlineScheduler(batch_size=2, grace_seconds=0)
+    for session_id in range(1, 6):
+        scheduler.schedule(session_id, float(session_id))
+
+    assert scheduler._pop_due(100.0) == [1, 2]
+    assert scheduler._pop_due(100.0) == [3, 4]
+    assert scheduler._pop_due(100.0) == [5]
+
+
+def test_expire_keeps_running_score_of_objective_exams(db, monkeypatch):
+    monkeypatch.setattr("app.services.session_timer.settings.GRADING_JOBS_ENABLED", True)
+    exam, questions = _exam(db, ["multiple_choice", "true_false"])
+    questions[1].correct_answer = True
+    db.flush()
+    session_id = _session(db, exam, questions[:1])
+
+    assert expire_exam_sessions(db, [session_id]) == {session_id: 2.0}
+
+    db.expire_all()
+    session = db.get(ExamSession, session_id)
+    assert (session.status, session.score) == ("submitted", 2.0)
+    assert db.query(GradingJob).filter(GradingJob.session_id == session_id).count() == 0
+
+
+def test_expire_queues_exams_with_essays(db, monkeypatch):
+    monkeypatch.setattr("app.services.session_timer.settings.GRADING_JOBS_ENABLED", True)
+    monkeypatch.setattr("app.services.session_timer.grading_workers.wake", lambda: None)
+    exam, questions = _exam(db, ["multiple_choice", "essay"])
+    session_id = _session(db, exam, questions)
+
+    assert expire_exam_sessions(db, [session_id]) == {session_id: None}
+
+    db.expire_all()
+    session = db.get(ExamSession, session_id)
+    assert (session.status, session.score) == ("submitted", None)
+    assert db.query(GradingJob.status).filter(GradingJob.session_id == session_id).scalar() == "pending"
+
+
+def test_expire_ignores_sessions_no_longer_in_progress(db):
+    exam, questions = _exam(db, ["multiple_choice"])
+    session_id = _session(db, exam, questions)
+    db.get(ExamSession, session_id).status = "submitted"
+    db.commit()
+
+    assert expire_exam_sessions(db, [session_id]) == {}
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_create_schedules_deadline_only_with_timer_enabled(db, monkeypatch, enabled):
+    monkeypatch.setattr("app.services.exam_session.settings.SESSION_TIMER_ENABLED", enabled)
+    exam, _ = _exam(db, ["multiple_choice"])
+    user = User(email=f"timer-{enabled}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+
+    session = exam_session_service.create_exam_session(db, ExamSessionCreate(exam_id=exam.id), user_id=user.id)
+    try:
+        assert (session_deadlines.deadline(session.id) is not None) == enabled
+    finally:
+        session_deadlines.cancel(session.id)